@@ -2,62 +2,33 @@
 # Thorin Schmidt
 # 11/15/2016
 
-'''module that contains classes and functions to run a game'''
-from random import randint
+'''module that contains classes and functions to run a game
+
+    all dice come from dice.Dice streams, so a seeded stream replays a
+    whole game.  See dice.py.'''
 from character import *
 from monster import *
 from items import *
-
-def combat(one, two):
-    ''' runs combat between two Characters, named one and two'''
-
-    def take_action(current, target, choice):
-        '''handle the current active character's choice
-
-            current is the one doing the action, choice is the chosen action,
-            target is the opponent who could be attacked. The function returns
-            a Boolean, which indicates whether to end the combat loop.'''
-        
-        isOver = False
-        
-        if choice == "f":
-            isOver, message = current.flee() #Fleeing ends combat
-            
-        elif choice == "h":
-            success, message = current.heal() #This has no effect on the loop
-            
-        else:
-            success, message = current.attack(target)
-            if target.health <= 0:  #combat ends if the enemy dies
-                isOver = True
-                message += "\n" + target.name + " is Dead!"
-
-        print(message)
-
-        return isOver
-        #end of internal function
-    
-    ''' combat function begins here'''    
-    combatIsOver = False
-    rounds = 0
-    while not combatIsOver:
-        rounds +=1
-        print("\nRound", rounds, "begins...")
-        # 'Init' is short for 'Initiative', got tired of typos - TMS
-        oneInit = randint(1, 20) + one.speed
-        twoInit = randint(1, 20) + two.speed
-        if oneInit >= twoInit:
-            combatIsOver = take_action(one, two, one.combat_choice())
-            if combatIsOver:
-                continue # go directly to beginning of loop
-            combatIsOver = take_action(two, one, two.combat_choice())
-        else:
-            combatIsOver = take_action(two, one, two.combat_choice())
-            if combatIsOver:
-                continue # go directly to beginning of loop
-            combatIsOver = take_action(one, two, one.combat_choice())
-
-def create_player():
+from catalog import default_catalog
+from events import fight, publish, print_message, ask
+from combat_ai import MonteCarloAI
+
+def combat(one, two, dice = None, auto = False):
+    ''' runs combat between two Characters, named one and two
+
+        initiative is rolled with dice (DEFAULT_DICE if not given), every
+        other roll with the dice of whoever is acting.  The fight itself is
+        events.fight(); this just prints its messages.  With auto True,
+        one doesn't get asked what to do, a combat_ai.MonteCarloAI plays
+        for them (auto-battle).'''
+    oneChoice = ask
+    if auto:
+        # a stream of its own, so rollouts don't eat one's fight rolls
+        rollouts = one.dice.split(1)[0]
+        oneChoice = MonteCarloAI(dice = rollouts).against(two)
+    publish(fight(one, two, oneChoice, dice = dice), print_message)
+
+def create_player(dice = None):
     '''  generate a character based on user input
 
         This function contains several local functions, each using a different
@@ -78,10 +49,15 @@ def create_player():
                 in each set, the top three dice are kept and added together.
                 Then these scores are assigned by the user. This method usually
                 has the highest satisfaction for the player, but is also the
-                most complicated, due to the many choices required.'''
+                most complicated, due to the many choices required.
+
+        all rolls use dice (DEFAULT_DICE if not given), and the new
+        character keeps it as its own dice stream.'''
+    if dice is None:
+        dice = DEFAULT_DICE
 
     def simple():
-        return Character()
+        return Character(dice = dice)
 
     def hardcore():
         ''' use 3d6, in order of stats, no rerolls unless all under 13
@@ -96,21 +72,21 @@ def create_player():
         valid = False
         while not valid:
 
-            gStrength = randint(3,18)
-            gDexterity = randint(3,18)
-            gConstitution = randint(3,18)
-            gIntelligence = randint(3,18)
-            gWisdom = randint(3,18)
-            gCharisma = randint(3,18)
+            gStrength = dice.randint(3,18)
+            gDexterity = dice.randint(3,18)
+            gConstitution = dice.randint(3,18)
+            gIntelligence = dice.randint(3,18)
+            gWisdom = dice.randint(3,18)
+            gCharisma = dice.randint(3,18)
             if gStrength > 11 or gDexterity > 11 or\
                gConstitution > 11 or gIntelligence > 11 or\
                gWisdom > 11 or gCharisma > 11:
                 valid = True
         gName = input("What is your character's name?: ")
         gPotionCount = 0
-        gWeapon = Weapon(name = "Stick", base = 3, bonus = 0)
-        gArmor = Armor(name = "Loincloth", base = 0, bonus = 0)
-        gHealth = randint(1,8)
+        gWeapon = default_catalog().get("stick")
+        gArmor = default_catalog().get("loincloth")
+        gHealth = dice.randint(1,8)
         if gConstitution > 12:
             gHealth += 1
         
@@ -118,7 +94,8 @@ def create_player():
                          dexterity = gDexterity, constitution = gConstitution,
                          intelligence = gIntelligence, wisdom = gWisdom,
                          charisma = gCharisma, numberOfPotions = gPotionCount,
-                         weapon = gWeapon, armor = gArmor, maxHealth = gHealth)
+                         weapon = gWeapon, armor = gArmor, maxHealth = gHealth,
+                         dice = dice)
 
     def four_d_six(cheat = False):
         ''' 4d6, use best three, arrange to suit
@@ -134,7 +111,7 @@ def create_player():
         for i in range(6):
             rolls = []
             for j in range(4):
-                rolls.append(randint(1,6))
+                rolls.append(dice.roll(6))
             rolls.remove(min(rolls))
             daScores.append(sum(rolls))
 
@@ -196,17 +173,17 @@ def create_player():
         inputCha = daScores[0]
 
         inputName = input("What is your character's name?: ")
-        inputPotionCount = randint(1,4)
-        inputWeapon = Weapon(name = "Longsword", base = 8, bonus = 0)
-        inputArmor = Armor(name = "Leather", base = 3, bonus = 0)
-        inputHealth = randint(1,8)
+        inputPotionCount = dice.randint(1,4)
+        inputWeapon = default_catalog().get("longsword")
+        inputArmor = default_catalog().get("leather")
+        inputHealth = dice.randint(1,8)
             
         return Character(name=inputName, maxHealth=inputHealth,
                          strength=inputStr, dexterity=inputDex,
                          constitution=inputCon, intelligence = inputInt,
                          wisdom=inputWis, charisma=inputCha,
                          numberOfPotions=inputPotionCount, weapon=inputWeapon,
-                         armor=inputArmor)
+                         armor=inputArmor, dice=dice)
 
     #main menu
     satisfied = False
@@ -255,7 +232,8 @@ if __name__ == "__main__":
     print(hero)
     #hero = Character()
     orc = Monster(name = "Dorque da Orc")
+    auto = input("Auto-battle [y/N]? ").lower().startswith("y")
 
-    combat(hero, orc)
+    combat(hero, orc, auto = auto)
 
     
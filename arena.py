@@ -0,0 +1,290 @@
+# arena.py
+# Talon H.
+# 10/18/2026
+
+''' battles on a map, with a spatial index for finding targets
+
+    a GridEncounter is an Encounter where every combatant stands on an
+    (x, y) square.  Each team's positions are kept in a SpatialHash: the
+    map is cut into square cells, and each cell remembers who is in it.
+    Looking for the nearest enemy then only checks the cells around the
+    attacker, ring by ring, instead of every unit on the map, and units
+    that move, die or flee are updated in their cells one at a time.
+
+        arena = GridEncounter(target = nearest_target)
+        arena.add(hero, "heroes", (3, 4))
+        arena.add(orc, "orcs", (10, 2))
+        arena.run()
+
+    a TacticalEncounter puts the combatants on a pathfinding.TileMap and
+    makes them walk.  A combatant has to stand next to its target (one
+    tile up, down, left or right) to attack it; otherwise its turn is
+    spent moving towards it, up to speed // FEET_PER_TILE tiles, and it
+    attacks at the end of the move if it got there.  Routes come from a
+    shared Pathfinder, so a horde chasing the same hero shares one flow
+    field.  Only walls block the way, units can pass and share tiles.
+'''
+from encounter import Encounter
+from events import Move
+from pathfinding import Pathfinder, manhattan
+
+FEET_PER_TILE = 5
+
+class SpatialHash(object):
+    ''' uniform hash grid of items at (x, y) positions '''
+
+    def __init__(self, cellSize = 8):
+        self.cellSize = cellSize
+        self.cells = {}     # (cx, cy): set of items
+        self.where = {}     # item: (x, y)
+        self.low = None     # smallest and largest cell used so far,
+        self.high = None    # so searches know when to give up
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, item):
+        return item in self.where
+
+    def cell(self, x, y):
+        return (int(x // self.cellSize), int(y // self.cellSize))
+
+    def insert(self, item, x, y):
+        ''' puts item at (x, y) '''
+        key = self.cell(x, y)
+        self.cells.setdefault(key, set()).add(item)
+        self.where[item] = (x, y)
+        if self.low is None:
+            self.low, self.high = key, key
+        else:
+            self.low = (min(self.low[0], key[0]), min(self.low[1], key[1]))
+            self.high = (max(self.high[0], key[0]), max(self.high[1], key[1]))
+
+    def remove(self, item):
+        ''' takes item out '''
+        x, y = self.where.pop(item)
+        key = self.cell(x, y)
+        cell = self.cells[key]
+        cell.discard(item)
+        if not cell:
+            del self.cells[key]
+
+    def move(self, item, x, y):
+        ''' moves item, only touching cells if it changed cell '''
+        oldX, oldY = self.where[item]
+        if self.cell(oldX, oldY) == self.cell(x, y):
+            self.where[item] = (x, y)
+        else:
+            self.remove(item)
+            self.insert(item, x, y)
+
+    def position(self, item):
+        return self.where[item]
+
+    def area(self, left, top, right, bottom):
+        ''' every item with left <= x <= right and top <= y <= bottom '''
+        found = []
+        lowX, lowY = self.cell(left, top)
+        highX, highY = self.cell(right, bottom)
+        for cx in range(lowX, highX + 1):
+            for cy in range(lowY, highY + 1):
+                for item in self.cells.get((cx, cy), ()):
+                    x, y = self.where[item]
+                    if left <= x <= right and top <= y <= bottom:
+                        found.append(item)
+        return found
+
+    def radius(self, x, y, radius):
+        ''' every item within radius of (x, y) '''
+        limit = radius * radius
+        found = []
+        for item in self.area(x - radius, y - radius, x + radius, y + radius):
+            itemX, itemY = self.where[item]
+            if (itemX - x) ** 2 + (itemY - y) ** 2 <= limit:
+                found.append(item)
+        return found
+
+    def ring(self, cx, cy, k):
+        ''' the cell keys exactly k cells away from (cx, cy) '''
+        if k == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-k, k + 1):
+            yield (cx + dx, cy - k)
+            yield (cx + dx, cy + k)
+        for dy in range(-k + 1, k):
+            yield (cx - k, cy + dy)
+            yield (cx + k, cy + dy)
+
+    def nearest(self, x, y, exclude = None):
+        ''' (item, squared distance) nearest to (x, y), or (None, None)
+
+            searches outwards a ring of cells at a time, and stops as soon
+            as no unsearched cell could hold anything closer.'''
+        if not self.where:
+            return None, None
+        cx, cy = self.cell(x, y)
+        # no occupied cell is further out than this ring
+        last = max(abs(cx - self.low[0]), abs(cx - self.high[0]),
+                   abs(cy - self.low[1]), abs(cy - self.high[1]))
+        best = None
+        bestDistance = None
+        k = 0
+        while k <= last:
+            for key in self.ring(cx, cy, k):
+                for item in self.cells.get(key, ()):
+                    if item is exclude:
+                        continue
+                    itemX, itemY = self.where[item]
+                    distance = (itemX - x) ** 2 + (itemY - y) ** 2
+                    if bestDistance is None or distance < bestDistance:
+                        best, bestDistance = item, distance
+            # anything in ring k + 1 is at least k cells away
+            reach = k * self.cellSize
+            if bestDistance is not None and bestDistance <= reach * reach:
+                break
+            k += 1
+        return best, bestDistance
+
+def nearest_target(encounter, attacker):
+    ''' targeting policy: the closest enemy (needs a GridEncounter) '''
+    return encounter.nearest_enemy(attacker)
+
+class GridEncounter(Encounter):
+    ''' an Encounter where everybody has a place on the map '''
+
+    def __init__(self, teams = None, target = nearest_target, dice = None,
+                 cellSize = 8):
+        ''' teams is {team name: list of (combatant, (x, y))} '''
+        self.cellSize = cellSize
+        self.grids = {}         # team name: SpatialHash of its entries
+        super(GridEncounter, self).__init__(None, target, dice)
+        if teams is not None:
+            for team, members in teams.items():
+                for character, position in members:
+                    self.add(character, team, position)
+
+    def add(self, character, team, position = (0, 0), choose = None):
+        ''' puts a combatant in at position '''
+        entry = super(GridEncounter, self).add(character, team, choose)
+        grid = self.grids.get(team)
+        if grid is None:
+            grid = self.grids[team] = SpatialHash(self.cellSize)
+        grid.insert(entry, position[0], position[1])
+        return entry
+
+    def remove(self, entry):
+        ''' dead or fled units leave the map too '''
+        super(GridEncounter, self).remove(entry)
+        self.grids[entry.team].remove(entry)
+
+    def position(self, entry):
+        return self.grids[entry.team].position(entry)
+
+    def move(self, entry, x, y):
+        ''' moves a combatant to (x, y) '''
+        self.grids[entry.team].move(entry, x, y)
+
+    def nearest_enemy(self, entry):
+        ''' the closest combatant not on entry's team '''
+        x, y = self.position(entry)
+        best = None
+        bestDistance = None
+        for team, grid in self.grids.items():
+            if team == entry.team:
+                continue
+            found, distance = grid.nearest(x, y)
+            if found is not None and (bestDistance is None or
+                                      distance < bestDistance):
+                best, bestDistance = found, distance
+        return best
+
+    def within(self, x, y, radius, teams = None):
+        ''' every combatant within radius of (x, y), for area effects
+
+            teams limits the search to those team names.'''
+        found = []
+        for team, grid in self.grids.items():
+            if teams is None or team in teams:
+                found.extend(grid.radius(x, y, radius))
+        return found
+
+    def in_area(self, left, top, right, bottom, teams = None):
+        ''' every combatant in a rectangle of the map '''
+        found = []
+        for team, grid in self.grids.items():
+            if teams is None or team in teams:
+                found.extend(grid.area(left, top, right, bottom))
+        return found
+
+class TacticalEncounter(GridEncounter):
+    ''' a GridEncounter on a tile map, where speed is how far you walk '''
+
+    def __init__(self, tileMap, teams = None, target = nearest_target,
+                 dice = None, cellSize = 8, pathfinder = None):
+        ''' tileMap is a pathfinding.TileMap, teams is
+            {team name: list of (combatant, (x, y))}.  A Pathfinder for the
+            map is made if one isn't given.'''
+        self.map = tileMap
+        if pathfinder is None:
+            pathfinder = Pathfinder(tileMap)
+        self.pathfinder = pathfinder
+        super(TacticalEncounter, self).__init__(teams, target, dice,
+                                                cellSize)
+
+    def budget(self, entry):
+        ''' how many tiles entry can walk in a turn '''
+        return max(1, entry.character.speed // FEET_PER_TILE)
+
+    def play_round(self):
+        self.pathfinder.new_turn()
+        return super(TacticalEncounter, self).play_round()
+
+    def attack(self, entry):
+        ''' walks towards the target, and attacks if it is next to it '''
+        target = self.target(self, entry)
+        start = self.position(entry)
+        goal = self.position(target)
+        if manhattan(start, goal) > 1:
+            route = self.pathfinder.route(start, goal, self.budget(entry))
+            if route and route[-1] == goal:
+                route = route[:-1]  # stop next to the target, not on it
+            if route:
+                end = route[-1]
+                self.move(entry, end[0], end[1])
+                yield Move(entry.character, start, end)
+                start = end
+        if manhattan(start, goal) <= 1:
+            for event in self.strike(entry, target):
+                yield event
+
+if __name__ == "__main__":
+    import time
+    from dice import Dice
+    from monster import Character, Orc
+    dice = Dice(1)
+    arena = GridEncounter(dice = dice)
+    for i in range(2000):
+        arena.add(Character(name = "Hero %d" % i, dice = dice), "heroes",
+                  (dice.randint(0, 499), dice.randint(0, 499)))
+        arena.add(Orc(name = "Orc %d" % i, dice = dice), "orcs",
+                  (dice.randint(0, 499), dice.randint(0, 499)))
+    start = time.time()
+    print(arena.run())
+    print("%.2f seconds" % (time.time() - start))
+
+    from pathfinding import TileMap
+    walls = [(x, y) for x in range(10, 90, 10) for y in range(5, 95)]
+    arena = TacticalEncounter(TileMap(100, 100, walls), dice = dice,
+                              cellSize = 16)
+    for i in range(10):
+        arena.add(Character(name = "Hero %d" % i, dice = dice), "heroes",
+                  (dice.randint(0, 4), dice.randint(0, 99)))
+    for i in range(500):
+        arena.add(Orc(name = "Orc %d" % i, dice = dice), "orcs",
+                  (dice.randint(90, 99), dice.randint(0, 99)))
+    start = time.time()
+    print(arena.run())
+    print("%d routes, %d searches, %.2f seconds" % (
+        arena.pathfinder.routes, arena.pathfinder.searches,
+        time.time() - start))
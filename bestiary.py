@@ -0,0 +1,211 @@
+# bestiary.py
+# Talon H.
+# 10/18/2026
+
+''' monsters defined in a data file, spawned from prototypes
+
+    every kind of monster is a definition in a JSON file (monsters.json
+    by default):
+
+        "orc": {
+            "class": "Orc",
+            "name": "Dorque da Orc",
+            "stats": {"maxHealth": [1, 8], "strength": [8, 10], ...},
+            "ai": {"aggression": 80, "awareness": 30, "fear": 20},
+            "potions": 2,
+            "weapon": {"name": "Club", "base": 6, "bonus": 0},
+            "challenge": 2
+        }
+
+    a stat that is a [low, high] pair is rolled for every monster (with
+    dice.randint), anything else is the same for all of them.  weapon and
+    armor are optional, the class's default gear is used without them.
+    Either can be an item id from the item catalog ("weapon": "club", see
+    catalog.py) instead of a full definition; every orc gets the same
+    shared Club either way.
+    challenge is what one of them costs in an encounter budget (see
+    spawning.py), 1 if not given.
+
+    a file is only parsed once (until it changes on disk), and each kind's
+    prototype is only built the first time one is spawned.  spawn() then
+    copies the prototype's slots into a monster and rolls just the
+    per-monster stats, instead of running the whole constructor.
+
+        registry = MonsterRegistry.from_file("monsters.json")
+        orc = registry.spawn("orc", dice)
+'''
+import json
+import os
+from character import *
+from monster import *
+from catalog import default_catalog, shared
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "monsters.json")
+
+# "class" in a definition: (regular class, compact class)
+CLASSES = {"Monster": (Monster, CompactMonster),
+           "Orc": (Orc, CompactOrc)}
+
+# slots every spawned monster gets new values for
+FRESH = ('dice', 'modifiers', '_inventory', 'potions')
+
+# path: (modification time, parsed definitions)
+parsed = {}
+
+def load_definitions(path):
+    ''' the definitions in a JSON file, parsed once per change '''
+    path = os.path.abspath(path)
+    changed = os.stat(path).st_mtime_ns
+    cached = parsed.get(path)
+    if cached is None or cached[0] != changed:
+        with open(path) as source:
+            cached = parsed[path] = (changed, json.load(source))
+    return cached[1]
+
+def gear(definition, cls):
+    ''' the shared cls item for a catalog id or a name/base/bonus dict '''
+    if isinstance(definition, str):
+        return default_catalog().get(definition, cls = cls)
+    item = cls(**definition)        # for the class's defaults
+    return shared(cls, item.name, item.base, item.bonus)
+
+class Kind(object):
+    ''' one parsed definition, and its prototype once it is built '''
+    __slots__ = ('name', 'cls', 'definition', 'rolls', 'slots', 'separate',
+                 'prototype', 'state')
+
+    def __init__(self, name, definition, compact):
+        self.name = name
+        regular, slotted = CLASSES[definition.get("class", "Monster")]
+        self.cls = slotted if compact else regular
+        self.definition = definition
+        # stats that are rolled per monster: (stat, low, high)
+        self.rolls = tuple((stat, value[0], value[1])
+                           for stat, value in definition["stats"].items()
+                           if isinstance(value, list))
+        self.slots = slots_of(self.cls)
+        # regular monsters have a __dict__ of their own
+        self.separate = self.cls.__dictoffset__ != 0
+        self.prototype = None
+        self.state = None       # (slot, value) pairs spawn() copies
+
+    def build_prototype(self):
+        ''' a monster with the fixed stats (and the lowest rolls) '''
+        definition = self.definition
+        stats = dict((stat, value[0] if isinstance(value, list) else value)
+                     for stat, value in definition["stats"].items())
+        ai = definition.get("ai", {})
+        prototype = self.cls.__new__(self.cls)
+        CompactMonster.__init__(prototype,
+                                definition.get("name", "Generic Foe"),
+                                stats.get("maxHealth", 10),
+                                stats.get("speed", 25),
+                                stats.get("stamina", 25),
+                                stats.get("strength", 8),
+                                stats.get("dexterity", 8),
+                                stats.get("constitution", 10),
+                                stats.get("intelligence", 8),
+                                stats.get("wisdom", 10),
+                                stats.get("charisma", 10),
+                                definition.get("potions", 0), [],
+                                ai.get("aggression", 50),
+                                ai.get("awareness", 50),
+                                ai.get("fear", 50))
+        if "weapon" in definition:
+            prototype.weapon = gear(definition["weapon"], self.cls.weaponClass)
+        if "armor" in definition:
+            prototype.armor = gear(definition["armor"], self.cls.armorClass)
+        self.prototype = prototype
+        self.state = tuple((slot, getattr(prototype, slot))
+                           for slot in self.slots if slot not in FRESH)
+        return prototype
+
+class MonsterRegistry(object):
+    ''' every kind of monster in a definitions dictionary
+
+        compact monsters (CompactOrc and so on) are spawned if compact is
+        True.'''
+
+    def __init__(self, definitions, compact = False):
+        self.compact = compact
+        self.kinds = {name: Kind(name, definition, compact)
+                      for name, definition in definitions.items()}
+        self.names = sorted(self.kinds)
+        self.spawned = 0
+
+    @classmethod
+    def from_file(cls, path = DEFAULT_FILE, compact = False):
+        return cls(load_definitions(path), compact)
+
+    def prototype(self, kind):
+        ''' the prototype of kind, built the first time it is needed.
+            Don't change it, spawn() copies what it was when built.'''
+        found = self.kinds[kind]
+        if found.prototype is None:
+            found.build_prototype()
+        return found.prototype
+
+    def spawn(self, kind, dice = None):
+        ''' a fresh monster of kind '''
+        if dice is None:
+            dice = DEFAULT_DICE
+        found = self.kinds[kind]
+        prototype = found.prototype
+        if prototype is None:
+            prototype = found.build_prototype()
+        self.spawned += 1
+        monster = found.cls.__new__(found.cls)
+        for slot, value in found.state:
+            setattr(monster, slot, value)
+        monster.dice = dice
+        monster.modifiers = None
+        monster._inventory = None
+        monster.potions = monster.new_potions(len(prototype.potions))
+        if found.separate:
+            monster.__dict__.update(prototype.__dict__)
+        for stat, low, high in found.rolls:
+            setattr(monster, stat, dice.randint(low, high))
+        monster.health = monster.maxHealth
+        return monster
+
+    def challenge(self, kind):
+        ''' what one monster of kind costs in an encounter budget '''
+        return self.kinds[kind].definition.get("challenge", 1)
+
+    def random(self, dice = None):
+        ''' a monster of a kind picked at random, all kinds equally likely
+        '''
+        if dice is None:
+            dice = DEFAULT_DICE
+        return self.spawn(dice.choice(self.names), dice)
+
+# made by default_registry() the first time it is asked for
+default = None
+
+def default_registry():
+    ''' the registry for monsters.json, regular (not compact) monsters '''
+    global default
+    if default is None:
+        default = MonsterRegistry.from_file()
+    return default
+
+if __name__ == "__main__":
+    import time
+    from dice import Dice
+    dice = Dice(1)
+    count = 200000
+    start = time.time()
+    for i in range(count):
+        Orc(dice = dice)
+    print("Orc(): %.2f seconds" % (time.time() - start))
+    start = time.time()
+    for i in range(count):
+        random_monster(dice)
+    print("random_monster: %.2f seconds" % (time.time() - start))
+    registry = MonsterRegistry.from_file(compact = True)
+    start = time.time()
+    for i in range(count):
+        registry.spawn("orc", dice)
+    print("compact orcs from the prototype: %.2f seconds" %
+          (time.time() - start))
@@ -0,0 +1,296 @@
+# catalog.py
+# Talon H.
+# 10/18/2026
+
+''' items defined in a data file, one shared object per definition
+
+    every kind of item is a definition in a JSON (or TOML) file, items.json
+    by default:
+
+        "longsword": {"slot": "weapon", "name": "Longsword", "base": 8},
+        "cure_light": {"slot": "potion", "name": "Cure Light", "base": 8,
+                       "bonus": 1}
+
+    slot is "weapon", "armor", "potion" or "misc" (the default), bonus is
+    0 if not given.
+
+    a definition is the same for everybody, so there is no need for every
+    character to have a Longsword of their own.  get() hands out one
+    shared object per definition (and flavour, regular or Compact), made
+    the first time it is asked for, and everyone with a plain Longsword
+    holds that one.  Shared items are frozen: they are SharedWeapon,
+    SharedArmor... (subclasses of the usual item classes) and changing
+    one raises AttributeError instead of quietly changing everybody's.
+
+    what varies from one owner to the next, the enchantment bonus, goes in
+    an item of the owner's own.  get() with a bonus makes a new, ordinary
+    (changeable) item every time, with the definition's name and base and
+    that bonus:
+
+        hero.weapon = default_catalog().get("longsword")            # shared
+        hero.weapon = default_catalog().get("longsword", bonus = 1) # hero's
+
+    shared() does the same for items that aren't in a catalog: one frozen
+    object per (class, name, base, bonus).
+
+    parsing thousands of definitions at every start would be a waste, so
+    the parsed catalog is compiled to (slot, name, base, bonus) tuples and
+    pickled into __pycache__ next to the file.  The next start loads that
+    instead, as long as the file hasn't changed since (same size and
+    modification time).  Within one run a file is only loaded once.
+'''
+import json
+import os
+import pickle
+from items import *
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "items.json")
+
+# bump when the compiled format changes, so old caches are ignored
+FORMAT = 1
+
+# "slot" in a definition: (regular class, compact class)
+CLASSES = {"weapon": (Weapon, CompactWeapon),
+           "armor": (Armor, CompactArmor),
+           "potion": (Potion, CompactPotion),
+           "misc": (Item, CompactItem)}
+
+class Shared(object):
+    ''' an item that can't be changed, since everybody holds the same one
+    '''
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError("shared items can't be changed, equip "
+                             "default_catalog().get(id, bonus = ...) "
+                             "instead")
+
+    def __delattr__(self, name):
+        raise AttributeError("shared items can't be changed")
+
+    def __reduce__(self):
+        # pickled and copied as "the shared one", not field by field
+        return (shared, (self.plainClass, self.name, self.base, self.bonus))
+
+class SharedCompactItem(Shared, CompactItem):
+    ''' a shared, frozen CompactItem '''
+    __slots__ = ()
+    plainClass = CompactItem
+
+class SharedCompactWeapon(Shared, CompactWeapon):
+    ''' a shared, frozen CompactWeapon '''
+    __slots__ = ()
+    plainClass = CompactWeapon
+
+class SharedCompactArmor(Shared, CompactArmor):
+    ''' a shared, frozen CompactArmor '''
+    __slots__ = ()
+    plainClass = CompactArmor
+
+class SharedCompactPotion(Shared, CompactPotion):
+    ''' a shared, frozen CompactPotion '''
+    __slots__ = ()
+    plainClass = CompactPotion
+
+class SharedItem(Shared, Item):
+    ''' a shared, frozen Item '''
+    __slots__ = ()
+    plainClass = Item
+
+class SharedWeapon(Shared, Weapon):
+    ''' a shared, frozen Weapon '''
+    __slots__ = ()
+    plainClass = Weapon
+
+class SharedArmor(Shared, Armor):
+    ''' a shared, frozen Armor '''
+    __slots__ = ()
+    plainClass = Armor
+
+class SharedPotion(Shared, Potion):
+    ''' a shared, frozen Potion '''
+    __slots__ = ()
+    plainClass = Potion
+
+# item class: its frozen Shared subclass
+FROZEN = {cls.plainClass: cls
+          for cls in (SharedCompactItem, SharedCompactWeapon,
+                      SharedCompactArmor, SharedCompactPotion, SharedItem,
+                      SharedWeapon, SharedArmor, SharedPotion)}
+
+# (class, name, base, bonus): the one item object for it
+interned = {}
+
+def shared(cls, name, base, bonus = 0):
+    ''' the one frozen cls(name, base, bonus), made the first time it is
+        needed '''
+    key = (cls, name, base, bonus)
+    found = interned.get(key)
+    if found is None:
+        frozen = FROZEN.get(cls, cls)
+        found = frozen.__new__(frozen)
+        # __setattr__ refuses, the slots are set underneath it
+        object.__setattr__(found, "name", name)
+        object.__setattr__(found, "base", base)
+        object.__setattr__(found, "bonus", bonus)
+        interned[key] = found
+    return found
+
+def parse(path):
+    ''' the raw definitions in a JSON or TOML file '''
+    if path.endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as source:
+            return tomllib.load(source)
+    with open(path) as source:
+        return json.load(source)
+
+def compile_definitions(definitions):
+    ''' {item id: (slot, name, base, bonus)} from raw definitions '''
+    compiled = {}
+    for itemId, definition in definitions.items():
+        slot = definition.get("slot", "misc")
+        if slot not in CLASSES:
+            raise ValueError("item " + itemId + " has unknown slot " + slot)
+        compiled[itemId] = (slot, definition.get("name", itemId),
+                            definition.get("base", 0),
+                            definition.get("bonus", 0))
+    return compiled
+
+def cache_path(path):
+    ''' where the compiled catalog for path is kept '''
+    folder, name = os.path.split(path)
+    return os.path.join(folder, "__pycache__", name + ".catalog")
+
+def read_cache(path, stamp):
+    ''' the compiled catalog cached for path, or None if it is stale '''
+    try:
+        with open(cache_path(path), "rb") as source:
+            cached = pickle.load(source)
+    except Exception:
+        return None
+    if cached[0] != stamp:
+        return None
+    return cached[1]
+
+def write_cache(path, stamp, compiled):
+    ''' saves the compiled catalog, if there is anywhere to save it '''
+    target = cache_path(path)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok = True)
+        with open(target + ".tmp", "wb") as sink:
+            pickle.dump((stamp, compiled), sink, pickle.HIGHEST_PROTOCOL)
+        os.replace(target + ".tmp", target)
+    except OSError:
+        pass
+
+# path: (stamp, compiled definitions)
+loaded = {}
+
+def load_catalog(path):
+    ''' the compiled definitions in a file, from the cache if it is fresh
+    '''
+    path = os.path.abspath(path)
+    status = os.stat(path)
+    stamp = (FORMAT, status.st_mtime_ns, status.st_size)
+    found = loaded.get(path)
+    if found is None or found[0] != stamp:
+        compiled = read_cache(path, stamp)
+        if compiled is None:
+            compiled = compile_definitions(parse(path))
+            write_cache(path, stamp, compiled)
+        found = loaded[path] = (stamp, compiled)
+    return found[1]
+
+class ItemCatalog(object):
+    ''' every kind of item in a compiled definitions dictionary '''
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+        # (item id, class): the shared item, so get() is one lookup
+        self.found = {}
+        # (slot, name, base): item id, made by find() when first needed
+        self.byItem = None
+
+    @classmethod
+    def from_file(cls, path = DEFAULT_FILE):
+        return cls(load_catalog(path))
+
+    def __contains__(self, itemId):
+        return itemId in self.compiled
+
+    def __len__(self):
+        return len(self.compiled)
+
+    def ids(self, slot = None):
+        ''' every item id (in slot, if given), sorted '''
+        return sorted(itemId for itemId, entry in self.compiled.items()
+                      if slot is None or entry[0] == slot)
+
+    def get(self, itemId, bonus = None, cls = None):
+        ''' the item for itemId, as a cls (the regular class for its slot
+            if not given, pass the Compact one for slotted items)
+
+            without a bonus that is the shared, frozen item.  With one it
+            is a new item of the caller's own with that bonus.'''
+        if bonus is not None:
+            slot, name, base, defaultBonus = self.compiled[itemId]
+            if cls is None:
+                cls = CLASSES[slot][0]
+            return cls(name, base, bonus)
+        key = (itemId, cls)
+        found = self.found.get(key)
+        if found is None:
+            slot, name, base, defaultBonus = self.compiled[itemId]
+            if cls is None:
+                cls = CLASSES[slot][0]
+            found = self.found[key] = shared(cls, name, base, defaultBonus)
+        return found
+
+    def find(self, item):
+        ''' the id of the definition item was made from (same slot, name
+            and base, any bonus), or None if it isn't from this catalog '''
+        if self.byItem is None:
+            self.byItem = {(slot, name, base): itemId
+                           for itemId, (slot, name, base, bonus)
+                           in self.compiled.items()}
+        return self.byItem.get((slot_of(item), item.name, item.base))
+
+def slot_of(item):
+    ''' the catalog slot for an item, by its class '''
+    for slot, classes in CLASSES.items():
+        if isinstance(item, classes):
+            return slot
+
+# made by default_catalog() the first time it is asked for
+default = None
+
+def default_catalog():
+    ''' the catalog for items.json '''
+    global default
+    if default is None:
+        default = ItemCatalog.from_file()
+    return default
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+    count = 5000
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "many_items.json")
+    with open(path, "w") as sink:
+        json.dump({"sword_%d" % i: {"slot": "weapon",
+                                    "name": "Sword %d" % i,
+                                    "base": 4 + i % 9, "bonus": i % 4}
+                   for i in range(count)}, sink)
+    start = time.time()
+    compile_definitions(parse(path))
+    parsed = time.time() - start
+    load_catalog(path)      # writes the cache
+    loaded.clear()
+    start = time.time()
+    load_catalog(path)
+    cached = time.time() - start
+    print("%d definitions: parsed %.2f ms, from the cache %.2f ms" %
+          (count, parsed * 1000, cached * 1000))
@@ -23,14 +23,106 @@
     critical fumble (roll of 1).
     11/21/2016
       added __str__ method to allow easy printing.
+    10/18/2026
+      added CompactCharacter, a __slots__ version of Character with the
+    same attributes and properties.  Character is now CompactCharacter plus
+    a __dict__.  Compact characters get slotted items, and all of their
+    potions share one CompactPotion, since potions never change once made.
+    10/18/2026
+      added modifiers (buffs, debuffs, timed effects, see modifiers.py).
+    The *Bonus properties, AC and the new attackBonus and damageBonus are
+    no longer computed on every call.  They are stored, and recomputed
+    only when one of their inputs changes: an ability score, the weapon,
+    the armor, or a modifier.  Don't change a weapon or armor in place
+    (catalog items are shared and refuse to), equip
+    default_catalog().get(id, bonus = ...) instead: setting weapon or
+    armor updates the stats.
+    10/18/2026
+      dice now come from the character's dice attribute, a dice.Dice
+    stream (new constructor parameter dice, DEFAULT_DICE if not given),
+    instead of random.randint.  Seed it to make fights reproducible.
+    10/18/2026
+      added attack_event, heal_event and flee_event, which do the action
+    and return an event object from events.py instead of a message.  The
+    message text is only built if somebody reads event.message.  attack,
+    heal and flee still return (success, message) like before.
+    10/18/2026
+      potions and inventory are stacked (see inventory.py).  potions is a
+    Pouch, which still works like the old list of Potions (len, [-1], pop,
+    append), but identical potions are one Stack with a count, so drinking
+    or adding one is O(1) and a hoard is not one object per potion.
+    inventory is an Inventory, indexed by item, name and slot; the old
+    [name, count] lists can still be passed to the constructor.  It is
+    only made when first used, so an NPC that never carries anything
+    doesn't pay for one.
+    10/18/2026
+      the default gear comes from the item catalog (see catalog.py), and
+    is shared: every character with the default Fists holds the same,
+    frozen, Fists.  For an enchanted one equip an item of the character's
+    own, default_catalog().get("longsword", bonus = 1).
     
 
 '''
-from random import randint
 from items import *
+from dice import Dice, DEFAULT_DICE
+from modifiers import Modifiers
+from events import Hit, Miss, Fumble, Heal, Flee
+from inventory import Pouch, Inventory
+from catalog import default_catalog
+
+# each ability score and the name of its bonus property
+ABILITY_BONUS = {"strength": "strBonus",
+                 "dexterity": "dexBonus",
+                 "constitution": "conBonus",
+                 "intelligence": "intBonus",
+                 "wisdom": "wisBonus",
+                 "charisma": "chaBonus"}
+
+def ability_score(stat):
+    ''' property for an ability score that keeps its bonus up to date '''
+    slot = "_" + stat
+
+    def get_score(self):
+        return getattr(self, slot)
+
+    def set_score(self, value):
+        setattr(self, slot, value)
+        self.update_stat(stat)
+
+    return property(get_score, set_score, doc = "base " + stat + " score")
+
+def slots_of(cls):
+    ''' every __slots__ name of cls and its bases '''
+    names = []
+    for klass in reversed(cls.__mro__):
+        for name in getattr(klass, "__slots__", ()):
+            if name not in ("__dict__", "__weakref__") and name not in names:
+                names.append(name)
+    return tuple(names)
+
+class CompactCharacter(object):
+    ''' Base Character Class without a per-instance __dict__
+
+        all the behaviour lives here, Character below only adds the
+        __dict__ back.  Use this one for huge rosters of NPCs.'''
+    __slots__ = ('name', 'maxHealth', 'health', 'speed', 'hunger',
+                 'stamina', '_strength', '_dexterity', '_constitution',
+                 '_intelligence', '_wisdom', '_charisma', '_inventory',
+                 'potions', '_weapon', '_armor', 'modifiers', 'dice',
+                 # derived stats, kept up to date by update_stat()
+                 '_strBonus', '_dexBonus', '_conBonus', '_intBonus',
+                 '_wisBonus', '_chaBonus', '_AC', '_attackBonus',
+                 '_damageBonus')
+
+    # item classes used when the constructor makes the default gear
+    weaponClass = CompactWeapon
+    armorClass = CompactArmor
+    potionClass = CompactPotion
+    # catalog ids of the default gear
+    defaultWeapon = "fists"
+    defaultArmor = "worn_leather"
+    defaultPotion = "cure_light"
 
-class Character(object):
-    ''' Base Character Class '''
     def __init__(self,
                  name = "Average Joe",
                  maxHealth = 10,
@@ -45,64 +137,175 @@ class Character(object):
                  numberOfPotions = 2,
                  inventory = [],
                  weapon = "",
-                 armor = ""):
+                 armor = "",
+                 dice = None):
         ''' All values represent the average score '''
+        if dice is None:
+            dice = DEFAULT_DICE
+        self.dice = dice
         self.name = name
         self.maxHealth = maxHealth
         self.health = maxHealth
         self.speed = speed
         self.hunger = 100 # 100 = Full, 0 = starving
         self.stamina = stamina
-        self.strength = strength
-        self.dexterity = dexterity
-        self.constitution = constitution
-        self.intelligence = intelligence
-        self.wisdom = wisdom
-        self.charisma = charisma
-        self.inventory = []
-        for item in inventory:
-            self.inventory.append(item[:])
-        self.potions = []
-        for i in range(numberOfPotions):
-            self.potions.append(Potion())
+        self._strength = strength
+        self._dexterity = dexterity
+        self._constitution = constitution
+        self._intelligence = intelligence
+        self._wisdom = wisdom
+        self._charisma = charisma
+        self.modifiers = None   # made by add_modifier() when first needed
+        # made by the inventory property when first needed
+        self._inventory = Inventory(inventory) if inventory else None
+        self.potions = self.new_potions(numberOfPotions)
         if weapon == "":
-            self.weapon = Weapon()
+            self._weapon = default_catalog().get(self.defaultWeapon,
+                                                 cls = self.weaponClass)
         else:
-            self.weapon = weapon
+            self._weapon = weapon
         if armor == "":
-            self.armor = Armor()
+            self._armor = default_catalog().get(self.defaultArmor,
+                                                cls = self.armorClass)
+        else:
+            self._armor = armor
+        self.update_stats()
+
+    def new_potions(self, numberOfPotions):
+        ''' the starting potions, one stack of the catalog's potion '''
+        return Pouch(default_catalog().get(self.defaultPotion,
+                                           cls = self.potionClass),
+                     numberOfPotions)
+
+    strength = ability_score("strength")
+    dexterity = ability_score("dexterity")
+    constitution = ability_score("constitution")
+    intelligence = ability_score("intelligence")
+    wisdom = ability_score("wisdom")
+    charisma = ability_score("charisma")
+
+    @property
+    def inventory(self):
+        ''' the Inventory, made the first time it is asked for '''
+        if self._inventory is None:
+            self._inventory = Inventory()
+        return self._inventory
+
+    @inventory.setter
+    def inventory(self, inventory):
+        self._inventory = inventory
+
+    @property
+    def weapon(self):
+        return self._weapon
+
+    @weapon.setter
+    def weapon(self, weapon):
+        self._weapon = weapon
+        self.update_stat("attack")
+
+    @property
+    def armor(self):
+        return self._armor
+
+    @armor.setter
+    def armor(self, armor):
+        self._armor = armor
+        self.update_stat("AC")
+
+    def update_stat(self, stat):
+        ''' recomputes the derived values that depend on stat
+
+            stat is an ability score, "AC", "attack" or "damage".  Only
+            the values that use it are touched.'''
+        modifiers = self.modifiers
+        if modifiers is None:
+            extra = 0
         else:
-            self.armor = armor
+            extra = modifiers.total(stat)
+        if stat in ABILITY_BONUS:
+            score = getattr(self, "_" + stat) + extra
+            setattr(self, "_" + ABILITY_BONUS[stat], (score//2) - 5)
+            if stat == "dexterity":
+                self.update_stat("AC")
+            elif stat == "strength":
+                self.update_stat("attack")
+                self.update_stat("damage")
+        elif stat == "AC":
+            self._AC = 10 + self._dexBonus + self._armor.defense + extra
+        elif stat == "attack":
+            self._attackBonus = self._strBonus + self._weapon.attack + extra
+        elif stat == "damage":
+            self._damageBonus = self._strBonus + extra
+
+    def update_stats(self):
+        ''' recomputes every derived value '''
+        for stat in ABILITY_BONUS:
+            self.update_stat(stat)
+
+    def add_modifier(self, stat, amount, duration = None, source = None):
+        ''' adds a buff (or debuff, with a negative amount)
+
+            lasts duration rounds, or until removed if duration is None.
+            Returns the Modifier, which can be passed to remove_modifier.'''
+        if self.modifiers is None:
+            self.modifiers = Modifiers(self)
+        return self.modifiers.add(stat, amount, duration, source)
+
+    def remove_modifier(self, modifier):
+        ''' takes a modifier off before it runs out '''
+        self.modifiers.remove(modifier)
+
+    def remove_modifiers_from(self, source):
+        ''' takes off every modifier that came from source '''
+        if self.modifiers is not None:
+            self.modifiers.remove_source(source)
+
+    def tick(self, rounds = 1):
+        ''' lets rounds pass for timed modifiers, expiring any that are done
+        '''
+        if self.modifiers is not None:
+            self.modifiers.tick(rounds)
 
     @property
     def strBonus(self):
-        ''' calculates d20 OGL bonus for strength'''
-        return (self.strength//2) - 5
+        ''' d20 OGL bonus for strength, modifiers included'''
+        return self._strBonus
 
     @property
     def dexBonus(self):
-        ''' calculates d20 OGL bonus for dexterity'''
-        return (self.dexterity//2) - 5
+        ''' d20 OGL bonus for dexterity, modifiers included'''
+        return self._dexBonus
 
     @property
     def conBonus(self):
-        ''' calculates d20 OGL bonus for dexterity'''
-        return (self.constitution//2) - 5
+        ''' d20 OGL bonus for constitution, modifiers included'''
+        return self._conBonus
 
     @property
     def intBonus(self):
-        ''' calculates d20 OGL bonus for intelligence'''
-        return (self.intelligence//2) - 5
+        ''' d20 OGL bonus for intelligence, modifiers included'''
+        return self._intBonus
 
     @property
     def wisBonus(self):
-        ''' calculates d20 OGL bonus for dexterity'''
-        return (self.wisdom//2) - 5
+        ''' d20 OGL bonus for wisdom, modifiers included'''
+        return self._wisBonus
 
     @property
     def chaBonus(self):
-        ''' calculates d20 OGL bonus for dexterity'''
-        return (self.charisma//2) - 5
+        ''' d20 OGL bonus for charisma, modifiers included'''
+        return self._chaBonus
+
+    @property
+    def attackBonus(self):
+        ''' everything added to an attack roll: strBonus, weapon, modifiers'''
+        return self._attackBonus
+
+    @property
+    def damageBonus(self):
+        ''' added to weapon damage: strBonus and modifiers'''
+        return self._damageBonus
 
 
     @property
@@ -113,33 +316,21 @@ class Character(object):
     @property
     def potionList(self):
         ''' produces a list of potions by name '''
-        potionNames = ""
-        for potion in self.potions:
-            potionNames += potion.name + ", "
-        potionNames = potionNames[:-2] #strip off the last ", "
-        return potionNames
+        return ", ".join([potion.name for potion in self.potions])
 
     @property
     def AC(self):
-        ''' calculates the overall d20 OGL Armor Class (AC) value'''
-        return 10 + self.dexBonus + self.armor.defense
+        ''' the overall d20 OGL Armor Class (AC) value'''
+        return self._AC
 
     def get_damaged(self, damage):
         ''' inflicts damage from an outside source '''
         self.health -= damage
 
-    def heal(self):
-        ''' randomly heal 1d8+1 points
+    def heal_event(self):
+        ''' randomly heal 1d8+1 points, returns an events.Heal
 
-            this method, like the other action methods, returns two values
-            which may or may not be used by the main program.  the first value
-            is a Boolean: success.  Hopefully, that one is self-explanatory.
-            message is just a text string that gives the game some descriptive
-            text to give the user.'''
-        
-        success = False
-        message = ""
-        
+            the Heal's amount is None if there were no potions to drink.'''
         #first check if there is a potion in inventory
         if self.potionCount > 0:
 
@@ -147,42 +338,59 @@ class Character(object):
             ''' NOTE: this is fine for now, since there's only one type of
                 potion, but later the user should be given a choice of which
                 to use...'''
-            amount = self.potions[-1].use()  
+            amount = self.potions[-1].use(self.dice)
             self.health += amount
             self.potions.pop()
 
             if self.health > self.maxHealth:
                 self.health = self.maxHealth
 
-            success = True
-            message = self.name + " drinks a potion, and heals " +\
-                      str(amount) + " points."
-        if not success:
-            message = self.name + " has no potions!"
+            return Heal(self, amount)
+        return Heal(self, None)
 
-        return success, message
+    def flee_event(self):
+        ''' attempt to flee the combat, based on speed, returns an events.Flee
+        '''
+        chance = self.dice.roll(100)
+        return Flee(self, chance <= self.speed)
 
-    def flee(self):
-        ''' attempt to flee the combat, based on speed.
+    def attack_event(self, enemy):
+        ''' attack another Character, returns an events.Hit, Miss or Fumble
+        '''
+        roll = self.dice.roll(20)
+        if roll == 1:
+            return Fumble(self, enemy, roll)
+
+        attack = roll + self._attackBonus
+        if attack >= enemy.AC:
+            damage = self._weapon.roll_damage(self.dice) + self._damageBonus
+            if damage < 1:
+                damage = 1
+            enemy.get_damaged(damage)
+            return Hit(self, enemy, roll, damage)
+        return Miss(self, enemy, roll)
+
+    def heal(self):
+        ''' randomly heal 1d8+1 points
 
             this method, like the other action methods, returns two values
             which may or may not be used by the main program.  the first value
             is a Boolean: success.  Hopefully, that one is self-explanatory.
             message is just a text string that gives the game some descriptive
             text to give the user.'''
+        event = self.heal_event()
+        return event.success, event.message
 
-        success = False
-        message = ""
-        
-        chance = randint(1,100)
-        if chance <= self.speed:
-            success = True
-            message = "When danger reared it's ugly head,\n" + self.name +\
-                      " bravely turned and fled!"
-        else:
-            message = self.name + " tried to flee, but couldn't get away!"
+    def flee(self):
+        ''' attempt to flee the combat, based on speed.
 
-        return success, message
+            this method, like the other action methods, returns two values
+            which may or may not be used by the main program.  the first value
+            is a Boolean: success.  Hopefully, that one is self-explanatory.
+            message is just a text string that gives the game some descriptive
+            text to give the user.'''
+        event = self.flee_event()
+        return event.success, event.message
 
     def attack(self, enemy):
         ''' attack another Character
@@ -192,28 +400,8 @@ class Character(object):
             is a Boolean: success.  Hopefully, that one is self-explanatory.
             message is just a text string that gives the game some descriptive
             text to give the user.'''
-
-        success = False
-        message = ""
-        roll = randint(1,20)
-        if roll == 1:
-            success = False
-            message = self.name + "fumbles their attack!"
-
-        else:
-            attack = roll + self.strBonus + self.weapon.attack
-            if attack >= enemy.AC:
-                damage = self.weapon.damage + self.strBonus
-                if damage < 1:
-                    damage = 1
-                enemy.get_damaged(damage)
-                success = True
-                message = self.name + " hits " + enemy.name + " and does " +\
-                          str(damage) + " damage."
-            else:
-                message = self.name + " misses " + enemy.name + "."
-
-        return success, message
+        event = self.attack_event(enemy)
+        return event.success, event.message
 
     def combat_choice(self):
         ''' player's combat choices'''
@@ -241,7 +429,13 @@ class Character(object):
                "AC:      "+str(self.AC)+"\n"+\
                "-----------------------------------\n"
         return info
-    
+
+class Character(CompactCharacter):
+    ''' Base Character Class '''
+    weaponClass = Weapon
+    armorClass = Armor
+    potionClass = Potion
+
 if __name__ == "__main__":
     hero = Character(name = "Mr. Peebles")
     orc = Character(name = "Magilla")
@@ -5,10 +5,12 @@
 
 ''' GUI-based character generator'''
 
+import os
 import tkinter as tk
 import character as ch
 import monster as mon
-import random as rd
+import dice as dc
+import storage
 
 TITLE_FONT = ("Helvetica", 20, "bold")
 HEADING1_FONT = ("Helvetica", 16, "bold")
@@ -34,6 +36,11 @@ FOUR_D_6_MESSAGE = "Keep best three, arrange to suit - 6 sets of 4d6 are "+\
                    "for the player, but is also the most complicated, due "+\
                    "to the many choices required."
 
+# where the player is kept between sessions, next to this file so it is
+# found whichever directory the game is started from
+SAVE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "roster.db")
+
 class RootApp(tk.Tk):
 
     def __init__(self, *args, **kwargs):
@@ -42,9 +49,21 @@ class RootApp(tk.Tk):
 
         Data Model - Character object
         referenced in frames by using:
-            self.controller.player'''
+            self.controller.player
+
+        Dice - every frame rolls with self.controller.dice
 
-        self.player = ch.Character()
+        the player is saved to SAVE_FILE when the window closes, and
+        loaded back from it the next time.'''
+
+        self.dice = dc.DEFAULT_DICE
+        self.store = storage.RosterStore(SAVE_FILE)
+        saved = self.store.load("player", self.dice)
+        if len(saved):
+            self.player = saved[0]
+        else:
+            self.player = ch.Character(dice = self.dice)
+        self.protocol("WM_DELETE_WINDOW", self.close)
         self.columnconfigure(0, weight=1)
 
         # the container is where we'll stack a bunch of frames
@@ -72,6 +91,12 @@ class RootApp(tk.Tk):
         frame = self.frames[page_name]
         frame.tkraise()
 
+    def close(self):
+        '''keep the player for next time, then close the window'''
+        self.store.replace("player", [self.player])
+        self.store.close()
+        self.destroy()
+
 class Display(tk.Frame):
 
     def __init__(self, parent, controller):
@@ -164,12 +189,13 @@ class Hardcore(tk.Frame):
         self.valid = False
         while self.valid == False:
         
-            self.statBlock = [rd.randint(3,18),
-                              rd.randint(3,18),
-                              rd.randint(3,18),
-                              rd.randint(3,18),
-                              rd.randint(3,18),
-                              rd.randint(3,18)]
+            roll = self.controller.dice.randint
+            self.statBlock = [roll(3,18),
+                              roll(3,18),
+                              roll(3,18),
+                              roll(3,18),
+                              roll(3,18),
+                              roll(3,18)]
             for i in self.statBlock:
                 if i >= 12:
                     self.valid = True
@@ -280,12 +306,13 @@ class Hardcore(tk.Frame):
         self.valid = False
         while self.valid == False:
         
-            self.statBlock = [rd.randint(3,18),
-                              rd.randint(3,18),
-                              rd.randint(3,18),
-                              rd.randint(3,18),
-                              rd.randint(3,18),
-                              rd.randint(3,18)]
+            roll = self.controller.dice.randint
+            self.statBlock = [roll(3,18),
+                              roll(3,18),
+                              roll(3,18),
+                              roll(3,18),
+                              roll(3,18),
+                              roll(3,18)]
             for i in self.statBlock:
                 if i >= 12:
                     self.valid = True
@@ -553,7 +580,7 @@ class FourD6(tk.Frame):
 
         rolls = []
         for i in range(4):
-            rolls.append(rd.randint(1,6))
+            rolls.append(self.controller.dice.roll(6))
         rolls.remove(min(rolls))
         return sum(rolls)
 
@@ -721,7 +748,7 @@ class FourD6(tk.Frame):
         buttonList = (self.bttn1, self.bttn2, self.bttn3,
                       self.bttn4, self.bttn5, self.bttn6)
         for i in range(len(self.statBlock)):
-            self.statBlock[i] = rd.randint(3,18)
+            self.statBlock[i] = self.controller.dice.randint(3,18)
             buttonList[i].configure(text = str(self.statBlock[i]))
         self.reset()
 
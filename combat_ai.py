@@ -0,0 +1,513 @@
+# combat_ai.py
+# Talon H.
+# 10/18/2026
+
+''' combat AIs that can be plugged into any fight
+
+    Monster.combat_choice() rolls its three d100s without looking at the
+    fight at all: a monster on its last hit point with a pocket full of
+    potions is as likely to swing as one at full health.  A CombatAI
+    chooses with the fight in view instead.  choose(me, enemy) returns
+    "a", "h" or "f", and against(enemy) turns that into the kind of
+    function events.fight(), simulator.bout() and Encounter.add() take:
+
+        ai = ExpectimaxAI()
+        fight(orc, hero, ai.against(hero), always_attack)
+
+    ExpectimaxAI looks ahead over the duel's state (both healths and both
+    potion counts) with the rules odds.py already models: initiative, hit
+    chances against AC, damage and potion dice, flee rolls, and the enemy
+    choosing like its own combat_choice() (or always attacking, for plain
+    Characters).  Its own moves are maxed over, everything else is
+    averaged.  Where the lookahead stops, the position is scored by
+    comparing how many rounds each side needs to wear the other down.
+
+    every position it evaluates is remembered in a TranspositionTable, a
+    bounded least recently used cache shared by all its decisions, so the
+    same matchup later on (or the next turn of this one) is mostly lookups.
+    The search deepens one decision at a time until budget seconds are
+    up, and answers with the deepest search that finished, so a smarter
+    monster never holds up a server turn for longer than that.
+
+    MonteCarloAI is for the player's side instead of Character's input()
+    prompt (soak tests, auto-battle in GameEngine.combat()).  It plays
+    whole fights out on copies of the two combatants with the real
+    attack/heal/flee rules, as many as its rollout budget allows, and
+    keeps its search tree between turns.  Fewer rollouts mean faster, and
+    worse, decisions; decisionsPerSecond tells you how fast.
+'''
+import abc
+import copy
+import math
+import time
+from dice import Dice
+from monster import CompactMonster
+from odds import profile, odds_for
+
+WIN = 1.0
+LOSS = 0.0
+
+class OutOfTime(Exception):
+    ''' the search went past its deadline '''
+
+class CombatAI(abc.ABC):
+    ''' picks a combat action from the state of the fight '''
+
+    @abc.abstractmethod
+    def choose(self, me, enemy):
+        ''' "a", "h" or "f" for me, fighting enemy '''
+
+    def against(self, enemy):
+        ''' a chooser for fight() and friends, for whoever fights enemy '''
+        return lambda me: self.choose(me, enemy)
+
+class RolledAI(CombatAI):
+    ''' the old way: the combatant's own combat_choice() for Monsters,
+        always attack for plain Characters '''
+
+    def choose(self, me, enemy):
+        if isinstance(me, CompactMonster):
+            return me.combat_choice()
+        return "a"
+
+class TranspositionTable(object):
+    ''' a dictionary that forgets the least recently used entries once it
+        holds size of them '''
+
+    def __init__(self, size = 200000):
+        self.size = size
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        ''' the value for key, or None '''
+        entries = self.entries
+        value = entries.pop(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entries[key] = value        # most recently used goes last
+        return value
+
+    def put(self, key, value):
+        entries = self.entries
+        if len(entries) >= self.size:
+            del entries[next(iter(entries))]
+        entries[key] = value
+
+    def __len__(self):
+        return len(self.entries)
+
+class Matchup(object):
+    ''' what the search needs about me against one enemy '''
+    __slots__ = ('number', 'actions', 'enemy', 'sides', 'turn', 'outcomes',
+                 'meFirst', 'myPace', 'theirPace', 'myHeal', 'theirHeal')
+
+    def __init__(self, number, odds):
+        self.number = number    # short stand-in for the profiles in keys
+        me = odds.one
+        enemy = odds.two
+        # odds.DuelOdds.turn() sides: my three actions, then the enemy
+        self.sides = tuple(dict(me, attack = float(choice == "a"),
+                                heal = float(choice == "h"),
+                                flee = float(choice == "f"))
+                           for choice in ("a", "h", "f")) + (enemy,)
+        self.actions = ((0, "a"), (1, "h"), (2, "f"))
+        self.enemy = 3
+        self.turn = odds.turn
+        self.outcomes = {}
+        self.meFirst = odds.oneFirst
+        # average damage a round, and average potion, for each side
+        self.myPace = me["hit"] * sum(amount * p
+                                      for amount, p in me["damage"])
+        self.theirPace = (enemy["attack"] * enemy["hit"] *
+                          sum(amount * p for amount, p in enemy["damage"]))
+        self.myHeal = sum(amount * p for amount, p in me["heals"])
+        self.theirHeal = sum(amount * p for amount, p in enemy["heals"])
+
+    def moves(self, side, myHealth, theirHealth, myPotions):
+        ''' turn() for sides[side], worked out once per position '''
+        key = (side, myHealth, theirHealth, myPotions)
+        found = self.outcomes.get(key)
+        if found is None:
+            found = self.outcomes[key] = self.turn(self.sides[side], myHealth,
+                                                   theirHealth, myPotions)
+        return found
+
+class ExpectimaxAI(CombatAI):
+    ''' lookahead over the duel, see the module doc
+
+        depth is how many of its own decisions it looks ahead at most,
+        budget the seconds one decision may take, tableSize the size of
+        the transposition table.  fled is what a fight that ends with
+        somebody running away is worth, between LOSS (0) and WIN (1).'''
+
+    def __init__(self, depth = 6, budget = 0.002, tableSize = 200000,
+                 fled = 0.5, clock = time.perf_counter):
+        self.depth = depth
+        self.budget = budget
+        self.fled = fled
+        self.clock = clock
+        self.table = TranspositionTable(tableSize)
+        self.matchups = TranspositionTable(256)
+        self.made = 0           # matchups made, for their numbers
+        self.decisions = 0
+        self.reached = 0        # depths of the searches that finished
+        self.deadline = None
+
+    def matchup(self, me, enemy):
+        key = (profile(me), profile(enemy))
+        found = self.matchups.get(key)
+        if found is None:
+            self.made += 1
+            found = Matchup(self.made, odds_for(key[0], key[1]))
+            self.matchups.put(key, found)
+        return found
+
+    def choose(self, me, enemy):
+        ''' the best action for me against enemy that budget allows
+
+            fight() doesn't say who won initiative this round, so both
+            are weighed by how likely they are.'''
+        matchup = self.matchup(me, enemy)
+        state = (me.health, enemy.health, me.potionCount, enemy.potionCount)
+        self.deadline = self.clock() + self.budget
+        self.decisions += 1
+        choice = "a"
+        for depth in range(1, self.depth + 1):
+            try:
+                choice = self.best(matchup, state, depth, None)[1]
+            except OutOfTime:
+                break
+            self.reached += 1
+        return choice
+
+    def best(self, matchup, state, depth, meFirst):
+        ''' (value, action) of my best action from state, looking depth
+            decisions ahead.  meFirst says whether I won initiative this
+            round (so the enemy still has its turn), None if not known.'''
+        if self.clock() > self.deadline:
+            raise OutOfTime()
+        myHealth, theirHealth, myPotions, theirPotions = state
+        bestValue, bestChoice = -1.0, "a"
+        for side, choice in matchup.actions:
+            if choice == "h" and not myPotions:
+                continue    # a wasted turn, attacking is never worse
+            value = 0.0
+            for p, health, enemyHealth, potions, end in matchup.moves(
+                    side, myHealth, theirHealth, myPotions):
+                if end == "won":
+                    value += p * WIN
+                elif end == "fled":
+                    value += p * self.fled
+                else:
+                    value += p * self.after_mine(
+                        matchup, (health, enemyHealth, potions, theirPotions),
+                        depth, meFirst)
+            if value > bestValue:
+                bestValue, bestChoice = value, choice
+        return bestValue, bestChoice
+
+    def after_mine(self, matchup, state, depth, meFirst):
+        ''' what state is worth right after my action '''
+        if meFirst:
+            return self.enemy_turn(matchup, state, depth, True)
+        elif meFirst is not None:
+            return self.new_round(matchup, state, depth)
+        first = matchup.meFirst
+        return (first * self.enemy_turn(matchup, state, depth, True) +
+                (1 - first) * self.new_round(matchup, state, depth))
+
+    def value(self, matchup, state, depth, meFirst):
+        ''' what state is worth when it is my turn, from the table if it
+            has been worked out before '''
+        key = (matchup.number, state, depth, meFirst)
+        found = self.table.get(key)
+        if found is None:
+            found = self.best(matchup, state, depth, meFirst)[0]
+            self.table.put(key, found)
+        return found
+
+    def enemy_turn(self, matchup, state, depth, meFirst):
+        ''' the enemy acts on state; if I went first the round ends '''
+        myHealth, theirHealth, myPotions, theirPotions = state
+        value = 0.0
+        for p, enemyHealth, health, potions, end in matchup.moves(
+                matchup.enemy, theirHealth, myHealth, theirPotions):
+            if end == "won":
+                value += p * LOSS
+            elif end == "fled":
+                value += p * self.fled
+            else:
+                after = (health, enemyHealth, myPotions, potions)
+                if meFirst:
+                    value += p * self.new_round(matchup, after, depth)
+                else:
+                    value += p * self.value(matchup, after, depth, False)
+        return value
+
+    def new_round(self, matchup, state, depth):
+        ''' initiative is rolled, and one decision less is left '''
+        depth -= 1
+        if depth == 0:
+            return self.estimate(matchup, state)
+        key = (matchup.number, state, depth, "round")
+        value = self.table.get(key)
+        if value is None:
+            meFirst = matchup.meFirst
+            value = meFirst * self.value(matchup, state, depth, True)
+            if meFirst < 1:
+                value += (1 - meFirst) * self.enemy_turn(matchup, state,
+                                                         depth, False)
+            self.table.put(key, value)
+        return value
+
+    def estimate(self, matchup, state):
+        ''' how good state looks without looking further: the share of
+            the rounds each side needs to finish the other off that are
+            mine, counting potions as the health they heal on average '''
+        myHealth, theirHealth, myPotions, theirPotions = state
+        myPace, theirPace = matchup.myPace, matchup.theirPace
+        if not myPace and not theirPace:
+            return self.fled
+        if not myPace:
+            return LOSS
+        if not theirPace:
+            return WIN
+        myRounds = (theirHealth + theirPotions * matchup.theirHeal) / myPace
+        theirRounds = (myHealth + myPotions * matchup.myHeal) / theirPace
+        return theirRounds / (myRounds + theirRounds)
+
+class Node(object):
+    ''' one position of MonteCarloAI's tree: visits and total reward of
+        each action, in ACTIONS order '''
+    __slots__ = ('visits', 'counts', 'totals')
+
+    def __init__(self):
+        self.visits = 0
+        self.counts = [0, 0, 0]
+        self.totals = [0.0, 0.0, 0.0]
+
+    def select(self, explore, canHeal):
+        ''' the action to try next: untried ones first, then UCB1 '''
+        counts = self.counts
+        best, bestScore = 0, -1.0
+        spread = explore * math.sqrt(math.log(self.visits + 1))
+        for action in range(3):
+            if action == 1 and not canHeal:
+                continue
+            if not counts[action]:
+                return action
+            score = (self.totals[action] / counts[action] +
+                     spread / math.sqrt(counts[action]))
+            if score > bestScore:
+                best, bestScore = action, score
+        return best
+
+ACTIONS = ("a", "h", "f")
+
+class MonteCarloAI(CombatAI):
+    ''' Monte Carlo tree search, meant for the player's side
+
+        every decision plays rollouts fights out to the end (or stops
+        after budget seconds, if that comes first).  They are played on
+        copies of the two combatants, rolling with the AI's own dice, by
+        the real attack_event(), heal_event() and flee_event(), with the
+        enemy choosing like it would in the real fight.  Positions met on
+        the way (both healths, both potion counts) are the tree's nodes,
+        picked between with UCB1 (explore is its constant), one new one
+        added per rollout, and past the tree the rollout attacks, healing
+        below half health.  The tree is keyed by position and kept, in a
+        LRU table of treeSize nodes, so next turn's search (and the next
+        fight against the same kind of enemy) starts where this one left
+        off.
+
+        decisionsPerSecond says how fast it has been going; fewer rollouts
+        answer sooner and choose worse.'''
+
+    def __init__(self, rollouts = 200, budget = None, explore = 1.4,
+                 maxRounds = 100, fled = 0.5, treeSize = 100000, dice = None,
+                 clock = time.perf_counter):
+        self.rollouts = rollouts
+        self.budget = budget
+        self.explore = explore
+        self.maxRounds = maxRounds
+        self.fled = fled
+        self.dice = Dice() if dice is None else dice
+        self.clock = clock
+        self.tree = TranspositionTable(treeSize)
+        self.matchups = TranspositionTable(256)
+        self.made = 0
+        self.decisions = 0
+        self.played = 0         # rollouts, over all decisions
+        self.seconds = 0.0
+
+    @property
+    def decisionsPerSecond(self):
+        return self.decisions / self.seconds if self.seconds else 0.0
+
+    def matchup(self, me, enemy):
+        ''' a short number standing for the two profiles in tree keys '''
+        key = (profile(me), profile(enemy))
+        number = self.matchups.get(key)
+        if number is None:
+            self.made += 1
+            number = self.made
+            self.matchups.put(key, number)
+        return number
+
+    def clone(self, combatant):
+        ''' a copy to play rollouts with, rolling the AI's dice '''
+        twin = copy.copy(combatant)
+        twin.dice = self.dice
+        return twin
+
+    def choose(self, me, enemy):
+        ''' the action most rollouts went through from here '''
+        start = self.clock()
+        number = self.matchup(me, enemy)
+        mine, theirs = self.clone(me), self.clone(enemy)
+        # plain Characters would ask for input(), they attack instead
+        enemyAI = isinstance(enemy, CompactMonster)
+        played = 0
+        while played < self.rollouts:
+            if self.budget is not None and \
+               self.clock() - start > self.budget:
+                break
+            mine.health, theirs.health = me.health, enemy.health
+            mine.potions, theirs.potions = me.potions[:], enemy.potions[:]
+            self.rollout(number, mine, theirs, enemyAI)
+            played += 1
+        node = self.tree.get((number, (me.health, enemy.health,
+                                       me.potionCount, enemy.potionCount)))
+        choice = "a"
+        if node is not None:
+            counts = node.counts
+            choice = ACTIONS[max(range(3), key = lambda action:
+                                 counts[action])]
+        self.decisions += 1
+        self.played += played
+        self.seconds += self.clock() - start
+        return choice
+
+    def rollout(self, number, mine, theirs, enemyAI):
+        ''' plays one fight out from the copies, and backs its reward up
+            the tree nodes it went through '''
+        tree = self.tree
+        roll = self.dice.roll
+        path = []
+        growing = True
+        # fight() doesn't say who won initiative this round, roll for it
+        meFirst = roll(20) + mine.speed >= roll(20) + theirs.speed
+        reward = None
+        rounds = 0
+        while True:
+            if growing:
+                key = (number, (mine.health, theirs.health,
+                                len(mine.potions), len(theirs.potions)))
+                node = tree.get(key)
+                if node is None:
+                    node = Node()
+                    tree.put(key, node)
+                    growing = False
+                action = node.select(self.explore, mine.potions)
+                path.append((node, action))
+                choice = ACTIONS[action]
+            elif mine.potions and mine.health * 2 <= mine.maxHealth:
+                choice = "h"
+            else:
+                choice = "a"
+            reward = self.act(mine, theirs, choice, WIN)
+            if reward is None and meFirst:
+                reward = self.act(theirs, mine, self.enemy_choice(
+                    theirs, enemyAI), LOSS)
+            if reward is not None:
+                break
+            rounds += 1
+            if rounds >= self.maxRounds:
+                reward = self.fled      # nobody is winning this one
+                break
+            meFirst = roll(20) + mine.speed >= roll(20) + theirs.speed
+            if not meFirst:
+                reward = self.act(theirs, mine, self.enemy_choice(
+                    theirs, enemyAI), LOSS)
+                if reward is not None:
+                    break
+        for node, action in path:
+            node.visits += 1
+            node.counts[action] += 1
+            node.totals[action] += reward
+        return reward
+
+    def enemy_choice(self, enemy, enemyAI):
+        return enemy.combat_choice() if enemyAI else "a"
+
+    def act(self, actor, target, choice, killed):
+        ''' actor does choice to target with the real rules; the reward
+            if that ends the fight (killed if target dies), else None '''
+        if choice == "f":
+            if actor.flee_event().success:
+                return self.fled
+        elif choice == "h":
+            actor.heal_event()
+        else:
+            actor.attack_event(target)
+            if target.health <= 0:
+                return killed
+        return None
+
+# name: CombatAI class, for command lines and servers
+AIS = {"rolled": RolledAI, "expectimax": ExpectimaxAI,
+       "mcts": MonteCarloAI}
+
+if __name__ == "__main__":
+    from character import Character
+    from monster import Orc
+    from events import fight
+    from simulator import always_attack
+    fledScore = 0.5
+    count = 2000
+
+    def duels(oneChoice, twoChoice, count):
+        ''' how count orc vs hero fights end, for the orc '''
+        dice = Dice(1)
+        ends = {"won": 0, "lost": 0, "fled": 0}
+        for i in range(count):
+            hero = Character(dice = dice)
+            orc = Orc(dice = dice)
+            for event in fight(orc, hero, oneChoice(hero), twoChoice(orc),
+                               dice = dice):
+                pass
+            if hero.health <= 0:
+                ends["won"] += 1
+            elif orc.health <= 0:
+                ends["lost"] += 1
+            else:
+                ends["fled"] += 1
+        return ends
+
+    print("monster side, against an always attacking hero:")
+    for name, ai in (("rolled", RolledAI()), ("expectimax", ExpectimaxAI())):
+        start = time.time()
+        ends = duels(ai.against, lambda orc: always_attack, count)
+        score = (ends["won"] + fledScore * ends["fled"]) / count
+        print("  %-10s orc %s, scoring %.3f, %.2f seconds" %
+              (name, ends, score, time.time() - start))
+    print("  %d decisions, average depth %.1f, table %d entries, %d hits,"
+          " %d misses" % (ai.decisions, ai.reached / ai.decisions,
+                          len(ai.table), ai.table.hits, ai.table.misses))
+
+    print("player side, against a rolled orc:")
+    rolled = RolledAI()
+    ends = duels(rolled.against, lambda orc: always_attack, count)
+    print("  always attack   hero lost %4.1f%%, fights fled %4.1f%%" %
+          (100.0 * ends["won"] / count, 100.0 * ends["fled"] / count))
+    for rollouts in (25, 100, 400):
+        ai = MonteCarloAI(rollouts, dice = Dice(2))
+        ends = duels(rolled.against, ai.against, count // 4)
+        print("  mcts %4d       hero lost %4.1f%%, fights fled %4.1f%%, "
+              "%.0f decisions a second" %
+              (rollouts, 400.0 * ends["won"] / count,
+               400.0 * ends["fled"] / count, ai.decisionsPerSecond))
@@ -0,0 +1,85 @@
+# dice.py
+# Talon H.
+# 10/18/2026
+
+''' seedable streams of dice rolls
+
+    everything that rolls dice (attacks, damage, potions, fleeing, monster
+    AI, character creation) takes its rolls from a Dice stream instead of
+    the random module.  Characters keep the stream they were made with in
+    their dice attribute, and anything not given a stream uses DEFAULT_DICE.
+
+    so to replay a whole campaign roll for roll:
+        dice.seed(42)
+    before anything else happens, or hand everything the same Dice(42).
+
+    rolls are drawn in bulk: the first d20 a stream rolls draws a buffer
+    of BUFFER_SIZE d20s, and the next rolls are just popped off it.  That
+    is a lot cheaper than one random.randint() call per die.  The same seed
+    and the same sequence of rolls always give the same results.
+
+    split() hands out independent child streams, one per parallel worker.
+    They come from a splitting stream of their own, so rolling dice never
+    changes which children a split gives, and splitting never changes the
+    rolls.
+'''
+import random
+
+BUFFER_SIZE = 1024
+
+class Dice(object):
+    ''' one reproducible stream of dice rolls '''
+    __slots__ = ('random', 'splitter', 'buffers', 'bufferSize')
+
+    def __init__(self, seed = None, bufferSize = BUFFER_SIZE):
+        self.random = random.Random(seed)
+        self.splitter = self.new_splitter()
+        self.buffers = {}
+        self.bufferSize = bufferSize
+
+    def new_splitter(self):
+        ''' the stream split() seeds children from: a copy of the fresh
+            roll stream, which the rolls themselves never touch '''
+        splitter = random.Random()
+        splitter.setstate(self.random.getstate())
+        return splitter
+
+    def seed(self, seed = None):
+        ''' restarts the stream, throwing away any buffered rolls '''
+        self.random.seed(seed)
+        self.splitter = self.new_splitter()
+        self.buffers.clear()
+
+    def batch(self, sides, count):
+        ''' count rolls of a die with sides sides, as a list '''
+        return self.random.choices(range(1, sides + 1), k = count)
+
+    def roll(self, sides):
+        ''' one roll of a die with sides sides (1 to sides) '''
+        buffer = self.buffers.get(sides)
+        if not buffer:
+            buffer = self.buffers[sides] = self.batch(sides, self.bufferSize)
+        return buffer.pop()
+
+    def randint(self, a, b):
+        ''' a random integer from a to b, like random.randint '''
+        return a - 1 + self.roll(b - a + 1)
+
+    def choice(self, sequence):
+        ''' a random element of sequence, like random.choice '''
+        return sequence[self.roll(len(sequence)) - 1]
+
+    def split(self, count):
+        ''' count new independent streams, seeded from this one
+
+            the children only depend on this stream's seed and on how many
+            children it has split off before (not on any rolls), so workers
+            handed the same children always roll the same dice.'''
+        return [Dice(self.splitter.getrandbits(64), self.bufferSize)
+                for i in range(count)]
+
+DEFAULT_DICE = Dice()
+
+def seed(value = None):
+    ''' reseeds DEFAULT_DICE, which everything uses unless told otherwise '''
+    DEFAULT_DICE.seed(value)
@@ -0,0 +1,247 @@
+# encounter.py
+# Talon H.
+# 10/18/2026
+
+''' battles between any number of combatants on any number of teams
+
+    combat() is strictly one on one.  An Encounter takes whole parties and
+    hordes, split into teams, and runs them under the same rules: every
+    round each combatant rolls 1d20 + speed for initiative, the highest
+    goes first (ties go to whoever joined first), and on its turn each one
+    attacks, heals or flees just like in combat().
+
+    the turn order of a round is a heap, so getting the next combatant is
+    O(log n).  Dead or fled combatants are only marked as out; they are
+    dropped from the heap when they come up, and taken out of their team
+    with a swap, so nothing is ever rebuilt mid-round.
+
+    who gets attacked is up to a targeting policy, a function
+        policy(encounter, attacker) -> target
+    random_target, first_target and weakest_target are included.  The
+    weakest target comes from a per-team heap of health values that is
+    only fixed up when it is looked at, so it is O(log n) as well.
+
+    the fight is a stream of events from events.py (no Initiative events,
+    everything else is the same), so it can be printed with
+    events.print_message or counted like simulator.bout() does.
+
+    each turn goes through take_turn(), which hands it to flee(), heal() or
+    attack(); subclasses change how a battle plays by overriding those
+    (arena.TacticalEncounter walks up to its target before attacking).
+'''
+import heapq
+from dice import DEFAULT_DICE
+from events import RoundStart, Death
+from simulator import choice_for
+
+class Entry(object):
+    ''' one combatant in an encounter '''
+    __slots__ = ('character', 'team', 'order', 'active', 'position',
+                 'choose')
+
+    def __init__(self, character, team, order, choose):
+        self.character = character
+        self.team = team
+        self.order = order      # join order, breaks initiative ties
+        self.active = True
+        self.position = 0       # where it is in its team's list
+        self.choose = choose
+
+def random_target(encounter, attacker):
+    ''' any enemy, all equally likely '''
+    enemies = encounter.enemy_count(attacker.team)
+    pick = encounter.dice.roll(enemies) - 1
+    for team, members in encounter.teams.items():
+        if team == attacker.team:
+            continue
+        if pick < len(members):
+            return members[pick]
+        pick -= len(members)
+
+def first_target(encounter, attacker):
+    ''' the first enemy in the first enemy team, cheapest of all '''
+    for team, members in encounter.teams.items():
+        if team != attacker.team and members:
+            return members[0]
+
+def weakest_target(encounter, attacker):
+    ''' the enemy with the least health left '''
+    best = None
+    for team in encounter.teams:
+        if team != attacker.team:
+            entry = encounter.weakest(team)
+            if entry is not None and (best is None or
+                                      entry.character.health <
+                                      best.character.health):
+                best = entry
+    return best
+
+class Encounter(object):
+    ''' a battle between teams of Characters and Monsters '''
+
+    def __init__(self, teams = None, target = random_target, dice = None):
+        ''' teams is a dictionary {team name: list of combatants}
+
+            target is the targeting policy.  Initiative and random targets
+            are rolled with dice, DEFAULT_DICE if not given; everything
+            else uses the combatants' own dice.'''
+        if dice is None:
+            dice = DEFAULT_DICE
+        self.dice = dice
+        self.target = target
+        self.teams = {}
+        self.fled = {}
+        self.health = {}        # team name: heap of (health, order, entry)
+        self.joined = 0
+        self.rounds = 0
+        if teams is not None:
+            for team, members in teams.items():
+                for character in members:
+                    self.add(character, team)
+
+    def add(self, character, team, choose = None):
+        ''' puts a combatant in, choose works like simulator.choice_for '''
+        entry = Entry(character, team, self.joined,
+                      choice_for(character, choose))
+        self.joined += 1
+        members = self.teams.setdefault(team, [])
+        self.fled.setdefault(team, 0)
+        entry.position = len(members)
+        members.append(entry)
+        self.track(entry)
+        return entry
+
+    def remove(self, entry):
+        ''' takes a dead or fled combatant out, swapping in the team's last
+        '''
+        entry.active = False
+        members = self.teams[entry.team]
+        last = members.pop()
+        if last is not entry:
+            members[entry.position] = last
+            last.position = entry.position
+
+    def track(self, entry):
+        ''' notes entry's current health for weakest_target '''
+        heap = self.health.setdefault(entry.team, [])
+        heapq.heappush(heap, (entry.character.health, entry.order, entry))
+
+    def weakest(self, team):
+        ''' the member of team with the least health, or None '''
+        heap = self.health.get(team)
+        while heap:
+            health, order, entry = heap[0]
+            if entry.active and entry.character.health == health:
+                return entry
+            heapq.heappop(heap)     # out of date, throw it away
+        return None
+
+    def enemy_count(self, team):
+        ''' how many combatants are not on team '''
+        return sum(len(members) for name, members in self.teams.items()
+                   if name != team)
+
+    def teams_left(self):
+        ''' names of the teams that still have somebody standing '''
+        return [team for team, members in self.teams.items() if members]
+
+    @property
+    def over(self):
+        return len(self.teams_left()) <= 1
+
+    def turn_order(self):
+        ''' this round's initiative heap '''
+        everyone = [entry for members in self.teams.values()
+                    for entry in members]
+        rolls = self.dice.batch(20, len(everyone))
+        heap = [(-(roll + entry.character.speed), entry.order, entry)
+                for roll, entry in zip(rolls, everyone)]
+        heapq.heapify(heap)
+        return heap
+
+    def play_round(self):
+        ''' generator: the events of one round '''
+        self.rounds += 1
+        yield RoundStart(self.rounds)
+        for members in self.teams.values():
+            for entry in members:
+                entry.character.tick()
+        heap = self.turn_order()
+        while heap and not self.over:
+            entry = heapq.heappop(heap)[2]
+            if not entry.active:
+                continue
+            for event in self.take_turn(entry):
+                yield event
+
+    def take_turn(self, entry):
+        ''' generator: the events of one combatant's turn '''
+        choice = entry.choose(entry.character)
+        if choice == "f":
+            return self.flee(entry)
+        elif choice == "h":
+            return self.heal(entry)
+        else:
+            return self.attack(entry)
+
+    def flee(self, entry):
+        ''' tries to run, and leaves the encounter if it works '''
+        event = entry.character.flee_event()
+        yield event
+        if event.success:
+            self.fled[entry.team] += 1
+            self.remove(entry)
+
+    def heal(self, entry):
+        ''' drinks a potion '''
+        event = entry.character.heal_event()
+        yield event
+        if event.success:
+            self.track(entry)
+
+    def attack(self, entry):
+        ''' attacks whoever the targeting policy picks '''
+        target = self.target(self, entry)
+        return self.strike(entry, target)
+
+    def strike(self, entry, target):
+        ''' entry attacks target '''
+        before = target.character.health
+        yield entry.character.attack_event(target.character)
+        if target.character.health <= 0:
+            yield Death(target.character)
+            self.remove(target)
+        elif target.character.health != before:
+            # a miss leaves the heap entry that is there up to date
+            self.track(target)
+
+    def fight(self, maxRounds = None):
+        ''' generator: every event until one team is left (or maxRounds) '''
+        while not self.over:
+            if maxRounds is not None and self.rounds >= maxRounds:
+                return
+            for event in self.play_round():
+                yield event
+
+    def run(self, maxRounds = None):
+        ''' fights it out silently, returns a summary dictionary
+
+            winner is the last team standing (None if nobody, or out of
+            rounds), survivors and fled count combatants per team.'''
+        for event in self.fight(maxRounds):
+            pass
+        left = self.teams_left()
+        return {"winner": left[0] if len(left) == 1 else None,
+                "rounds": self.rounds,
+                "survivors": {team: len(members)
+                              for team, members in self.teams.items()},
+                "fled": dict(self.fled)}
+
+if __name__ == "__main__":
+    import time
+    from monster import Character, Orc
+    heroes = [Character(name = "Hero %d" % i) for i in range(1000)]
+    orcs = [Orc(name = "Orc %d" % i) for i in range(2000)]
+    start = time.time()
+    print(Encounter({"heroes": heroes, "orcs": orcs}).run())
+    print("%.2f seconds" % (time.time() - start))
@@ -0,0 +1,245 @@
+# events.py
+# Talon H.
+# 10/18/2026
+
+''' combat as a stream of events
+
+    fight() runs a fight under the rules of GameEngine.combat(), but
+    instead of printing it yields one event object for everything that
+    happens: a round starting, initiative, every attack (a Hit, Miss or
+    Fumble), heals, flee attempts and deaths.  Events only hold numbers and
+    references to the combatants.  The text you used to see is built by
+    the message property, and only when somebody asks for it, so headless
+    runs never build a single string.
+
+    consumers either loop over fight() themselves, or hand the stream to
+    publish() with any number of subscribers (functions taking an event).
+    GameEngine.combat() is just fight() with print_message as subscriber.
+
+    a choice function can also hand the decision back to whoever runs the
+    fight: if it returns a Prompt (the prompt() choice does), fight()
+    yields it and waits for the action to be sent in with send().  That
+    is how server.py waits on players over the network without blocking
+    anybody else.  A plain for loop sends None, which attacks.
+
+    every event has:
+        kind    - "round", "initiative", "hit", "miss", "fumble", "heal",
+                  "flee", "death", "move" or "prompt"
+        success - same meaning as the first value the action methods return
+        message - the text, or None for events that print nothing
+'''
+from dice import DEFAULT_DICE
+
+class Event(object):
+    ''' base class for everything that happens in a fight '''
+    __slots__ = ()
+    kind = "event"
+    success = True
+
+    @property
+    def message(self):
+        ''' the text for this event, built on demand '''
+        return None
+
+    def __str__(self):
+        return self.message or ""
+
+class RoundStart(Event):
+    ''' a new round begins '''
+    __slots__ = ('round',)
+    kind = "round"
+
+    def __init__(self, round):
+        self.round = round
+
+    @property
+    def message(self):
+        return "\nRound " + str(self.round) + " begins..."
+
+class Initiative(Event):
+    ''' who goes first this round, and the rolls that decided it '''
+    __slots__ = ('first', 'second', 'firstRoll', 'secondRoll')
+    kind = "initiative"
+
+    def __init__(self, first, second, firstRoll, secondRoll):
+        self.first = first
+        self.second = second
+        self.firstRoll = firstRoll
+        self.secondRoll = secondRoll
+
+class Attack(Event):
+    ''' base class for the three ways an attack can go '''
+    __slots__ = ('attacker', 'target', 'roll')
+
+    def __init__(self, attacker, target, roll):
+        self.attacker = attacker
+        self.target = target
+        self.roll = roll
+
+class Fumble(Attack):
+    ''' a natural 1 '''
+    __slots__ = ()
+    kind = "fumble"
+    success = False
+
+    @property
+    def message(self):
+        return self.attacker.name + "fumbles their attack!"
+
+class Miss(Attack):
+    ''' the attack didn't beat the target's AC '''
+    __slots__ = ()
+    kind = "miss"
+    success = False
+
+    @property
+    def message(self):
+        return self.attacker.name + " misses " + self.target.name + "."
+
+class Hit(Attack):
+    ''' the attack landed for damage points '''
+    __slots__ = ('damage',)
+    kind = "hit"
+
+    def __init__(self, attacker, target, roll, damage):
+        super(Hit, self).__init__(attacker, target, roll)
+        self.damage = damage
+
+    @property
+    def message(self):
+        return self.attacker.name + " hits " + self.target.name +\
+               " and does " + str(self.damage) + " damage."
+
+class Heal(Event):
+    ''' a potion was drunk (amount healed), or there were none (None) '''
+    __slots__ = ('character', 'amount')
+    kind = "heal"
+
+    def __init__(self, character, amount):
+        self.character = character
+        self.amount = amount
+
+    @property
+    def success(self):
+        return self.amount is not None
+
+    @property
+    def message(self):
+        if self.amount is None:
+            return self.character.name + " has no potions!"
+        return self.character.name + " drinks a potion, and heals " +\
+               str(self.amount) + " points."
+
+class Flee(Event):
+    ''' an attempt to run away '''
+    __slots__ = ('character', 'success')
+    kind = "flee"
+
+    def __init__(self, character, success):
+        self.character = character
+        self.success = success
+
+    @property
+    def message(self):
+        if self.success:
+            return "When danger reared it's ugly head,\n" +\
+                   self.character.name + " bravely turned and fled!"
+        return self.character.name + " tried to flee, but couldn't get away!"
+
+class Death(Event):
+    ''' somebody's health hit 0 '''
+    __slots__ = ('character',)
+    kind = "death"
+
+    def __init__(self, character):
+        self.character = character
+
+    @property
+    def message(self):
+        return self.character.name + " is Dead!"
+
+class Move(Event):
+    ''' somebody walked from one tile to another (see arena.py) '''
+    __slots__ = ('character', 'start', 'end')
+    kind = "move"
+
+    def __init__(self, character, start, end):
+        self.character = character
+        self.start = start
+        self.end = end
+
+    @property
+    def message(self):
+        return self.character.name + " moves."
+
+class Prompt(Event):
+    ''' fight() is waiting for character's action, send() it in '''
+    __slots__ = ('character',)
+    kind = "prompt"
+
+    def __init__(self, character):
+        self.character = character
+
+def ask(combatant):
+    ''' default way to choose: the combatant's own combat_choice() '''
+    return combatant.combat_choice()
+
+def prompt(combatant):
+    ''' way to choose that asks whoever is running fight(), see Prompt '''
+    return Prompt(combatant)
+
+def fight(one, two, oneChoice = ask, twoChoice = ask, maxRounds = None,
+          dice = None):
+    ''' generator: the events of a fight between one and two
+
+        oneChoice and twoChoice pick each side's action ("a", "h", "f"),
+        and default to the combatants' own combat_choice().  Initiative is
+        rolled with dice, DEFAULT_DICE if not given.  The fight stops when
+        somebody dies or flees, or after maxRounds rounds if that is not
+        None.'''
+    if dice is None:
+        dice = DEFAULT_DICE
+    rounds = 0
+    while maxRounds is None or rounds < maxRounds:
+        rounds += 1
+        yield RoundStart(rounds)
+        one.tick() # timed buffs and effects run out at the start of a round
+        two.tick()
+        oneInit = dice.roll(20) + one.speed
+        twoInit = dice.roll(20) + two.speed
+        if oneInit >= twoInit:
+            yield Initiative(one, two, oneInit, twoInit)
+            order = ((one, two, oneChoice), (two, one, twoChoice))
+        else:
+            yield Initiative(two, one, twoInit, oneInit)
+            order = ((two, one, twoChoice), (one, two, oneChoice))
+        for current, target, choose in order:
+            choice = choose(current)
+            if isinstance(choice, Prompt):
+                choice = yield choice
+            if choice == "f":
+                event = current.flee_event()
+                yield event
+                if event.success: #Fleeing ends combat
+                    return
+            elif choice == "h":
+                yield current.heal_event()
+            else:
+                yield current.attack_event(target)
+                if target.health <= 0: #combat ends if the enemy dies
+                    yield Death(target)
+                    return
+
+def publish(events, *subscribers):
+    ''' hands every event to every subscriber, returns the last event '''
+    event = None
+    for event in events:
+        for subscriber in subscribers:
+            subscriber(event)
+    return event
+
+def print_message(event):
+    ''' subscriber that prints what combat() always printed '''
+    message = event.message
+    if message is not None:
+        print(message)
@@ -0,0 +1,362 @@
+# inventory.py
+# Talon H.
+# 10/18/2026
+
+''' stacked inventories: counts of items instead of lists of them
+
+    a character used to carry one Potion object per potion, and an
+    inventory that was a plain list of copied lists.  Counting potions,
+    listing them, looting a body or trading all meant walking (or copying)
+    those lists one entry at a time, and a dragon's hoard of ten thousand
+    potions was ten thousand objects.
+
+    now identical items are one Stack: the item, and how many of it there
+    are.  Items are identical when they are the same class with the same
+    name, base and bonus (see key()).
+
+    Pouch is what character.potions holds: stacks in the order they were
+    added, used from the top, last in first out like the old list.  It
+    still looks like that list (len(), potions[-1], pop(), append(),
+    iteration and potions[:] all work), but using, adding or removing a
+    potion is O(1), and moving a whole pile to another pouch is one
+    operation per stack, not per potion.
+
+    Inventory is what character.inventory holds (made the first time it
+    is used, most NPCs never carry anything): stacks of anything, found
+    by their key in O(1), and indexed by item name and by slot (what the
+    item is for: "weapon", "armor", "potion" or "misc").
+
+        hero.potions.add(Potion(), 10000)       # one stack, one Potion
+        hero.potions.transfer(orc.potions)      # loot every potion
+        hero.inventory.add(Weapon("Axe", 8), 3)
+        hero.inventory.in_slot("weapon")        # [Stack of 3 Axes]
+        hero.inventory.loot(orc.inventory)      # everything, at once
+'''
+from items import *
+
+SLOTS = ((CompactWeapon, "weapon"), (CompactArmor, "armor"),
+         (CompactPotion, "potion"))
+
+def key(item):
+    ''' what makes two items the same: class, name, base and bonus (a
+        shared catalog item is the same as an ordinary one like it) '''
+    cls = type(item)
+    return (getattr(cls, "plainClass", cls), item.name, item.base,
+            item.bonus)
+
+def slot_of(item):
+    ''' "weapon", "armor", "potion" or "misc" '''
+    for cls, slot in SLOTS:
+        if isinstance(item, cls):
+            return slot
+    return "misc"
+
+class Stack(object):
+    ''' count copies of one item, all sharing the one item object '''
+    __slots__ = ('item', 'count')
+
+    def __init__(self, item, count = 1):
+        self.item = item
+        self.count = count
+
+    def __repr__(self):
+        return "Stack(%s x%d)" % (self.item.name, self.count)
+
+class Pouch(object):
+    ''' a last-in first-out pile of stacks, looking like a list of items
+
+        the top stack is kept in the pouch itself (item and count), the
+        ones below it, if there are any, in a list of Stacks.  A pouch of
+        one kind of potion, which is nearly every pouch, is one small
+        object and no list.'''
+    __slots__ = ('item', 'count', 'below', 'total')
+
+    def __init__(self, item = None, count = 0):
+        ''' empty, or count of item '''
+        if item is not None and count > 0:
+            self.item = item
+            self.count = count
+            self.total = count
+        else:
+            self.item = None
+            self.count = 0
+            self.total = 0
+        self.below = None       # the Stacks under the top one, bottom first
+
+    def __len__(self):
+        return self.total
+
+    def __bool__(self):
+        return self.total > 0
+
+    def stacks(self):
+        ''' every Stack, bottom to top (new Stacks, changing them does
+            nothing to the pouch) '''
+        found = [Stack(stack.item, stack.count) for stack in self.below or ()]
+        if self.count:
+            found.append(Stack(self.item, self.count))
+        return found
+
+    def __iter__(self):
+        for stack in self.below or ():
+            for i in range(stack.count):
+                yield stack.item
+        for i in range(self.count):
+            yield self.item
+
+    def __getitem__(self, index):
+        ''' potions[-1] is the one on top, potions[:] a copy '''
+        if isinstance(index, slice):
+            if index == slice(None):
+                return self.copy()
+            return list(self)[index]
+        if index < 0:
+            index += self.total
+        if not 0 <= index < self.total:
+            raise IndexError("pouch index out of range")
+        if index >= self.total - self.count:     # the top, what heal() uses
+            return self.item
+        for stack in self.below:
+            if index < stack.count:
+                return stack.item
+            index -= stack.count
+        return self.item
+
+    def add(self, item, count = 1):
+        ''' puts count of item on top '''
+        if count <= 0:
+            return
+        if not self.count:
+            self.item = item
+            self.count = count
+        elif self.item is item or key(self.item) == key(item):
+            self.count += count
+        else:
+            if self.below is None:
+                self.below = []
+            self.below.append(Stack(self.item, self.count))
+            self.item = item
+            self.count = count
+        self.total += count
+
+    def append(self, item):
+        self.add(item)
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def next_stack(self):
+        ''' the top stack is used up, the one below (if any) goes on top '''
+        below = self.below
+        if below:
+            top = below.pop()
+            self.item, self.count = top.item, top.count
+            if not below:
+                self.below = None
+        else:
+            self.item = None
+
+    def pop(self):
+        ''' takes the item on top off, and returns it '''
+        if not self.total:
+            raise IndexError("pop from empty pouch")
+        item = self.item
+        self.count -= 1
+        self.total -= 1
+        if not self.count:
+            self.next_stack()
+        return item
+
+    def take(self, count = None):
+        ''' takes count items (all of them if None) off the top, as a new
+            Pouch in the same order '''
+        taken = Pouch()
+        if count is not None and count <= 0:
+            return taken
+        if count is None or count >= self.total:
+            taken.item, taken.count = self.item, self.count
+            taken.below, taken.total = self.below, self.total
+            self.item, self.count, self.below, self.total = None, 0, None, 0
+            return taken
+        moved = []
+        left = count
+        while left:
+            if self.count <= left:
+                moved.append(Stack(self.item, self.count))
+                left -= self.count
+                self.total -= self.count
+                self.count = 0
+                self.next_stack()
+            else:
+                moved.append(Stack(self.item, left))
+                self.count -= left
+                self.total -= left
+                left = 0
+        for stack in reversed(moved):
+            taken.add(stack.item, stack.count)
+        return taken
+
+    def transfer(self, other, count = None):
+        ''' moves count items (all if None) from the top of this pouch to
+            the top of other '''
+        for item, count in self.take(count).groups():
+            other.add(item, count)
+
+    def groups(self):
+        ''' (item, count) for every stack, bottom to top '''
+        found = [(stack.item, stack.count) for stack in self.below or ()]
+        if self.count:
+            found.append((self.item, self.count))
+        return found
+
+    def copy(self):
+        twin = Pouch(self.item, self.count)
+        if self.below is not None:
+            twin.below = [Stack(stack.item, stack.count)
+                          for stack in self.below]
+        twin.total = self.total
+        return twin
+
+    def __repr__(self):
+        return "Pouch(%r)" % (self.stacks(),)
+
+class Inventory(object):
+    ''' stacks of anything, indexed by key, name and slot '''
+    __slots__ = ('stacks', 'byName', 'bySlot', 'total')
+
+    def __init__(self, contents = ()):
+        ''' contents can hold items, (item, count) pairs, and the old
+            [name, count] lists (made into Items of that name) '''
+        self.stacks = {}        # key(): Stack
+        self.byName = {}        # name: {key(): Stack}
+        self.bySlot = {}        # slot: {key(): Stack}
+        self.total = 0
+        for entry in contents:
+            if isinstance(entry, CompactItem):
+                self.add(entry)
+            elif isinstance(entry[0], str):
+                self.add(Item(entry[0]), entry[1] if len(entry) > 1 else 1)
+            else:
+                self.add(entry[0], entry[1])
+
+    def __len__(self):
+        return self.total
+
+    def __bool__(self):
+        return self.total > 0
+
+    def __iter__(self):
+        ''' every Stack, in the order they were first added '''
+        return iter(list(self.stacks.values()))
+
+    def __contains__(self, item):
+        return key(item) in self.stacks
+
+    def add(self, item, count = 1):
+        ''' adds count of item, stacking it with any identical ones '''
+        if count <= 0:
+            return
+        itemKey = key(item)
+        stack = self.stacks.get(itemKey)
+        if stack is None:
+            stack = self.stacks[itemKey] = Stack(item, count)
+            self.byName.setdefault(item.name, {})[itemKey] = stack
+            self.bySlot.setdefault(slot_of(item), {})[itemKey] = stack
+        else:
+            stack.count += count
+        self.total += count
+
+    def remove(self, item, count = 1):
+        ''' takes count of item out, and returns the stack's item
+
+            raises ValueError if there aren't that many, like
+            list.remove() when the item isn't there.'''
+        itemKey = key(item)
+        stack = self.stacks.get(itemKey)
+        if stack is None or stack.count < count:
+            raise ValueError("not enough " + item.name + " to remove")
+        stack.count -= count
+        self.total -= count
+        if not stack.count:
+            del self.stacks[itemKey]
+            self.forget(itemKey, stack.item)
+        return stack.item
+
+    def forget(self, itemKey, item):
+        ''' drops an emptied stack from the indexes '''
+        for index, name in ((self.byName, item.name),
+                            (self.bySlot, slot_of(item))):
+            found = index[name]
+            del found[itemKey]
+            if not found:
+                del index[name]
+
+    def use(self, item):
+        ''' takes one of item out (say, to drink or equip it) '''
+        return self.remove(item, 1)
+
+    def count(self, item):
+        ''' how many of item there are '''
+        stack = self.stacks.get(key(item))
+        return 0 if stack is None else stack.count
+
+    def named(self, name):
+        ''' the stacks of items called name '''
+        return list(self.byName.get(name, {}).values())
+
+    def in_slot(self, slot):
+        ''' the stacks of "weapon", "armor", "potion" or "misc" items '''
+        return list(self.bySlot.get(slot, {}).values())
+
+    def transfer(self, other, item, count = None):
+        ''' moves count of item (all of them if None) to other '''
+        if count is None:
+            count = self.count(item)
+        if count:
+            other.add(self.remove(item, count), count)
+
+    def loot(self, other, slot = None):
+        ''' takes everything other has (or everything in slot) '''
+        if slot is None:
+            stacks = list(other.stacks.values())
+        else:
+            stacks = other.in_slot(slot)
+        for stack in stacks:
+            other.transfer(self, stack.item)
+
+    def clear(self):
+        self.stacks.clear()
+        self.byName.clear()
+        self.bySlot.clear()
+        self.total = 0
+
+    def copy(self):
+        twin = Inventory()
+        for stack in self.stacks.values():
+            twin.add(stack.item, stack.count)
+        return twin
+
+    def __repr__(self):
+        return "Inventory(%r)" % (list(self.stacks.values()),)
+
+if __name__ == "__main__":
+    import time
+    count = 1000000
+    start = time.time()
+    hoard = [Potion() for i in range(count)]
+    while hoard:
+        hoard.pop()
+    listed = time.time() - start
+    start = time.time()
+    pouch = Pouch(Potion(), count)
+    while pouch:
+        pouch.pop()
+    stacked = time.time() - start
+    print("%d potions made and drunk: list %.2f s, pouch %.2f s" %
+          (count, listed, stacked))
+    dragon, hero = Pouch(Potion(), count), Pouch()
+    start = time.time()
+    dragon.transfer(hero)
+    print("looting %d potions took %.1f us" %
+          (len(hero), (time.time() - start) * 1e6))
@@ -2,20 +2,35 @@
 # Thorin Schmidt
 # 11/17/2016
 
-''' base items for the game environment'''
-from random import randint
+''' base items for the game environment
+
+    every item comes in two flavours.  The Compact classes keep their
+    attributes in __slots__ and have no per-instance __dict__, which saves
+    a lot of memory when there are millions of them.  The regular classes
+    (Item, Weapon, Armor, Potion) are the same thing plus a __dict__, so
+    extra attributes can still be hung on them.
+
+    dice come from a dice.Dice stream, DEFAULT_DICE unless one is given.'''
+from dice import DEFAULT_DICE
+
+class CompactItem(object):
+    '''generic base class, slotted'''
+    __slots__ = ('name', 'base', 'bonus')
 
-class Item(object):
-    '''generic base class'''
     def __init__(self, name = "nameless thing", base = 0, bonus = 0):
         self.name = name
         self.base = base
         self.bonus = bonus
 
-class Weapon(Item):
-    '''generic weapon class'''
+class Item(CompactItem):
+    '''generic base class'''
+
+class CompactWeapon(CompactItem):
+    '''generic weapon class, slotted'''
+    __slots__ = ()
+
     def __init__(self, name = "Fists", base = 6, bonus = 0):
-        super(Weapon, self).__init__(name, base, bonus)
+        super(CompactWeapon, self).__init__(name, base, bonus)
 
     @property
     def attack(self):
@@ -23,24 +38,41 @@ class Weapon(Item):
 
     @property
     def damage(self):
-        return randint(1, self.base) + self.bonus
+        return self.roll_damage(DEFAULT_DICE)
+
+    def roll_damage(self, dice):
+        ''' damage for one hit, rolled with the given dice stream '''
+        return dice.roll(self.base) + self.bonus
+
+class Weapon(CompactWeapon, Item):
+    '''generic weapon class'''
+
+class CompactArmor(CompactItem):
+    '''generic armor class, slotted'''
+    __slots__ = ()
 
-class Armor(Item):
-    '''generic armor class'''
     def __init__(self, name = "Leather", base = 1, bonus = 0):
-        super(Armor, self).__init__(name, base, bonus)
+        super(CompactArmor, self).__init__(name, base, bonus)
 
     @property
     def defense(self):
         return self.base + self.bonus
 
-class Potion(Item):
-    '''generic healing potion class'''
+class Armor(CompactArmor, Item):
+    '''generic armor class'''
+
+class CompactPotion(CompactItem):
+    '''generic healing potion class, slotted'''
+    __slots__ = ()
+
     def __init__(self, name = "Cure Light", base = 8, bonus = 1):
-        super(Potion, self).__init__(name, base, bonus)
+        super(CompactPotion, self).__init__(name, base, bonus)
 
-    def use(self):
-        return randint(1, self.base) + self.bonus
+    def use(self, dice = DEFAULT_DICE):
+        return dice.roll(self.base) + self.bonus
+
+class Potion(CompactPotion, Item):
+    '''generic healing potion class'''
 
 if __name__ == "__main__":
     weapon = Weapon()
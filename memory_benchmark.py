@@ -0,0 +1,132 @@
+# memory_benchmark.py
+# Talon H.
+# 10/18/2026
+
+''' how many bytes does each character or item really cost?
+
+    builds a roster of each class, regular and Compact, and measures the
+    memory it took with tracemalloc.  Everything the entity owns is
+    counted (its potion list, weapon, armor...), so the numbers are the
+    real cost of one more NPC.
+
+    the "original" column is the classes as they were before any of the
+    memory work: plain __dict__ objects, every character with a Weapon,
+    an Armor and a list of Potions of its own.  Original* below rebuild
+    that layout (just the attributes, none of the behaviour), so "saved"
+    is what the Compact classes save against it.
+
+    usage:
+        python memory_benchmark.py              (10^5 and 10^6 of each)
+        python memory_benchmark.py 1000 10000   (any counts you like)
+'''
+import gc
+import sys
+import tracemalloc
+from items import *
+from character import *
+from monster import *
+
+class OriginalItem(object):
+    ''' items.Item as it was: a __dict__ with name, base and bonus '''
+    def __init__(self, name = "nameless thing", base = 0, bonus = 0):
+        self.name = name
+        self.base = base
+        self.bonus = bonus
+
+class OriginalWeapon(OriginalItem):
+    def __init__(self, name = "Fists", base = 6, bonus = 0):
+        super(OriginalWeapon, self).__init__(name, base, bonus)
+
+class OriginalArmor(OriginalItem):
+    def __init__(self, name = "Leather", base = 1, bonus = 0):
+        super(OriginalArmor, self).__init__(name, base, bonus)
+
+class OriginalPotion(OriginalItem):
+    def __init__(self, name = "Cure Light", base = 8, bonus = 1):
+        super(OriginalPotion, self).__init__(name, base, bonus)
+
+class OriginalCharacter(object):
+    ''' character.Character as it was: all attributes in a __dict__, and
+        its own weapon, armor and list of potions '''
+    def __init__(self, name = "Average Joe", maxHealth = 10, speed = 25,
+                 stamina = 25, strength = 10, dexterity = 10,
+                 constitution = 10, intelligence = 10, wisdom = 10,
+                 charisma = 10, numberOfPotions = 2):
+        self.name = name
+        self.maxHealth = maxHealth
+        self.health = maxHealth
+        self.speed = speed
+        self.hunger = 100
+        self.stamina = stamina
+        self.strength = strength
+        self.dexterity = dexterity
+        self.constitution = constitution
+        self.intelligence = intelligence
+        self.wisdom = wisdom
+        self.charisma = charisma
+        self.inventory = []
+        self.potions = []
+        for i in range(numberOfPotions):
+            self.potions.append(OriginalPotion())
+        self.weapon = OriginalWeapon()
+        self.armor = OriginalArmor()
+
+class OriginalMonster(OriginalCharacter):
+    ''' monster.Monster as it was: a character plus the AI numbers '''
+    def __init__(self, name = "Generic Foe", strength = 8, dexterity = 8,
+                 intelligence = 8):
+        super(OriginalMonster, self).__init__(
+            name, strength = strength, dexterity = dexterity,
+            intelligence = intelligence)
+        self.aggression = 50
+        self.awareness = 50
+        self.fear = 50
+
+class OriginalOrc(OriginalMonster):
+    ''' monster.Orc as it was '''
+    def __init__(self, name = "Dorque da Orc"):
+        super(OriginalOrc, self).__init__(name, 9, 11, 8)
+        self.maxHealth = self.health = 4
+        self.aggression = 80
+        self.awareness = 30
+        self.fear = 20
+
+# name, original class, regular class, compact class
+CLASSES = [("Character", OriginalCharacter, Character, CompactCharacter),
+           ("Monster", OriginalMonster, Monster, CompactMonster),
+           ("Orc", OriginalOrc, Orc, CompactOrc),
+           ("Item", OriginalItem, Item, CompactItem),
+           ("Weapon", OriginalWeapon, Weapon, CompactWeapon),
+           ("Armor", OriginalArmor, Armor, CompactArmor),
+           ("Potion", OriginalPotion, Potion, CompactPotion)]
+
+def bytes_per_entity(factory, count):
+    ''' average traced bytes for one of count instances of factory() '''
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    roster = [factory() for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    # the roster list itself is not part of the entities
+    used -= sys.getsizeof(roster)
+    del roster
+    return used / count
+
+def run(counts):
+    ''' prints one table per count '''
+    for count in counts:
+        print("%d instances" % count)
+        print("%-10s %10s %10s %10s %8s" %
+              ("class", "original", "regular", "compact", "saved"))
+        for name, original, regular, compact in CLASSES:
+            before = bytes_per_entity(original, count)
+            now = bytes_per_entity(regular, count)
+            after = bytes_per_entity(compact, count)
+            print("%-10s %10.1f %10.1f %10.1f %7.1f%%" %
+                  (name, before, now, after, 100 * (before - after) / before))
+        print()
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [10**5, 10**6]
+    run(counts)
@@ -0,0 +1,101 @@
+# modifiers.py
+# Talon H.
+# 10/18/2026
+
+''' buffs, debuffs and other stat modifiers
+
+    a Modifier changes one stat of one character by a fixed amount, either
+    until it is removed or for a number of rounds.  Each character keeps
+    its modifiers in a Modifiers object, which holds the running total per
+    stat.  Adding or removing a modifier only touches that total and tells
+    the character to update the derived values that depend on that stat
+    (see CompactCharacter.update_stat), so reading strBonus or AC during an
+    attack never adds anything up.
+
+    timed modifiers also go into a heap ordered by the round they run out,
+    so tick() only ever looks at the ones that are actually expiring.
+
+    stats that can be modified:
+        strength, dexterity, constitution, intelligence, wisdom, charisma
+        AC      - added to armor class
+        attack  - added to attack rolls
+        damage  - added to damage
+'''
+import heapq
+
+STATS = ("strength", "dexterity", "constitution", "intelligence", "wisdom",
+         "charisma", "AC", "attack", "damage")
+
+class Modifier(object):
+    ''' one change to one stat
+
+        source is whatever put the modifier there (a spell name, an item,
+        anything), so every modifier from it can be removed together.
+        expires is the round it runs out on, or None for permanent.'''
+    __slots__ = ('stat', 'amount', 'source', 'expires', 'active')
+
+    def __init__(self, stat, amount, source = None, expires = None):
+        self.stat = stat
+        self.amount = amount
+        self.source = source
+        self.expires = expires
+        self.active = True
+
+class Modifiers(object):
+    ''' every modifier on one character, with per-stat totals '''
+    __slots__ = ('owner', 'totals', 'active', 'timers', 'clock', 'counter')
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.totals = {}
+        self.active = []
+        self.timers = []    # heap of (expires, counter, modifier)
+        self.clock = 0      # rounds ticked so far
+        self.counter = 0    # breaks ties in the heap
+
+    def total(self, stat):
+        ''' sum of all active modifiers to stat '''
+        return self.totals.get(stat, 0)
+
+    def add(self, stat, amount, duration = None, source = None):
+        ''' adds a modifier, for duration rounds or for good if None '''
+        if stat not in STATS:
+            raise ValueError("can't modify " + repr(stat))
+        expires = None
+        if duration is not None:
+            expires = self.clock + duration
+        modifier = Modifier(stat, amount, source, expires)
+        self.active.append(modifier)
+        if expires is not None:
+            self.counter += 1
+            heapq.heappush(self.timers, (expires, self.counter, modifier))
+        self._change(stat, amount)
+        return modifier
+
+    def remove(self, modifier):
+        ''' takes a modifier off early
+
+            a timed modifier stays in the heap, marked inactive, and is
+            thrown away when its time comes up.'''
+        if not modifier.active:
+            return
+        modifier.active = False
+        self.active.remove(modifier)
+        self._change(modifier.stat, -modifier.amount)
+
+    def remove_source(self, source):
+        ''' takes off every modifier that came from source '''
+        for modifier in [m for m in self.active if m.source == source]:
+            self.remove(modifier)
+
+    def tick(self, rounds = 1):
+        ''' advances the clock, and removes whatever ran out '''
+        self.clock += rounds
+        timers = self.timers
+        while timers and timers[0][0] <= self.clock:
+            modifier = heapq.heappop(timers)[2]
+            self.remove(modifier)
+
+    def _change(self, stat, amount):
+        self.totals[stat] = self.totals.get(stat, 0) + amount
+        self.owner.update_stat(stat)
@@ -2,12 +2,20 @@
 # Thorin Schmidt
 # 11/16/2016
 
-''' Monster Package '''
+''' Monster Package
+
+    like the items and characters, every monster has a Compact version
+    that uses __slots__ instead of a per-instance __dict__.
+
+    all dice, including the AI's and the Orc's stat rolls, come from the
+    monster's dice stream (see dice.py).'''
 from character import *
-from random import randint, choice
+from policy import choose
+
+class CompactMonster(CompactCharacter):
+    ''' generic monster class, slotted '''
+    __slots__ = ('aggression', 'awareness', 'fear')
 
-class Monster(Character):
-    ''' generic monster class '''
     def __init__(self,
                  name = "Generic Foe",
                  maxHealth = 10,
@@ -23,11 +31,14 @@ class Monster(Character):
                  inventory = [],
                  aggression = 50,
                  awareness = 50,
-                 fear = 50):
-        super(Monster, self).__init__(name, maxHealth, speed, stamina,
-                                      strength, dexterity, constitution,
-                                      intelligence, wisdom, charisma,
-                                      numberOfPotions, inventory)
+                 fear = 50,
+                 dice = None):
+        super(CompactMonster, self).__init__(name, maxHealth, speed,
+                                             stamina, strength, dexterity,
+                                             constitution, intelligence,
+                                             wisdom, charisma,
+                                             numberOfPotions, inventory,
+                                             dice = dice)
         self.aggression = aggression
         self.awareness = awareness
         self.fear = fear  #indicates cowardice level
@@ -36,32 +47,29 @@ class Monster(Character):
         ''' combat AI
 
             returns a, h, or f.  Based on aggression, awareness, morale
-            
-            '''
-        attackValue = randint(1,100) + self.aggression
-        healValue = randint(1,100) + self.awareness
-        fleeValue = randint(1,100) + self.fear
-
-        if attackValue >= healValue and attackValue >= fleeValue:
-            return "a"
-        elif healValue >= attackValue and healValue >= fleeValue:
-            return "h"
-        elif fleeValue >= attackValue and fleeValue >= healValue:
-            return "f"
-        else:
-            return "AI_error"
-
-class Orc(Monster):
-    ''' generic Orc class
 
-        this class '''
-    def __init__(self, name = "Dorque da Orc"):
+            the odds are those of rolling d100 + each of the three, the
+            highest wins and ties go to attack, then heal.  They are worked
+            out once per (aggression, awareness, fear) and picked from with
+            one roll, see policy.py.'''
+        return choose(self.aggression, self.awareness, self.fear, self.dice)
+
+class Monster(CompactMonster, Character):
+    ''' generic monster class '''
+
+class CompactOrc(CompactMonster):
+    ''' generic Orc class, slotted '''
+    __slots__ = ()
+
+    def __init__(self, name = "Dorque da Orc", dice = None):
+        if dice is None:
+            dice = DEFAULT_DICE
         orcName = name
-        maxHealth = randint(1,8)
+        maxHealth = dice.randint(1,8)
         speed = 25
         stamina = 25
-        strength = randint(8,10)
-        dexterity = randint(10,12)
+        strength = dice.randint(8,10)
+        dexterity = dice.randint(10,12)
         constitution = 10
         intelligence = 8
         wisdom = 10
@@ -71,23 +79,26 @@ class Orc(Monster):
         aggression = 80
         awareness = 30
         fear = 20
-        super(Orc, self).__init__(orcName, maxHealth, speed, stamina, strength,
-                                  dexterity, constitution, intelligence,
-                                  wisdom, charisma, numberOfPotions,
-                                  inventory, aggression, awareness, fear)
+        super(CompactOrc, self).__init__(orcName, maxHealth, speed, stamina,
+                                         strength, dexterity, constitution,
+                                         intelligence, wisdom, charisma,
+                                         numberOfPotions, inventory,
+                                         aggression, awareness, fear,
+                                         dice)
+
+class Orc(CompactOrc, Monster):
+    ''' generic Orc class
 
-def random_monster():
+        this class '''
+
+def random_monster(dice = None):
     '''generate a monster at random
 
-    create an instance of each monster here, then add that instance to
-    the listOfMonsters.  The function will pick a random instance out of
-    the list, then return it to the caller.'''
-    
-    monster = Monster()
-    orc = Orc()
-    
-    listOfMonsters = [monster, orc]
-    return choice(listOfMonsters)
+    every kind of monster in monsters.json is equally likely.  Only the
+    one picked gets made, from its prototype (see bestiary.py).
+    Everything is rolled with dice, DEFAULT_DICE if not given.'''
+    import bestiary
+    return bestiary.default_registry().random(dice)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,316 @@
+# odds.py
+# Talon H.
+# 10/18/2026
+
+''' exact odds for a duel, no simulation needed
+
+    a fight under the rules of GameEngine.combat() is a Markov chain over
+    (health of one, health of two, potions of one, potions of two).  Every
+    round either uses up a potion, takes away health, ends the fight, or
+    leaves everything as it was.  So apart from "nothing happened" the
+    chain never goes back to a state it has been in, and each state can be
+    solved from the states after it:
+
+        V(s) = sum of P(s -> t) V(t) over t != s, divided by 1 - P(s -> s)
+
+    the states are solved bottom-up, no recursion (see DuelOdds.fill()),
+    every state of a pair of combatants at once, with numpy.  The tables
+    are remembered, per pair of combatants, so asking about the same
+    matchup again (or the same matchup part way through) is just a lookup.
+    300 health against 300 takes a couple of seconds.
+
+    like vector_sim, stats are taken as they are when you ask (timed
+    modifiers never run out), Monsters choose like Monster.combat_choice()
+    and plain Characters always attack.
+
+        duel_odds(Character(), Orc())
+    returns the same keys as simulator.summarize(), as probabilities, plus
+    the expected number of rounds:
+        {"oneWins": .., "twoWins": .., "oneFled": .., "twoFled": ..,
+         "undecided": .., "rounds": ..}
+    "undecided" is the chance of reaching a state nobody can ever leave
+    (neither side can hit, heal or flee).  pass exact = True to get
+    fractions.Fraction values instead of floats.
+'''
+from fractions import Fraction
+from functools import lru_cache
+from character import Character
+from policy import choice_counts
+
+OUTCOMES = ("oneWins", "twoWins", "oneFled", "twoFled", "undecided")
+
+@lru_cache(maxsize = None)
+def first_counts(oneSpeed, twoSpeed):
+    ''' of the 400 initiative roll pairs, how many let side one go first '''
+    return sum(1 for a in range(1, 21) for b in range(1, 21)
+               if a + oneSpeed >= b + twoSpeed)
+
+def profile(combatant):
+    ''' the numbers that matter for the odds, as a hashable tuple '''
+    if combatant.potions:
+        potion = combatant.potions[-1]
+        potionBase, potionBonus = potion.base, potion.bonus
+    else:
+        potionBase, potionBonus = 1, 0
+    if type(combatant).combat_choice is Character.combat_choice:
+        choice = None
+    else:
+        choice = (combatant.aggression, combatant.awareness, combatant.fear)
+    return (combatant.maxHealth, combatant.speed, combatant.attackBonus,
+            combatant.damageBonus, combatant.AC, combatant.weapon.base,
+            combatant.weapon.bonus, potionBase, potionBonus, choice)
+
+class DuelOdds(object):
+    ''' the solved Markov chain for one pair of combatant profiles '''
+
+    def __init__(self, one, two, exact = False):
+        ''' one and two are profile() tuples '''
+        if exact:
+            self.ratio = Fraction
+        else:
+            self.ratio = lambda count, total: count / total
+        self.top = None         # the state fill() has solved up to
+        self.tables = None      # (p1, p2): odds table over (h1, h2)
+        self.oneFirst = self.ratio(first_counts(one[1], two[1]), 400)
+        self.one = self.side(one, two)
+        self.two = self.side(two, one)
+
+    def side(self, me, them):
+        ''' turn odds for one side: choices, flee, hits, damage, heals '''
+        (maxHealth, speed, attackBonus, damageBonus, AC, weaponBase,
+         weaponBonus, potionBase, potionBonus, choice) = me
+        ratio = self.ratio
+        if choice is None:
+            attack, heal, flee = ratio(1, 1), ratio(0, 1), ratio(0, 1)
+        else:
+            counts = choice_counts(*choice)
+            attack, heal, flee = [ratio(count, 100**3) for count in counts]
+        # natural 1 always misses
+        theirAC = them[4]
+        hits = sum(1 for roll in range(2, 21) if roll + attackBonus >= theirAC)
+        damage = {}
+        for roll in range(1, weaponBase + 1):
+            amount = max(roll + weaponBonus + damageBonus, 1)
+            damage[amount] = damage.get(amount, 0) + 1
+        return {"maxHealth": maxHealth,
+                "attack": attack, "heal": heal, "flee": flee,
+                "fled": ratio(min(max(speed, 0), 100), 100),
+                "hit": ratio(hits, 20),
+                "damage": [(amount, ratio(count, weaponBase))
+                           for amount, count in damage.items()],
+                "heals": [(roll + potionBonus, ratio(1, potionBase))
+                          for roll in range(1, potionBase + 1)]}
+
+    def turn(self, me, myHealth, theirHealth, myPotions):
+        ''' outcomes of one action by side me
+
+            a list of (probability, myHealth, theirHealth, myPotions, end),
+            end being None, "won" or "fled".'''
+        outcomes = []
+        nothing = 0
+        if me["flee"]:
+            outcomes.append((me["flee"] * me["fled"], myHealth, theirHealth,
+                             myPotions, "fled"))
+            nothing += me["flee"] * (1 - me["fled"])
+        if me["heal"]:
+            if myPotions:
+                for amount, p in me["heals"]:
+                    healed = min(myHealth + amount, me["maxHealth"])
+                    outcomes.append((me["heal"] * p, healed, theirHealth,
+                                     myPotions - 1, None))
+            else:
+                nothing += me["heal"]
+        if me["attack"]:
+            nothing += me["attack"] * (1 - me["hit"])
+            for amount, p in me["damage"]:
+                p = me["attack"] * me["hit"] * p
+                if amount >= theirHealth:
+                    outcomes.append((p, myHealth, 0, myPotions, "won"))
+                else:
+                    outcomes.append((p, myHealth, theirHealth - amount,
+                                     myPotions, None))
+        if nothing:
+            outcomes.append((nothing, myHealth, theirHealth, myPotions, None))
+        return outcomes
+
+    def layer_odds(self, me, potions):
+        ''' side me's action odds with potions left: (fled, attacks, heals,
+            nothing), attacks and heals lists of (probability, amount) '''
+        nothing = me["flee"] * (1 - me["fled"])
+        nothing += me["attack"] * (1 - me["hit"])
+        fled = me["flee"] * me["fled"]
+        attacks = [(me["attack"] * me["hit"] * p, amount)
+                   for amount, p in me["damage"] if me["attack"] * p]
+        heals = []
+        if not potions:
+            nothing += me["heal"]
+        elif me["heal"]:
+            heals = [(me["heal"] * p, amount) for amount, p in me["heals"]]
+        return fled, [a for a in attacks if a[0]], heals, nothing
+
+    def fill(self, top):
+        ''' solves every state up to top = (health of one, health of two,
+            potions of one, potions of two), bottom-up
+
+            a state's successors all have fewer potions in total, or as
+            many potions and less health in total.  So the potion layers
+            are solved in increasing order, and inside each layer the
+            states are solved one anti-diagonal (h1 + h2) at a time, all the
+            states on it at once with numpy.  Dead sides are row and column
+            0 of every table, holding the win for the other side.
+
+            U1 and U2 are the odds from a state where one (U1) or two (U2)
+            acts second in a round that the other side started.  One round
+            is then "first mover acts, the U table for the other one", and
+            nothing happening twice is the only way back to the same state:
+            V = (1 round + the rest) / (1 - nothing1 * nothing2).'''
+        import numpy as np
+        H1, H2, P1, P2 = top
+        dtype = object if self.ratio is Fraction else float
+        zero, one = self.ratio(0, 1), self.ratio(1, 1)
+
+        def vector(index, rounds = zero):
+            values = [zero] * 6
+            values[index] = one
+            values[5] = rounds
+            return np.array(values, dtype = dtype)
+        oneWins, twoWins, oneFled, twoFled = [vector(i) for i in range(4)]
+        undecided = vector(4, float("inf"))
+        roundCost = np.array([zero] * 5 + [one], dtype = dtype)
+        w1, w2 = self.oneFirst, 1 - self.oneFirst
+        M1 = self.one["maxHealth"]
+        M2 = self.two["maxHealth"]
+
+        def weights(odds):
+            return np.array([p for p, amount in odds], dtype = dtype)
+
+        def gather(table, rows, cols, probs):
+            ''' sum of probability * table[row, col] over the probs columns,
+                for all three tables at once: shape (states, 3, 6) '''
+            found = table[rows, cols]
+            found = found.reshape(found.shape[0], found.shape[1], 18)
+            return np.matmul(probs, found).reshape(-1, 3, 6)
+
+        V = {}
+        # (p1, p2): V, U1 and U2 as one (H1 + 1, H2 + 1, 3, 6) table
+        T = {}
+        for p1 in range(P1 + 1):
+            for p2 in range(P2 + 1):
+                fled1, attacks1, heals1, q1 = self.layer_odds(self.one, p1)
+                fled2, attacks2, heals2, q2 = self.layer_odds(self.two, p2)
+                table = np.zeros((H1 + 1, H2 + 1, 3, 6), dtype = dtype)
+                table[0, :] = twoWins
+                table[:, 0] = oneWins
+                T[p1, p2] = table
+                stay = q1 * q2
+                if stay == 1:
+                    # nobody can ever change anything
+                    table[1:, 1:] = undecided
+                    V[p1, p2] = table[:, :, 0].copy()
+                    continue
+                damage1 = np.array([d for p, d in attacks1], dtype = int)
+                damage2 = np.array([d for p, d in attacks2], dtype = int)
+                healed1 = np.array([m for p, m in heals1], dtype = int)
+                healed2 = np.array([m for p, m in heals2], dtype = int)
+                hit1, hit2 = weights(attacks1), weights(attacks2)
+                heal1, heal2 = weights(heals1), weights(heals2)
+                for total in range(2, H1 + H2 + 1):
+                    rows = np.arange(max(1, total - H2),
+                                     min(H1, total - 1) + 1)
+                    cols = total - rows
+                    R, C = rows[:, None], cols[:, None]
+                    # without "nothing": B1 one acts second, B2 two does,
+                    # O1 one acts first, O2 two does
+                    B1 = np.zeros((len(rows), 6), dtype = dtype)
+                    B2 = np.zeros((len(rows), 6), dtype = dtype)
+                    O1 = np.zeros((len(rows), 6), dtype = dtype)
+                    O2 = np.zeros((len(rows), 6), dtype = dtype)
+                    if fled1:
+                        B1 = B1 + fled1 * oneFled
+                        O1 = O1 + fled1 * oneFled
+                    if fled2:
+                        B2 = B2 + fled2 * twoFled
+                        O2 = O2 + fled2 * twoFled
+                    # one acting: hits lower two, heals raise one, and the
+                    # round goes on with V (one acted second) or U2
+                    if attacks1:
+                        found = gather(table, R,
+                                       np.maximum(C - damage1, 0), hit1)
+                        B1 = B1 + found[:, 0]
+                        O1 = O1 + found[:, 2]
+                    if heals1:
+                        found = gather(T[p1 - 1, p2],
+                                       np.clip(R + healed1, 1, M1), C, heal1)
+                        B1 = B1 + found[:, 0]
+                        O1 = O1 + found[:, 2]
+                    # two acting: hits lower one, heals raise two
+                    if attacks2:
+                        found = gather(table, np.maximum(R - damage2, 0), C,
+                                       hit2)
+                        B2 = B2 + found[:, 0]
+                        O2 = O2 + found[:, 1]
+                    if heals2:
+                        found = gather(T[p1, p2 - 1], R,
+                                       np.clip(C + healed2, 1, M2), heal2)
+                        B2 = B2 + found[:, 0]
+                        O2 = O2 + found[:, 1]
+                    answer = roundCost[None, :]
+                    if w1:
+                        first = O1
+                        if q1:
+                            first = first + q1 * B2
+                        answer = answer + w1 * first
+                    if w2:
+                        first = O2
+                        if q2:
+                            first = first + q2 * B1
+                        answer = answer + w2 * first
+                    answer = answer / (1 - stay)
+                    table[rows, cols, 0] = answer
+                    table[rows, cols, 1] = B1 + q1 * answer if q1 else B1
+                    table[rows, cols, 2] = B2 + q2 * answer if q2 else B2
+                V[p1, p2] = table[:, :, 0].copy()
+            # the U tables of the layer before are not needed any more
+            for p2 in range(P2 + 1):
+                T.pop((p1 - 1, p2), None)
+        self.top = top
+        self.tables = V
+
+    def solve(self, state):
+        ''' odds from state, as a tuple in OUTCOMES order plus rounds '''
+        h1, h2, p1, p2 = state
+        top = self.top
+        if (top is None or h1 > top[0] or h2 > top[1] or p1 > top[2] or
+                p2 > top[3]):
+            old = top or (0, 0, 0, 0)
+            self.fill((max(h1, self.one["maxHealth"], old[0]),
+                       max(h2, self.two["maxHealth"], old[1]),
+                       max(p1, old[2]), max(p2, old[3])))
+        if h1 <= 0 or h2 <= 0:
+            found = self.tables[p1, p2][max(h1, 0), max(h2, 0)]
+        else:
+            found = self.tables[p1, p2][h1, h2]
+        return tuple(found.tolist())
+
+@lru_cache(maxsize = 256)
+def odds_for(one, two, exact = False):
+    ''' the DuelOdds for two profiles, kept around for the next query '''
+    return DuelOdds(one, two, exact)
+
+def duel_odds(one, two, exact = False):
+    ''' exact outcome probabilities and expected rounds for one vs two,
+        starting from their current health and potions '''
+    solver = odds_for(profile(one), profile(two), exact)
+    answer = solver.solve((one.health, two.health,
+                           one.potionCount, two.potionCount))
+    odds = dict(zip(OUTCOMES, answer))
+    odds["rounds"] = answer[5]
+    return odds
+
+if __name__ == "__main__":
+    import time
+    from monster import Monster, Orc
+    start = time.time()
+    print(duel_odds(Character(), Orc()))
+    print(duel_odds(Character(), Monster()))
+    print("%.1f ms" % ((time.time() - start) * 1000))
@@ -0,0 +1,261 @@
+# pathfinding.py
+# Talon H.
+# 10/18/2026
+
+''' tile maps, A* paths and flow fields, all cached
+
+    a TileMap is a grid of open and blocked tiles.  Movement is one tile
+    up, down, left or right, every step costs 1.
+
+    a Pathfinder answers "how do I get from here to there" for one map:
+      - single trips use A* (Manhattan distance heuristic), and every path
+        found is cached, keyed by (start, goal)
+      - when lots of units head for the same goal, a flow field is built
+        for that goal instead: one breadth-first search out from the goal
+        (only as far as the units asking) gives every tile its distance to
+        it, and any unit just steps to its neighbour with the smallest
+        distance.  Hundreds of monsters chasing one hero then cost a
+        single search.
+
+    when the map changes, only the cached results the change can affect
+    are thrown out:
+      - blocking a tile drops the cached paths that go through it, and the
+        flow fields that reach it
+      - opening a tile drops the cached paths that it could shorten (the
+        ones longer than start -> tile -> goal could possibly be), and the
+        flow fields that reach one of its neighbours
+    flow fields are rebuilt the next time they are needed.
+'''
+import heapq
+from collections import OrderedDict, deque
+
+NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+class TileMap(object):
+    ''' width x height tiles, some of them walls '''
+
+    def __init__(self, width, height, walls = ()):
+        self.width = width
+        self.height = height
+        self.walls = set(walls)
+        self.listeners = []     # called with (tile, blocked) on changes
+
+    def inside(self, tile):
+        return 0 <= tile[0] < self.width and 0 <= tile[1] < self.height
+
+    def open(self, tile):
+        ''' True if a unit can stand on tile '''
+        return self.inside(tile) and tile not in self.walls
+
+    def neighbours(self, tile):
+        x, y = tile
+        for dx, dy in NEIGHBOURS:
+            step = (x + dx, y + dy)
+            if self.open(step):
+                yield step
+
+    def set_wall(self, tile, blocked = True):
+        ''' blocks (or opens) a tile and tells the listeners '''
+        if blocked == (tile in self.walls):
+            return
+        if blocked:
+            self.walls.add(tile)
+        else:
+            self.walls.discard(tile)
+        for listener in self.listeners:
+            listener(tile, blocked)
+
+class FlowField(object):
+    ''' distance to one goal from every tile that can reach it
+
+        the breadth-first search is lazy: it only goes as far out as the
+        tiles that have been asked about, and picks up where it stopped
+        the next time somebody further away asks.'''
+    __slots__ = ('map', 'goal', 'distance', 'frontier')
+
+    def __init__(self, tileMap, goal):
+        self.map = tileMap
+        self.goal = goal
+        self.distance = {goal: 0}
+        self.frontier = deque([goal])
+
+    def reach(self, tile):
+        ''' searches until tile has its distance (or there is no way) '''
+        distance = self.distance
+        frontier = self.frontier
+        tileMap = self.map
+        while tile not in distance and frontier:
+            x, y = frontier.popleft()
+            further = distance[(x, y)] + 1
+            for dx, dy in NEIGHBOURS:
+                step = (x + dx, y + dy)
+                if step not in distance and tileMap.open(step):
+                    distance[step] = further
+                    frontier.append(step)
+        return distance.get(tile)
+
+    def step(self, tile):
+        ''' the next tile from tile towards the goal (tile if stuck) '''
+        best = tile
+        bestDistance = self.reach(tile)
+        if bestDistance is None:
+            return tile
+        x, y = tile
+        for dx, dy in NEIGHBOURS:
+            near = (x + dx, y + dy)
+            # everything closer to the goal than tile is already searched
+            distance = self.distance.get(near)
+            if distance is not None and distance < bestDistance:
+                best, bestDistance = near, distance
+        return best
+
+    def path(self, start, limit = None):
+        ''' the tiles from start to the goal, start left out '''
+        path = []
+        tile = start
+        while tile != self.goal and (limit is None or len(path) < limit):
+            step = self.step(tile)
+            if step == tile:
+                break
+            path.append(step)
+            tile = step
+        return path
+
+class Pathfinder(object):
+    ''' cached A* paths and flow fields for one TileMap
+
+        goals asked for by at least flowThreshold route() calls since the
+        last new_turn() get a flow field instead of separate A* searches.'''
+
+    def __init__(self, tileMap, flowThreshold = 4, cacheSize = 4096,
+                 fieldCacheSize = 64):
+        self.map = tileMap
+        self.flowThreshold = flowThreshold
+        self.cacheSize = cacheSize
+        self.fieldCacheSize = fieldCacheSize
+        # (start, goal): path, or None if no way, least recently used first
+        self.paths = OrderedDict()
+        self.through = {}       # tile: set of (start, goal) keys using it
+        self.fields = {}        # goal: FlowField
+        self.demand = {}        # goal: route() calls this turn
+        self.routes = 0         # route() calls
+        self.searches = 0       # A* searches and flow fields actually run
+        tileMap.listeners.append(self.map_changed)
+
+    def new_turn(self):
+        ''' starts counting goal demand afresh '''
+        self.demand.clear()
+
+    def route(self, start, goal, limit = None):
+        ''' the tiles to walk from start to goal, start left out
+
+            at most limit tiles if limit is given.  An empty list means
+            there is no way there (or start is the goal).'''
+        self.routes += 1
+        demand = self.demand.get(goal, 0) + 1
+        self.demand[goal] = demand
+        if demand >= self.flowThreshold or goal in self.fields:
+            return self.field(goal).path(start, limit)
+        path = self.path(start, goal)
+        if path is None:
+            return []
+        if limit is not None:
+            return path[:limit]
+        return path
+
+    def field(self, goal):
+        ''' the (cached) flow field for goal '''
+        field = self.fields.pop(goal, None)
+        if field is None:
+            self.searches += 1
+            field = FlowField(self.map, goal)
+            if len(self.fields) >= self.fieldCacheSize:
+                del self.fields[next(iter(self.fields))]
+        self.fields[goal] = field   # most recently used goes last
+        return field
+
+    def path(self, start, goal):
+        ''' the (cached) A* path from start to goal, or None
+
+            once cacheSize paths are cached, the least recently used one
+            makes way for a new one.'''
+        key = (start, goal)
+        if key in self.paths:
+            self.paths.move_to_end(key)
+            return self.paths[key]
+        path = self.astar(start, goal)
+        if len(self.paths) >= self.cacheSize:
+            self.forget(next(iter(self.paths)))
+        self.paths[key] = path
+        for tile in path or ():
+            self.through.setdefault(tile, set()).add(key)
+        return path
+
+    def astar(self, start, goal):
+        ''' plain A*, returns the path (start left out) or None '''
+        self.searches += 1
+        tileMap = self.map
+        if not tileMap.open(goal):
+            return None
+        came = {start: None}
+        cost = {start: 0}
+        # ties go to the tile furthest along, so open ground is crossed
+        # in a straight line instead of searching the whole diamond
+        heap = [(manhattan(start, goal), 0, start)]
+        while heap:
+            estimate, spent, tile = heapq.heappop(heap)
+            spent = -spent
+            if tile == goal:
+                path = []
+                while tile != start:
+                    path.append(tile)
+                    tile = came[tile]
+                path.reverse()
+                return path
+            if spent > cost[tile]:
+                continue
+            x, y = tile
+            stepCost = spent + 1
+            for dx, dy in NEIGHBOURS:
+                step = (x + dx, y + dy)
+                if step in cost and cost[step] <= stepCost:
+                    continue
+                if tileMap.open(step):
+                    cost[step] = stepCost
+                    came[step] = tile
+                    heapq.heappush(heap, (stepCost + manhattan(step, goal),
+                                          -stepCost, step))
+        return None
+
+    def forget(self, key):
+        ''' drops one cached path '''
+        path = self.paths.pop(key, None)
+        for tile in path or ():
+            keys = self.through.get(tile)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.through[tile]
+
+    def map_changed(self, tile, blocked):
+        ''' throws out only the cached results the change can affect '''
+        if blocked:
+            for key in list(self.through.get(tile, ())):
+                self.forget(key)
+            # paths that found no way stay right: a new wall won't help
+            for goal, field in list(self.fields.items()):
+                if tile in field.distance:
+                    del self.fields[goal]
+        else:
+            for key, path in list(self.paths.items()):
+                start, goal = key
+                best = manhattan(start, tile) + manhattan(tile, goal)
+                if path is None or best < len(path):
+                    self.forget(key)
+            for goal, field in list(self.fields.items()):
+                if any(near in field.distance
+                       for near in self.map.neighbours(tile)):
+                    del self.fields[goal]
@@ -0,0 +1,119 @@
+# policy.py
+# Talon H.
+# 10/18/2026
+
+''' Monster.combat_choice() as a table of odds instead of three d100s
+
+    combat_choice() rolls d100 + aggression, d100 + awareness and
+    d100 + fear, attacks if the attack value is at least both others,
+    heals if the heal value is at least the flee value, and flees
+    otherwise.  Which of the 100**3 roll triples gives which choice only
+    depends on (aggression, awareness, fear), so for each triple of those
+    choice_counts() counts them once and remembers the answer:
+
+        (attacks, heals, flees), adding up to 100**3
+
+    one uniform draw then picks the choice with the same odds as the three
+    d100s, ties and all (numpy arrays draw an integer below 100**3, so
+    there the odds are exact).  choose() does that for one monster,
+    choices() and draw() for whole numpy arrays of monsters (one draw
+    each), and odds.py reads the same counts for its exact odds.
+
+        choose(80, 30, 20, dice)            # "a", "h" or "f"
+        choices(aggression, awareness, fear, rng)   # 0, 1, 2 per monster
+'''
+from functools import lru_cache
+
+TOTAL = 100**3
+CHOICES = ("a", "h", "f")   # what the codes from choices() stand for
+
+def between(value):
+    ''' how many d100 rolls are value or less '''
+    return min(max(value, 0), 100)
+
+@lru_cache(maxsize = None)
+def choice_counts(aggression, awareness, fear):
+    ''' how many of the 100**3 rolls of Monster.combat_choice() pick
+        attack, heal and flee, as a tuple (attacks, heals, flees) '''
+    attacks = heals = 0
+    for roll in range(1, 101):
+        # attack wins with heal rolls up to a tie and flee rolls up to a tie
+        attackValue = roll + aggression
+        attacks += (between(attackValue - awareness) *
+                    between(attackValue - fear))
+        # heal needs to beat attack outright, and only tie flee
+        healValue = roll + awareness
+        heals += (between(healValue - 1 - aggression) *
+                  between(healValue - fear))
+    return attacks, heals, TOTAL - attacks - heals
+
+@lru_cache(maxsize = None)
+def thresholds(aggression, awareness, fear):
+    ''' (attack below, heal below): a roll from 0 to TOTAL - 1 attacks
+        under the first, heals under the second, and flees otherwise '''
+    attacks, heals, flees = choice_counts(aggression, awareness, fear)
+    return attacks, attacks + heals
+
+# (aggression, awareness, fear): thresholds() as fractions of TOTAL
+chances = {}
+
+def choose(aggression, awareness, fear, dice):
+    ''' "a", "h" or "f", with combat_choice()'s odds, from one draw
+
+        the draw is dice.random.random(), so the odds are exact to within
+        2**-53, and it costs a lot less than rolling a 100**3 sided die.'''
+    key = (aggression, awareness, fear)
+    found = chances.get(key)
+    if found is None:
+        attackBelow, healBelow = thresholds(aggression, awareness, fear)
+        found = chances[key] = (attackBelow / TOTAL, healBelow / TOTAL)
+    roll = dice.random.random()
+    if roll < found[0]:
+        return "a"
+    elif roll < found[1]:
+        return "h"
+    return "f"
+
+def table(aggression, awareness, fear):
+    ''' thresholds() for numpy arrays of monsters, as two int64 arrays,
+        working each distinct (aggression, awareness, fear) out once '''
+    import numpy as np
+    triples = np.stack([np.asarray(aggression, dtype = np.int64),
+                        np.asarray(awareness, dtype = np.int64),
+                        np.asarray(fear, dtype = np.int64)], axis = 1)
+    distinct, where = np.unique(triples, axis = 0, return_inverse = True)
+    found = np.array([thresholds(*triple) for triple in distinct.tolist()],
+                     dtype = np.int64).reshape(-1, 2)
+    where = where.reshape(-1)
+    return found[where, 0], found[where, 1]
+
+def draw(below, rng):
+    ''' a choice code (0 attack, 1 heal, 2 flee, see CHOICES) for every
+        monster in below (what table() gives), one rng draw each '''
+    import numpy as np
+    attackBelow, healBelow = below
+    roll = rng.integers(0, TOTAL, size = len(attackBelow))
+    return ((roll >= attackBelow).astype(np.int8) +
+            (roll >= healBelow).astype(np.int8))
+
+def choices(aggression, awareness, fear, rng):
+    ''' choice codes for numpy arrays of monsters, drawn with rng (a numpy
+        Generator).  When choosing for the same monsters over and over,
+        keep their table() and call draw() instead.'''
+    return draw(table(aggression, awareness, fear), rng)
+
+if __name__ == "__main__":
+    import time
+    from dice import Dice
+    from monster import Monster
+    dice = Dice(1)
+    orc = Monster(aggression = 80, awareness = 30, fear = 20, dice = dice)
+    count = 1000000
+    found = {"a": 0, "h": 0, "f": 0}
+    start = time.time()
+    for i in range(count):
+        found[orc.combat_choice()] += 1
+    print("%d choices in %.2f seconds" % (count, time.time() - start))
+    print("drawn   ", {key: value / count for key, value in found.items()})
+    print("expected", dict(zip(CHOICES, [value / TOTAL for value in
+                                         choice_counts(80, 30, 20)])))
@@ -0,0 +1,292 @@
+# replay.py
+# Talon H.
+# 10/18/2026
+
+''' compact binary replays of fights
+
+    every event of a bout (see events.py) is stored as one opcode byte,
+    which also says whose event it is, followed by the numbers for that
+    event: initiative totals, attack rolls, damage, heal amounts...  A
+    typical bout is a few dozen bytes.
+
+    bouts are written in blocks, optionally compressed with zlib or lzma,
+    and an index of the blocks goes at the end of the file:
+
+        header   b"GERP", version, compression
+        block    boutCount (uint32), offsets (uint32 * boutCount+1), bouts
+        ...
+        index    (fileOffset uint64, size uint32, firstBout uint64,
+                  boutCount uint32) per block
+        footer   index offset (uint64), block count (uint32), b"GERP"
+
+    ReplayReader memory-maps the file, so opening it reads nothing but the
+    index.  Bouts in uncompressed blocks are memoryview slices of the map
+    (no copying at all); compressed blocks are unpacked one at a time when
+    a bout in them is asked for, and the last one is kept.  The bouts a
+    reader hands out die with it: close() releases their data, so read
+    what you need from them before closing the reader.
+
+        writer = ReplayWriter("bouts.rpl", compression = "zlib")
+        writer.record(one, two, fight(one, two))
+        writer.close()
+
+        reader = ReplayReader("bouts.rpl")
+        for event in reader[12345].events():
+            print(event)    # ("hit", "one", roll, damage) and so on
+'''
+import bisect
+import lzma
+import mmap
+import struct
+import weakref
+import zlib
+
+MAGIC = b"GERP"
+VERSION = 1
+COMPRESSION = {None: 0, "zlib": 1, "lzma": 2}
+
+HEADER = struct.Struct("<4sBB")
+INDEX_ENTRY = struct.Struct("<QIQI")
+FOOTER = struct.Struct("<QI4s")
+COUNT = struct.Struct("<I")
+
+# opcode: (event kind, struct for the numbers after the opcode byte, names)
+OPCODES = {0: ("round", struct.Struct("<"), ()),
+           1: ("initiative", struct.Struct("<hh"), ("first", "second")),
+           2: ("hit", struct.Struct("<Bh"), ("roll", "damage")),
+           3: ("miss", struct.Struct("<B"), ("roll",)),
+           4: ("fumble", struct.Struct("<"), ()),
+           5: ("heal", struct.Struct("<h"), ("amount",)),
+           6: ("flee", struct.Struct("<B"), ("success",)),
+           7: ("death", struct.Struct("<"), ()),
+           8: ("move", struct.Struct("<hh"), ("x", "y"))}
+CODES = {kind: code for code, (kind, layout, names) in OPCODES.items()}
+SIDES = ("one", "two")
+
+def encode_event(event, two):
+    ''' bytes for one event, two being the side two combatant '''
+    kind = event.kind
+    if kind == "round":
+        return b"\x00"
+    if kind == "prompt":
+        return b""      # waiting on a player is not part of the bout
+    if kind == "initiative":
+        side = event.first is two
+        values = (event.firstRoll, event.secondRoll)
+    elif kind in ("hit", "miss", "fumble"):
+        side = event.attacker is two
+        if kind == "hit":
+            values = (event.roll, event.damage)
+        elif kind == "miss":
+            values = (event.roll,)
+        else:
+            values = ()
+    elif kind == "heal":
+        side = event.character is two
+        values = (-1 if event.amount is None else event.amount,)
+    elif kind == "flee":
+        side = event.character is two
+        values = (event.success,)
+    elif kind == "move":
+        side = event.character is two
+        values = event.end
+    else:
+        side = event.character is two
+        values = ()
+    code = CODES[kind]
+    return bytes((code * 2 + side,)) + OPCODES[code][1].pack(*values)
+
+def encode_bout(two, events):
+    ''' all the events of one bout as bytes '''
+    return b"".join([encode_event(event, two) for event in events])
+
+def decode_bout(data):
+    ''' generator: (kind, side, numbers...) tuples from a bout's bytes
+
+        side is "one" or "two" (None for round starts).  A heal with no
+        potion left has amount -1.'''
+    position = 0
+    end = len(data)
+    while position < end:
+        opcode = data[position]
+        position += 1
+        kind, layout, names = OPCODES[opcode >> 1]
+        values = layout.unpack_from(data, position)
+        position += layout.size
+        if kind == "round":
+            yield (kind, None)
+        else:
+            yield (kind, SIDES[opcode & 1]) + values
+
+class ReplayWriter(object):
+    ''' writes bouts to a replay file, blockSize bouts per block '''
+
+    def __init__(self, path, compression = None, blockSize = 4096):
+        if compression not in COMPRESSION:
+            raise ValueError("unknown compression " + repr(compression))
+        self.file = open(path, "wb")
+        self.compression = compression
+        self.blockSize = blockSize
+        self.pending = []
+        self.index = []
+        self.bouts = 0
+        self.file.write(HEADER.pack(MAGIC, VERSION, COMPRESSION[compression]))
+
+    def add(self, data):
+        ''' adds one already encoded bout '''
+        self.pending.append(data)
+        if len(self.pending) >= self.blockSize:
+            self.flush()
+
+    def record(self, one, two, events):
+        ''' encodes and adds a bout, returns the number it was given '''
+        self.add(encode_bout(two, events))
+        return self.bouts + len(self.pending) - 1
+
+    def recording(self, one, two, events):
+        ''' generator: passes events through, and stores the bout when
+            they run out.  Handy when something else is consuming them.'''
+        encoded = []
+        for event in events:
+            encoded.append(encode_event(event, two))
+            yield event
+        self.add(b"".join(encoded))
+
+    def flush(self):
+        ''' writes the pending bouts out as one block '''
+        if not self.pending:
+            return
+        offsets = [0]
+        for data in self.pending:
+            offsets.append(offsets[-1] + len(data))
+        block = (COUNT.pack(len(self.pending)) +
+                 struct.pack("<%dI" % len(offsets), *offsets) +
+                 b"".join(self.pending))
+        if self.compression == "zlib":
+            block = zlib.compress(block)
+        elif self.compression == "lzma":
+            block = lzma.compress(block)
+        self.index.append((self.file.tell(), len(block), self.bouts,
+                           len(self.pending)))
+        self.file.write(block)
+        self.bouts += len(self.pending)
+        self.pending = []
+
+    def close(self):
+        ''' writes the last block, the index and the footer '''
+        self.flush()
+        indexOffset = self.file.tell()
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        self.file.write(FOOTER.pack(indexOffset, len(self.index), MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class BoutReplay(object):
+    ''' one bout in a replay file, its bytes are a memoryview
+
+        the memoryview is released when the reader it came from is
+        closed.'''
+    __slots__ = ('number', 'data', '__weakref__')
+
+    def __init__(self, number, data):
+        self.number = number
+        self.data = data
+
+    def events(self):
+        ''' the decoded events, see decode_bout() '''
+        return decode_bout(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+class ReplayReader(object):
+    ''' random access to the bouts of a replay file, through mmap '''
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, version, compression = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(path + " is not a replay file")
+        self.compression = compression
+        indexOffset, blocks, magic = FOOTER.unpack_from(
+            self.map, len(self.map) - FOOTER.size)
+        if magic != MAGIC:
+            raise ValueError(path + " has no replay index")
+        self.index = list(INDEX_ENTRY.iter_unpack(
+            self.view[indexOffset:indexOffset + blocks * INDEX_ENTRY.size]))
+        self.firsts = [entry[2] for entry in self.index]
+        self.cached = (None, None)
+        # the BoutReplays handed out and still around, see close()
+        self.handed = weakref.WeakSet()
+
+    def __len__(self):
+        if not self.index:
+            return 0
+        offset, size, first, count = self.index[-1]
+        return first + count
+
+    def block(self, number):
+        ''' the contents of block number, as a memoryview '''
+        if self.cached[0] == number:
+            return self.cached[1]
+        offset, size, first, count = self.index[number]
+        data = self.view[offset:offset + size]
+        if self.compression == COMPRESSION["zlib"]:
+            data = memoryview(zlib.decompress(data))
+        elif self.compression == COMPRESSION["lzma"]:
+            data = memoryview(lzma.decompress(data))
+        self.cached = (number, data)
+        return data
+
+    def __getitem__(self, bout):
+        ''' the BoutReplay for bout number bout '''
+        if bout < 0:
+            bout += len(self)
+        if not 0 <= bout < len(self):
+            raise IndexError("no bout " + str(bout))
+        number = bisect.bisect_right(self.firsts, bout) - 1
+        block = self.block(number)
+        i = bout - self.firsts[number]
+        count = COUNT.unpack_from(block, 0)[0]
+        start, end = struct.unpack_from("<II", block, COUNT.size + 4 * i)
+        base = COUNT.size + 4 * (count + 1)
+        replay = BoutReplay(bout, block[base + start:base + end])
+        self.handed.add(replay)
+        return replay
+
+    def __iter__(self):
+        for bout in range(len(self)):
+            yield self[bout]
+
+    def close(self):
+        ''' closes the file, and releases the data of every BoutReplay this
+            reader handed out '''
+        for replay in list(self.handed):
+            replay.data.release()
+        self.handed.clear()
+        block = self.cached[1]
+        self.cached = (None, None)
+        if block is not None:
+            block.release()
+        self.view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            # views somebody else made of a bout's data still point into
+            # the map, it goes when the last of them does
+            pass
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,395 @@
+# roster_file.py
+# Talon H.
+# 10/18/2026
+
+''' millions of NPC stat blocks in one file, read straight from mmap
+
+    storage.py keeps rosters in SQLite, which is the right place for the
+    player and the odd saved party, but a simulation worker that wants two
+    million orcs shouldn't have to build two million objects (or unpickle
+    them) before it can look at one.  A roster file is a header, one
+    fixed-width binary record per combatant and then the item ids:
+
+        header   b"GERF", version (uint16), record size (uint16),
+                 count (uint64), where the item ids start (uint64)
+        record   strength, dexterity, constitution, intelligence, wisdom,
+                 charisma (uint8 each), maxHealth, health, speed (int16),
+                 weaponBase (uint8), weaponBonus (int8), armorBase (uint8),
+                 armorBonus (int8), potionCount (uint32), potionBase
+                 (uint8), potionBonus (int8), aggression, awareness, fear
+                 (uint8), flags (uint8, MONSTER if it has the Monster AI),
+                 weaponId, armorId, potionId (uint16), one pad byte
+        item ids the catalog ids (see catalog.py) the records use, UTF-8,
+                 one per line.  weaponId and so on are line numbers, 0
+                 (an empty line) for items that aren't from the catalog.
+
+    RosterFile memory-maps the file, so opening it reads nothing, and any
+    number of worker processes opening the same file share the same pages.
+    roster[i] is a CharacterView: a small object pointing into the map,
+    with the same read-only properties as a Character (strength, strBonus,
+    AC, attackBonus, potionCount...), every one read from the mapped bytes
+    when asked for.  Nothing is copied until you call build() on a view
+    to get a real combatant back.
+
+        write_roster("orcs.ros", (CompactOrc() for i in range(2000000)))
+        with RosterFile("orcs.ros") as orcs:
+            print(orcs[123456].AC)
+
+    with numpy, RosterFile.array() is the whole file as a structured array
+    (again without copying), and side() hands a slice of it to vector_sim.
+'''
+import mmap
+import struct
+from character import *
+from monster import *
+from inventory import Pouch
+from catalog import default_catalog, shared
+
+MAGIC = b"GERF"
+VERSION = 3
+HEADER = struct.Struct("<4sHHQQ")
+
+# field name: struct format, in record order
+FIELDS = (("strength", "B"), ("dexterity", "B"), ("constitution", "B"),
+          ("intelligence", "B"), ("wisdom", "B"), ("charisma", "B"),
+          ("maxHealth", "h"), ("health", "h"), ("speed", "h"),
+          ("weaponBase", "B"), ("weaponBonus", "b"), ("armorBase", "B"),
+          ("armorBonus", "b"), ("potionCount", "I"), ("potionBase", "B"),
+          ("potionBonus", "b"), ("aggression", "B"), ("awareness", "B"),
+          ("fear", "B"), ("flags", "B"), ("weaponId", "H"),
+          ("armorId", "H"), ("potionId", "H"))
+RECORD = struct.Struct("<" + "".join(code for name, code in FIELDS) + "x")
+
+MONSTER = 1     # flags bit: chooses with Monster.combat_choice()
+
+def offsets():
+    ''' {field name: (offset in the record, struct for it)} '''
+    found = {}
+    offset = 0
+    for name, code in FIELDS:
+        field = struct.Struct("<" + code)
+        found[name] = (offset, field)
+        offset += field.size
+    return found
+
+OFFSETS = offsets()
+
+class ItemIds(object):
+    ''' the item ids of a roster file being written '''
+    __slots__ = ('numbers', 'seen')
+
+    def __init__(self):
+        # line 0 is the empty one, for items that aren't in the catalog
+        self.numbers = {"": 0}
+        # item: its line, most combatants hold the same shared items so
+        # this saves looking them up in the catalog every time
+        self.seen = {}
+
+    def number(self, item):
+        ''' the line for item's catalog id, added if it is new '''
+        found = self.seen.get(item)
+        if found is None:
+            itemId = default_catalog().find(item) or ""
+            found = self.numbers.get(itemId)
+            if found is None:
+                found = self.numbers[itemId] = len(self.numbers)
+            self.seen[item] = found
+        return found
+
+    def encode(self):
+        ''' the item ids as they are written to the file '''
+        ids = sorted(self.numbers, key = self.numbers.get)
+        return "\n".join(ids).encode("utf-8")
+
+def record(combatant, ids):
+    ''' the packed record of one Character or Monster
+
+        ids is the file's ItemIds, new item ids are added to it.  Only the
+        potion on top of the stack (the one heal() drinks next) is kept,
+        as if all of them were like it.  Modifiers are left out, the
+        record has the base numbers.'''
+    weapon = combatant.weapon
+    armor = combatant.armor
+    potions = combatant.potions
+    if potions:
+        potion = potions[-1]
+        potionBase, potionBonus = potion.base, potion.bonus
+        potionId = ids.number(potion)
+    else:
+        potionBase, potionBonus, potionId = 8, 1, 0
+    if isinstance(combatant, CompactMonster):
+        ai = (combatant.aggression, combatant.awareness, combatant.fear,
+              MONSTER)
+    else:
+        ai = (0, 0, 0, 0)
+    try:
+        return RECORD.pack(combatant.strength, combatant.dexterity,
+                           combatant.constitution, combatant.intelligence,
+                           combatant.wisdom, combatant.charisma,
+                           combatant.maxHealth, combatant.health,
+                           combatant.speed, weapon.base, weapon.bonus,
+                           armor.base, armor.bonus, len(potions), potionBase,
+                           potionBonus, *ai, ids.number(weapon),
+                           ids.number(armor), potionId)
+    except struct.error as error:
+        raise ValueError(combatant.name + " doesn't fit in a roster record: "
+                         + str(error))
+
+def write_roster(path, combatants, chunk = 65536):
+    ''' writes combatants (any iterable) to a roster file, chunk records
+        at a time, and returns how many there were '''
+    count = 0
+    ids = ItemIds()
+    with open(path, "wb") as out:
+        out.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0, 0))
+        pending = []
+        for combatant in combatants:
+            pending.append(record(combatant, ids))
+            if len(pending) >= chunk:
+                out.write(b"".join(pending))
+                count += len(pending)
+                pending = []
+        out.write(b"".join(pending))
+        count += len(pending)
+        out.write(ids.encode())
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, VERSION, RECORD.size, count,
+                              HEADER.size + count * RECORD.size))
+    return count
+
+def raw_field(name):
+    ''' read-only property for one field, straight from the buffer '''
+    offset, field = OFFSETS[name]
+    if field.format.endswith("B"):
+        # a single unsigned byte: indexing the buffer is cheaper than
+        # unpacking it
+        def get(self):
+            return self.data[self.offset + offset]
+    else:
+        unpack = field.unpack_from
+
+        def get(self):
+            return unpack(self.data, self.offset + offset)[0]
+    return property(get, doc = name + ", read from the roster file")
+
+def bonus_field(name):
+    ''' read-only d20 OGL bonus property for an ability score '''
+    offset = OFFSETS[name][0]
+
+    def get(self):
+        return (self.data[self.offset + offset] // 2) - 5
+    return property(get, doc = "bonus for " + name)
+
+class CharacterView(object):
+    ''' one record of a RosterFile, looking like a Character
+
+        data is the file's buffer, offset where the record starts and ids
+        the file's item ids.  The view holds no numbers of its own, so it
+        is only valid while the RosterFile is open.'''
+    __slots__ = ('data', 'offset', 'ids')
+
+    def __init__(self, data, offset, ids):
+        self.data = data
+        self.offset = offset
+        self.ids = ids
+
+    strength = raw_field("strength")
+    dexterity = raw_field("dexterity")
+    constitution = raw_field("constitution")
+    intelligence = raw_field("intelligence")
+    wisdom = raw_field("wisdom")
+    charisma = raw_field("charisma")
+    maxHealth = raw_field("maxHealth")
+    health = raw_field("health")
+    speed = raw_field("speed")
+    weaponBase = raw_field("weaponBase")
+    weaponBonus = raw_field("weaponBonus")
+    armorBase = raw_field("armorBase")
+    armorBonus = raw_field("armorBonus")
+    potionCount = raw_field("potionCount")
+    potionBase = raw_field("potionBase")
+    potionBonus = raw_field("potionBonus")
+    aggression = raw_field("aggression")
+    awareness = raw_field("awareness")
+    fear = raw_field("fear")
+    flags = raw_field("flags")
+    weaponId = raw_field("weaponId")
+    armorId = raw_field("armorId")
+    potionId = raw_field("potionId")
+
+    strBonus = bonus_field("strength")
+    dexBonus = bonus_field("dexterity")
+    conBonus = bonus_field("constitution")
+    intBonus = bonus_field("intelligence")
+    wisBonus = bonus_field("wisdom")
+    chaBonus = bonus_field("charisma")
+
+    @property
+    def AC(self):
+        ''' 10 + dexBonus + armor, like Character.AC '''
+        return 10 + self.dexBonus + self.armorBase + self.armorBonus
+
+    @property
+    def attackBonus(self):
+        ''' strBonus + weapon bonus '''
+        return self.strBonus + self.weaponBonus
+
+    @property
+    def damageBonus(self):
+        return self.strBonus
+
+    @property
+    def isMonster(self):
+        return bool(self.flags & MONSTER)
+
+    def item(self, number, cls, name, base, bonus):
+        ''' the item from item id line number, with bonus
+
+            items from the catalog come back as the catalog's item (the
+            shared one if bonus is the definition's own).  The rest only
+            have their numbers in the record, and come back as a shared
+            item called name.'''
+        itemId = self.ids[number]
+        if not itemId:
+            return shared(cls, name, base, bonus)
+        catalog = default_catalog()
+        found = catalog.get(itemId, cls = cls)
+        if found.bonus != bonus:
+            found = catalog.get(itemId, bonus, cls)
+        return found
+
+    def build(self, name = None, dice = None):
+        ''' a real CompactMonster or CompactCharacter with these numbers
+
+            the weapon, armor and potions are looked up in the default
+            catalog by the ids the record has (see item()).'''
+        if self.isMonster:
+            combatant = CompactMonster(
+                name or "Generic Foe", self.maxHealth, self.speed, 25,
+                self.strength, self.dexterity, self.constitution,
+                self.intelligence, self.wisdom, self.charisma, 0, [],
+                self.aggression, self.awareness, self.fear, dice)
+        else:
+            combatant = CompactCharacter(
+                name or "Average Joe", self.maxHealth, self.speed, 25,
+                self.strength, self.dexterity, self.constitution,
+                self.intelligence, self.wisdom, self.charisma, 0, [],
+                dice = dice)
+        combatant.health = self.health
+        combatant.weapon = self.item(self.weaponId, CompactWeapon, "Fists",
+                                     self.weaponBase, self.weaponBonus)
+        combatant.armor = self.item(self.armorId, CompactArmor, "Leather",
+                                    self.armorBase, self.armorBonus)
+        combatant.potions = Pouch(self.item(self.potionId, CompactPotion,
+                                            "Cure Light", self.potionBase,
+                                            self.potionBonus),
+                                  self.potionCount)
+        return combatant
+
+class RosterFile(object):
+    ''' a roster file opened read-only through mmap '''
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        magic, version, size, count, idsAt = HEADER.unpack_from(self.map,
+                                                                 0)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError(path + " is not a roster file")
+        self.count = count
+        self.ids = self.map[idsAt:].decode("utf-8").split("\n")
+        self.view = memoryview(self.map)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        ''' the CharacterView of record index '''
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("no record " + str(index))
+        return CharacterView(self.view, HEADER.size + index * RECORD.size,
+                             self.ids)
+
+    def __iter__(self):
+        view = self.view
+        ids = self.ids
+        for offset in range(HEADER.size,
+                            HEADER.size + self.count * RECORD.size,
+                            RECORD.size):
+            yield CharacterView(view, offset, ids)
+
+    def array(self):
+        ''' the records as a numpy structured array over the map (needs
+            numpy), one named field per FIELDS entry.  The file can't be
+            closed while such an array is still around.'''
+        import numpy as np
+        dtype = np.dtype({"names": [name for name, code in FIELDS],
+                          "formats": ["<" + code.replace("b", "i1")
+                                                .replace("B", "u1")
+                                                .replace("h", "i2")
+                                                .replace("H", "u2")
+                                                .replace("I", "u4")
+                                      for name, code in FIELDS],
+                          "offsets": [OFFSETS[name][0]
+                                      for name, code in FIELDS],
+                          "itemsize": RECORD.size})
+        return np.frombuffer(self.map, dtype = dtype, count = self.count,
+                             offset = HEADER.size)
+
+    def side(self, start = 0, stop = None):
+        ''' records start to stop as a vector_sim.Side (needs numpy) '''
+        import numpy as np
+        import vector_sim
+        records = self.array()[start:stop]
+        # widen before doing sums, the fields are only one or two bytes
+        strBonus = records["strength"].astype(np.int64) // 2 - 5
+        dexBonus = records["dexterity"].astype(np.int64) // 2 - 5
+        return vector_sim.Side(
+            health = records["health"], maxHealth = records["maxHealth"],
+            speed = records["speed"],
+            attackBonus = strBonus + records["weaponBonus"],
+            damageBonus = strBonus,
+            AC = (10 + dexBonus + records["armorBase"] +
+                  records["armorBonus"]),
+            weaponBase = records["weaponBase"],
+            weaponBonus = records["weaponBonus"],
+            potions = records["potionCount"],
+            potionBase = records["potionBase"],
+            potionBonus = records["potionBonus"],
+            aggression = records["aggression"],
+            awareness = records["awareness"], fear = records["fear"],
+            useAI = records["flags"] & MONSTER)
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    from dice import Dice
+    dice = Dice(1)
+    path = os.path.join(tempfile.mkdtemp(), "orcs.ros")
+    start = time.time()
+    count = write_roster(path, (CompactOrc(dice = dice)
+                                for i in range(1000000)))
+    print("wrote %d orcs (%d bytes) in %.2f seconds" %
+          (count, os.path.getsize(path), time.time() - start))
+    start = time.time()
+    with RosterFile(path) as orcs:
+        print("opened in %.4f seconds" % (time.time() - start))
+        start = time.time()
+        total = sum(orc.AC for orc in orcs)
+        print("average AC %.3f, views read in %.2f seconds" %
+              (total / len(orcs), time.time() - start))
+    os.remove(path)
@@ -0,0 +1,225 @@
+# scheduler.py
+# Talon H.
+# 10/18/2026
+
+''' thousands of fights at once, a slice at a time
+
+    combat() runs until somebody dies or flees, which can be never: two
+    combatants who can't hit each other, or who keep drinking potions,
+    hold whoever runs them for as long as the dice say.  A Scheduler takes
+    fights (events.fight() generators, which can stop and carry on at any
+    event) and round-robins them, giving each one a few rounds at a time.
+    However long one fight goes on, every other fight gets its next slice
+    after at most one slice of each fight in the queue.
+
+    every fight has budgets:
+        maxRounds   - rounds before it is called
+        maxSeconds  - time spent running its slices before it is called
+    and a stalemate check: at the start of every round the state of the
+    fight (health and potions of both sides) is noted, and when the same
+    state has come up stalemateLimit times nothing is happening, since
+    nobody has done any lasting damage or drunk a potion.  A fight that is
+    called is settled by the scheduler's rule, a function
+        rule(one, two) -> "one", "two" or None (a draw)
+    draw, most_health and healthiest are included.
+
+        scheduler = Scheduler(maxRounds = 100, rule = healthiest)
+        for i in range(10000):
+            scheduler.add(Character(), Orc())
+        for combat in scheduler.run():
+            print(combat.result)
+'''
+import time
+from collections import deque
+from dice import DEFAULT_DICE
+from events import fight
+from simulator import choice_for
+
+def draw(one, two):
+    ''' rule: nobody wins a called fight '''
+    return None
+
+def most_health(one, two):
+    ''' rule: whoever has more health left wins, a tie is a draw '''
+    if one.health > two.health:
+        return "one"
+    if two.health > one.health:
+        return "two"
+    return None
+
+def healthiest(one, two):
+    ''' rule: whoever has more of their maximum health left wins '''
+    oneShare = one.health * two.maxHealth
+    twoShare = two.health * one.maxHealth
+    if oneShare > twoShare:
+        return "one"
+    if twoShare > oneShare:
+        return "two"
+    return None
+
+RULES = {"draw": draw,
+         "health": most_health,
+         "healthiest": healthiest}
+
+class Combat(object):
+    ''' one fight in a Scheduler
+
+        result is None until the fight is over, then a dictionary like
+        simulator.bout()'s (winner, fled, rounds, damage, potions) with
+        "ended" added: "death", "fled", "stalemate", "rounds" or "time".'''
+    __slots__ = ('one', 'two', 'events', 'rounds', 'seconds', 'states',
+                 'damage', 'potions', 'fled', 'winner', 'result')
+
+    def __init__(self, one, two, events):
+        self.one = one
+        self.two = two
+        self.events = events
+        self.rounds = 0
+        self.seconds = 0.0
+        self.states = {}        # (health, potions of both): times seen
+        self.damage = [0, 0]
+        self.potions = [0, 0]
+        self.fled = None
+        self.winner = None
+        self.result = None
+
+    def state(self):
+        one, two = self.one, self.two
+        return (one.health, two.health, len(one.potions), len(two.potions))
+
+    def finish(self, ended):
+        ''' stops the fight and fills in result '''
+        self.events.close()
+        self.result = {"winner": self.winner, "fled": self.fled,
+                       "rounds": self.rounds, "damage": self.damage,
+                       "potions": self.potions, "ended": ended}
+        return self.result
+
+class Scheduler(object):
+    ''' round-robins fights, sliceRounds rounds at a time '''
+
+    def __init__(self, sliceRounds = 1, maxRounds = 1000, maxSeconds = None,
+                 stalemateLimit = 20, rule = draw, dice = None,
+                 clock = time.perf_counter):
+        ''' maxRounds, maxSeconds or stalemateLimit can be None for no
+            limit.  Initiative is rolled with dice, DEFAULT_DICE if not
+            given.'''
+        if dice is None:
+            dice = DEFAULT_DICE
+        self.sliceRounds = sliceRounds
+        self.maxRounds = maxRounds
+        self.maxSeconds = maxSeconds
+        self.stalemateLimit = stalemateLimit
+        self.rule = rule
+        self.dice = dice
+        self.clock = clock
+        self.queue = deque()
+
+    def __len__(self):
+        return len(self.queue)
+
+    def add(self, one, two, oneChoice = None, twoChoice = None):
+        ''' queues a fight, choices work like in simulator.bout() '''
+        events = fight(one, two, choice_for(one, oneChoice),
+                       choice_for(two, twoChoice), dice = self.dice)
+        combat = Combat(one, two, events)
+        self.queue.append(combat)
+        return combat
+
+    def call(self, combat, ended):
+        ''' ends a fight that is going nowhere, using the rule '''
+        combat.winner = self.rule(combat.one, combat.two)
+        return combat.finish(ended)
+
+    def new_round(self, combat):
+        ''' bookkeeping at the start of a round, returns why the fight has
+            to be called (or None if it can go on) '''
+        combat.rounds += 1
+        if self.maxRounds is not None and combat.rounds > self.maxRounds:
+            combat.rounds -= 1      # that round never gets played
+            return "rounds"
+        if self.stalemateLimit is not None:
+            state = combat.state()
+            seen = combat.states.get(state, 0) + 1
+            combat.states[state] = seen
+            if seen >= self.stalemateLimit:
+                return "stalemate"
+        return None
+
+    def slice(self, combat):
+        ''' runs combat for up to sliceRounds rounds, returns True when
+            the fight is over '''
+        two = combat.two
+        started = 0
+        for event in combat.events:
+            kind = event.kind
+            if kind == "round":
+                called = self.new_round(combat)
+                if called is not None:
+                    self.call(combat, called)
+                    return True
+                started += 1
+                if started >= self.sliceRounds:
+                    return False
+            elif kind == "hit":
+                combat.damage[event.attacker is two] += event.damage
+            elif kind == "heal":
+                if event.amount is not None:
+                    combat.potions[event.character is two] += 1
+            elif kind == "flee":
+                if event.success:
+                    combat.fled = "two" if event.character is two else "one"
+            elif kind == "death":
+                combat.winner = "one" if event.character is two else "two"
+        combat.finish("death" if combat.fled is None else "fled")
+        return True
+
+    def step(self):
+        ''' gives the next fight in line its slice, returns it if it ended
+            (None if it goes back in line) '''
+        combat = self.queue.popleft()
+        start = self.clock()
+        over = self.slice(combat)
+        combat.seconds += self.clock() - start
+        if not over:
+            if (self.maxSeconds is not None and
+                combat.seconds >= self.maxSeconds):
+                self.call(combat, "time")
+                return combat
+            self.queue.append(combat)
+            return None
+        return combat
+
+    def run(self):
+        ''' generator: every fight, as it ends, until none are left '''
+        while self.queue:
+            combat = self.step()
+            if combat is not None:
+                yield combat
+
+if __name__ == "__main__":
+    from dice import Dice
+    from character import Character
+    from items import Armor
+    from monster import Orc
+    dice = Dice(1)
+    scheduler = Scheduler(rule = healthiest, dice = dice)
+    for i in range(10000):
+        if i % 100 == 0:
+            # neither can ever hit the other: combat() would never end
+            one = Character(armor = Armor("Wall", 100, 0), dice = dice)
+            two = Character(armor = Armor("Wall", 100, 0), dice = dice)
+        else:
+            one = Character(dice = dice)
+            two = Orc(dice = dice)
+        scheduler.add(one, two)
+    start = time.time()
+    ended = {}
+    longest = 0
+    for combat in scheduler.run():
+        reason = combat.result["ended"]
+        ended[reason] = ended.get(reason, 0) + 1
+        longest = max(longest, combat.rounds)
+    print(ended)
+    print("longest fight %d rounds, %.2f seconds" % (longest,
+                                                     time.time() - start))
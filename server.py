@@ -0,0 +1,270 @@
+# server.py
+# Talon H.
+# 10/18/2026
+
+''' combat over TCP, thousands of players on one asyncio event loop
+
+    GameEngine.combat() asks for the player's choice with input(), so every
+    player needs a thread of their own.  GameServer runs the same fights
+    (events.fight(), with the prompt() choice for the player) as asyncio
+    sessions instead: while a session waits for its player's answer it is
+    just a suspended coroutine, so one process holds thousands of them.
+
+    the protocol is lines of UTF-8 text.  Every line from the server starts
+    with a tag:
+        > text      what combat() would have printed
+        ? a/h/f     your turn, answer with a line: a(ttack), h(eal), f(lee)
+        = result    the fight is over: won, lost, fled or escaped (the
+                    monster got away), then the server hangs up
+        ! text      something went wrong (like being idle for too long),
+                    then the server hangs up
+
+    backpressure: at most maxSessions fights run at once, later connections
+    wait their turn (and the listen backlog holds the rest), and every
+    write waits for the player to read what was sent before going on, so a
+    slow player only ever holds up their own session.  A player who takes
+    longer than idleTimeout seconds to answer, or to read, is dropped.
+
+    usage:
+        python simulator.py serve --port 8765
+        python simulator.py loadtest --port 8765 --sessions 2000
+        python simulator.py loadtest --local --sessions 2000
+        python simulator.py serve --ai expectimax
+    loadtest plays many sessions at once (always attacking) and reports how
+    long the server took to answer each action, p50 and p99.
+'''
+import asyncio
+import time
+from dice import Dice
+from events import fight, prompt
+from simulator import choice_for
+import tournament
+import combat_ai
+
+RESULTS = ("won", "lost", "fled", "escaped")
+
+class GameServer(object):
+    ''' hosts combat() sessions for players connecting over TCP '''
+
+    def __init__(self, hero = "simple", monster = "orc", maxSessions = 10000,
+                 idleTimeout = 60.0, seed = None, ai = None):
+        ''' hero and monster are tournament.HEROES and MONSTERS names, ai
+            a combat_ai.AIS name for the monsters (None for their own
+            combat_choice()), shared by every session so they all use the
+            same transposition table
+
+            every session rolls with the server's one Dice stream, which is
+            safe because the sessions all run on one thread.'''
+        self.hero = tournament.HEROES[hero]
+        self.monster = tournament.MONSTERS[monster]
+        self.idleTimeout = idleTimeout
+        self.slots = asyncio.Semaphore(maxSessions)
+        self.dice = Dice(seed)
+        self.ai = None if ai is None else combat_ai.AIS[ai]()
+        self.server = None
+        self.waiting = 0        # connected, but no free session yet
+        self.active = 0
+        self.finished = 0
+        self.dropped = 0        # timed out or disconnected mid-fight
+
+    async def start(self, host = "127.0.0.1", port = 0, backlog = 4096):
+        ''' starts listening, port 0 picks a free port (see port) '''
+        self.server = await asyncio.start_server(self.handle, host, port,
+                                                 backlog = backlog)
+        return self.server
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        ''' one connection: waits for a free session, then plays it '''
+        self.waiting += 1
+        try:
+            async with self.slots:
+                self.waiting -= 1
+                self.active += 1
+                try:
+                    result = await self.play(reader, writer)
+                finally:
+                    self.active -= 1
+            if result is None:
+                self.dropped += 1
+            else:
+                self.finished += 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.dropped += 1
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def send(self, writer, text):
+        ''' writes text, and waits until the player has taken it '''
+        writer.write(text.encode())
+        await asyncio.wait_for(writer.drain(), self.idleTimeout)
+
+    async def play(self, reader, writer):
+        ''' runs one fight, returns its result (None if the player left) '''
+        hero = self.hero(self.dice)
+        enemy = self.monster(self.dice)
+        if self.ai is None:
+            enemyChoice = choice_for(enemy)
+        else:
+            enemyChoice = self.ai.against(hero)
+        events = fight(hero, enemy, prompt, enemyChoice, dice = self.dice)
+        lines = ["> " + hero.name + " meets " + enemy.name + "!\n"]
+        choice = None
+        try:
+            while True:
+                try:
+                    event = events.send(choice)
+                except StopIteration:
+                    return None     # nobody won, can't happen in combat()
+                choice = None
+                kind = event.kind
+                if kind == "prompt":
+                    lines.append("? a/h/f\n")
+                    await self.send(writer, "".join(lines))
+                    lines = []
+                    line = await asyncio.wait_for(reader.readline(),
+                                                  self.idleTimeout)
+                    if not line:
+                        return None
+                    choice = line.decode(errors = "replace").strip()[:1]
+                    choice = choice.lower()
+                    continue
+                message = event.message
+                if message is not None:
+                    lines.extend(["> " + text + "\n"
+                                  for text in message.split("\n") if text])
+                if kind == "death":
+                    result = "won" if event.character is enemy else "lost"
+                elif kind == "flee" and event.success:
+                    result = "fled" if event.character is hero else "escaped"
+                else:
+                    continue
+                lines.append("= " + result + "\n")
+                await self.send(writer, "".join(lines))
+                return result
+        except asyncio.TimeoutError:
+            writer.write(b"! idle for too long, goodbye\n")
+            return None
+        finally:
+            events.close()
+
+def percentile(values, percent):
+    ''' nearest rank percentile of a sorted list '''
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+async def play_session(host, port, fights, latencies, results):
+    ''' one load test player: fights fights in a row, always attacking
+
+        the time from sending an action to the server's answer (the next
+        prompt, or the end of the fight) goes in latencies.'''
+    for i in range(fights):
+        reader, writer = await asyncio.open_connection(host, port)
+        sent = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    results["dropped"] += 1
+                    break
+                tag = line[:1]
+                if tag in (b"?", b"=", b"!") and sent is not None:
+                    latencies.append(time.perf_counter() - sent)
+                    sent = None
+                if tag == b"?":
+                    writer.write(b"a\n")
+                    sent = time.perf_counter()
+                    await writer.drain()
+                elif tag == b"=":
+                    results[line[2:].decode().strip()] += 1
+                    break
+                elif tag == b"!":
+                    results["dropped"] += 1
+                    break
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+async def load_test(host, port, sessions = 1000, fights = 1):
+    ''' plays sessions sessions at once against a server
+
+        returns a dictionary: sessions, fights, actions, seconds, p50, p99
+        and max (action latencies in seconds), and a count per result.'''
+    latencies = []
+    results = dict.fromkeys(RESULTS + ("dropped",), 0)
+    start = time.perf_counter()
+    await asyncio.gather(*[play_session(host, port, fights, latencies,
+                                        results)
+                           for i in range(sessions)])
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    summary = {"sessions": sessions, "fights": sessions * fights,
+               "actions": len(latencies), "seconds": seconds,
+               "p50": percentile(latencies, 50),
+               "p99": percentile(latencies, 99),
+               "max": latencies[-1] if latencies else None}
+    summary.update(results)
+    return summary
+
+def print_load(summary):
+    ''' prints a load_test() summary '''
+    print("%(sessions)d sessions, %(fights)d fights, %(actions)d actions "
+          "in %(seconds).2f seconds" % summary)
+    if summary["actions"]:
+        print("action latency: p50 %.2f ms, p99 %.2f ms, max %.2f ms" %
+              (summary["p50"] * 1000, summary["p99"] * 1000,
+               summary["max"] * 1000))
+    print(", ".join(key + " " + str(summary[key])
+                    for key in RESULTS + ("dropped",)))
+
+def serve_command(args):
+    ''' the "serve" command of simulator.py '''
+    async def serve():
+        server = GameServer(args.hero, args.monster, args.max_sessions,
+                            args.idle_timeout, args.seed, args.ai)
+        await server.start(args.host, args.port)
+        print("serving on %s:%d" % (args.host, server.port))
+        await server.serve_forever()
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+def loadtest_command(args):
+    ''' the "loadtest" command of simulator.py '''
+    async def run():
+        port = args.port
+        server = None
+        if args.local:
+            server = GameServer(args.hero, args.monster, args.max_sessions,
+                                args.idle_timeout, args.seed, args.ai)
+            await server.start(args.host, 0)
+            port = server.port
+        try:
+            return await load_test(args.host, port, args.sessions,
+                                   args.fights)
+        finally:
+            if server is not None:
+                await server.close()
+    print_load(asyncio.run(run()))
+
+if __name__ == "__main__":
+    import simulator
+    simulator.main(["loadtest", "--local"])
@@ -0,0 +1,293 @@
+# simulator.py
+# Talon H.
+# 10/18/2026
+
+''' headless combat engine for balance testing
+
+    GameEngine.combat() prints every round and asks the player for input,
+    which is great for playing but useless for running thousands of fights.
+    This module runs the exact same rules with no I/O at all and hands back
+    a dictionary per bout instead of text.
+
+    Characters whose combat_choice() is the interactive one from the
+    Character class are given a stand-in policy (always attack, which is
+    the default answer of the prompt).  Monsters keep their own AI.
+
+    command line:
+        python simulator.py simulate --one hero --two orc -n 100000
+    streams one JSON object per bout (JSON Lines) to stdout.  Add
+    --vectorized to run the bouts through vector_sim (needs numpy).
+        python simulator.py tournament --bouts 10000
+    runs every hero build against every monster, see tournament.py.
+        python simulator.py simulate --replay bouts.rpl ...
+        python simulator.py replay bouts.rpl --bout 17
+    archives bouts to a binary replay file and reads them back, see
+    replay.py.
+        python simulator.py serve --port 8765
+        python simulator.py loadtest --local --sessions 2000
+    plays combat() with real players over TCP, and load tests that, see
+    server.py.
+'''
+import argparse
+import json
+import sys
+from character import *
+from monster import *
+from events import fight
+from snapshot import snapshot
+
+# builds that can be picked from the command line
+BUILDS = {"hero": Character,
+          "monster": Monster,
+          "orc": Orc}
+
+def always_attack(combatant):
+    ''' headless stand-in for the player's combat_choice() prompt '''
+    return "a"
+
+def choice_for(combatant, policy = None):
+    ''' returns the function used to pick combatant's action each turn
+
+        an explicit policy always wins.  Otherwise anything that overrides
+        combat_choice() (every Monster does) uses its own AI, and plain
+        Characters, whose combat_choice() calls input(), get always_attack.'''
+    if policy is not None:
+        return policy
+    if type(combatant).combat_choice is Character.combat_choice:
+        return always_attack
+    return lambda combatant: combatant.combat_choice()
+
+def bout(one, two, oneChoice = None, twoChoice = None, maxRounds = None,
+         dice = None, recorder = None):
+    ''' runs one silent fight between one and two, same rules as combat()
+
+        one and two are changed by the fight (health, potions), just like
+        combat() does.  maxRounds stops a fight that goes on forever (for
+        example when neither side can ever hit the other); None means no
+        limit, which is what combat() does.  Initiative is rolled with dice
+        (DEFAULT_DICE if not given), everything else with the combatants'
+        own dice.  recorder, a replay.ReplayWriter, archives the bout.
+
+        returns a dictionary:
+            winner  - "one", "two" or None (somebody fled, or out of rounds)
+            fled    - "one", "two" or None
+            rounds  - number of rounds started
+            damage  - [damage dealt by one, damage dealt by two]
+            potions - [potions used by one, potions used by two]'''
+    damage = [0, 0]
+    potions = [0, 0]
+    result = {"winner": None, "fled": None, "rounds": 0,
+              "damage": damage, "potions": potions}
+    rounds = 0
+    events = fight(one, two, choice_for(one, oneChoice),
+                   choice_for(two, twoChoice), maxRounds, dice)
+    if recorder is not None:
+        events = recorder.recording(one, two, events)
+    for event in events:
+        kind = event.kind
+        if kind == "hit":
+            damage[event.attacker is two] += event.damage
+        elif kind == "round":
+            rounds += 1
+        elif kind == "heal":
+            if event.amount is not None:
+                potions[event.character is two] += 1
+        elif kind == "flee":
+            if event.success:
+                result["fled"] = "two" if event.character is two else "one"
+        elif kind == "death":
+            result["winner"] = "one" if event.character is two else "two"
+
+    result["rounds"] = rounds
+    return result
+
+def run_bouts(one, two, count, oneChoice = None, twoChoice = None,
+              maxRounds = None, dice = None, recorder = None):
+    ''' generator: fights count bouts between one and two
+
+        every bout starts from one and two as they were when the generator
+        started (health, potions, inventory, and modifiers with the rounds
+        they had left, see snapshot.py), and both are put back that way
+        when it is done, so the same instances can be reused.  Yields the
+        bout() dictionaries with an extra "bout" number.'''
+    start = snapshot(one, two)
+    try:
+        for number in range(count):
+            start.restore()
+            result = bout(one, two, oneChoice, twoChoice, maxRounds, dice,
+                          recorder)
+            result["bout"] = number
+            yield result
+    finally:
+        start.restore()
+
+def summarize(results):
+    ''' totals up an iterable of bout results '''
+    summary = {"bouts": 0, "oneWins": 0, "twoWins": 0, "oneFled": 0,
+               "twoFled": 0, "undecided": 0, "rounds": 0}
+    for result in results:
+        summary["bouts"] += 1
+        summary["rounds"] += result["rounds"]
+        if result["winner"] == "one":
+            summary["oneWins"] += 1
+        elif result["winner"] == "two":
+            summary["twoWins"] += 1
+        elif result["fled"] == "one":
+            summary["oneFled"] += 1
+        elif result["fled"] == "two":
+            summary["twoFled"] += 1
+        else:
+            summary["undecided"] += 1
+    return summary
+
+def simulate_command(args):
+    ''' the "simulate" command: streams bouts as JSON Lines '''
+    dice = Dice(args.seed)
+    one = BUILDS[args.one](dice = dice)
+    two = BUILDS[args.two](dice = dice)
+    out = args.output
+    dumps = json.JSONEncoder(separators = (",", ":")).encode
+    if args.vectorized:
+        import vector_sim
+        batch = vector_sim.DuelBatch.repeat(one, two, args.count,
+                                            seed = args.seed)
+        results = batch.run(args.max_rounds).results()
+    else:
+        recorder = None
+        if args.replay is not None:
+            import replay
+            recorder = replay.ReplayWriter(args.replay, args.compression)
+        results = run_bouts(one, two, args.count, maxRounds = args.max_rounds,
+                            dice = dice, recorder = recorder)
+    for result in results:
+        out.write(dumps(result) + "\n")
+    out.flush()
+    if not args.vectorized and recorder is not None:
+        recorder.close()
+
+def replay_command(args):
+    ''' the "replay" command: prints the events of archived bouts '''
+    import replay
+    dumps = json.JSONEncoder(separators = (",", ":")).encode
+    with replay.ReplayReader(args.file) as reader:
+        if args.bout is None:
+            bouts = range(len(reader))
+        else:
+            bouts = args.bout
+        for number in bouts:
+            events = [list(event) for event in reader[number].events()]
+            args.output.write(dumps({"bout": number, "events": events}) +
+                              "\n")
+
+def tournament_command(args):
+    ''' the "tournament" command, see tournament.py '''
+    import tournament
+    tournament.tournament_command(args)
+
+def serve_command(args):
+    ''' the "serve" command, see server.py '''
+    import server
+    server.serve_command(args)
+
+def loadtest_command(args):
+    ''' the "loadtest" command, see server.py '''
+    import server
+    server.loadtest_command(args)
+
+def server_arguments(parser):
+    ''' the arguments "serve" and "loadtest" share '''
+    import tournament
+    import combat_ai
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8765)
+    parser.add_argument("--hero", choices = sorted(tournament.HEROES),
+                        default = "simple")
+    parser.add_argument("--monster", choices = sorted(tournament.MONSTERS),
+                        default = "orc")
+    parser.add_argument("--max-sessions", type = int, default = 10000,
+                        help = "fights at once, later players wait")
+    parser.add_argument("--idle-timeout", type = float, default = 60.0,
+                        help = "seconds a player may keep the server waiting")
+    parser.add_argument("--seed", type = int, default = None)
+    parser.add_argument("--ai", choices = sorted(combat_ai.AIS),
+                        default = None,
+                        help = "how monsters choose (default: their own)")
+
+def build_parser():
+    ''' command line parser, one sub-command per tool '''
+    import tournament as pairings
+    parser = argparse.ArgumentParser(prog = "simulator",
+                                     description = "headless combat tools")
+    commands = parser.add_subparsers(dest = "command")
+    commands.required = True
+
+    simulate = commands.add_parser("simulate",
+                                   help = "stream bouts as JSON Lines")
+    simulate.add_argument("--one", choices = sorted(BUILDS), default = "hero")
+    simulate.add_argument("--two", choices = sorted(BUILDS), default = "orc")
+    simulate.add_argument("-n", "--count", type = int, default = 1000)
+    simulate.add_argument("--seed", type = int, default = None)
+    simulate.add_argument("--max-rounds", type = int, default = 1000,
+                          help = "give up on a bout after this many rounds")
+    simulate.add_argument("--vectorized", action = "store_true",
+                          help = "run all bouts at once with numpy")
+    simulate.add_argument("-o", "--output", type = argparse.FileType("w"),
+                          default = sys.stdout)
+    simulate.add_argument("--replay", default = None, metavar = "FILE",
+                          help = "also archive every bout to a replay file")
+    simulate.add_argument("--compression", choices = ("zlib", "lzma"),
+                          default = None)
+    simulate.set_defaults(func = simulate_command)
+
+    replayer = commands.add_parser("replay",
+                                   help = "print bouts from a replay file")
+    replayer.add_argument("file")
+    replayer.add_argument("--bout", type = int, nargs = "+", default = None)
+    replayer.add_argument("-o", "--output", type = argparse.FileType("w"),
+                          default = sys.stdout)
+    replayer.set_defaults(func = replay_command)
+
+    tournament = commands.add_parser("tournament",
+                                     help = "every hero build against every "
+                                            "monster, as a win rate matrix")
+    tournament.add_argument("--heroes", nargs = "+", default = None,
+                            choices = sorted(pairings.HEROES))
+    tournament.add_argument("--monsters", nargs = "+", default = None,
+                            choices = sorted(pairings.MONSTERS))
+    tournament.add_argument("--bouts", type = int, default = 1000,
+                            help = "bouts per pairing")
+    tournament.add_argument("--workers", type = int, default = None,
+                            help = "processes, default one per core")
+    tournament.add_argument("--chunk-size", type = int, default = 500)
+    tournament.add_argument("--seed", type = int, default = 0)
+    tournament.add_argument("--max-rounds", type = int, default = 1000)
+    tournament.set_defaults(func = tournament_command)
+
+    serve = commands.add_parser("serve", help = "play combat() over TCP")
+    server_arguments(serve)
+    serve.set_defaults(func = serve_command)
+
+    loadtest = commands.add_parser("loadtest",
+                                   help = "many players at once against a "
+                                          "server, with latency percentiles")
+    server_arguments(loadtest)
+    loadtest.add_argument("--sessions", type = int, default = 1000,
+                          help = "players at once")
+    loadtest.add_argument("--fights", type = int, default = 1,
+                          help = "fights per player, one after another")
+    loadtest.add_argument("--local", action = "store_true",
+                          help = "start a server in this process to test")
+    loadtest.set_defaults(func = loadtest_command)
+    return parser
+
+def main(argv = None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if (args.func is simulate_command and args.vectorized and
+            (args.replay is not None or args.compression is not None)):
+        parser.error("--vectorized bouts can't be archived, "
+                     "--replay and --compression need the plain loop")
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# snapshot.py
+# Talon H.
+# 10/18/2026
+
+''' cheap snapshots of combatants, for what-ifs, lookahead and rollback
+
+    trying a move and taking it back used to mean copy.deepcopy() of both
+    combatants, which copies every Weapon, Armor and Potion (and the dice
+    stream, and everything else hanging off them) every single time.  A
+    Snapshot copies none of those.  It is an immutable record of
+    references: every slot of the combatant as it is now, with copies of
+    its potions and inventory (a few Stacks, see inventory.py, however
+    many potions there are) and the modifiers' bookkeeping saved
+    alongside.  restore() puts them all back.
+
+    the items themselves are shared, between the live combatant and every
+    snapshot taken of it, so all of them stay cheap no matter how many
+    branches there are.  That makes items copy-on-write: combat never
+    changes an item in place (potions are popped off the pouch, not
+    emptied), and a what-if that wants a different weapon should give the
+    combatant a new Weapon rather than change the bonus of the one it has
+    (shared catalog items refuse to be changed anyway).  The dice stream
+    is shared too, a restore doesn't rewind it.
+
+        before = snapshot(hero, orc)
+        hero.attack(orc)            # what if?
+        before.restore()            # as if it never happened
+
+    taking a snapshot of a hero and an orc takes about 8 to 10 us here,
+    and restoring it about 9 to 11 us, against some 200 us for a deepcopy
+    (run this module to measure them).  That hardly changes with how much
+    the combatants carry: potions are a Pouch of a few stacks, and an
+    inventory is only copied if there is one.
+'''
+import operator
+from character import slots_of
+
+# slots that hold mutable containers, saved and put back separately
+SPECIAL = ('potions', '_inventory', 'modifiers')
+
+class Layout(object):
+    ''' how to read and write every plain slot of one class at once '''
+    __slots__ = ('names', 'get', 'separate')
+
+    def __init__(self, cls):
+        self.names = tuple(name for name in slots_of(cls)
+                           if name not in SPECIAL)
+        self.get = operator.attrgetter(*self.names)
+        # regular (not Compact) classes can have attributes in a __dict__
+        self.separate = cls.__dictoffset__ != 0
+
+# class: its Layout, made the first time a snapshot of one is taken
+layouts = {}
+
+def save_modifiers(modifiers):
+    ''' the state of a Modifiers object, or None if there isn't one '''
+    if modifiers is None:
+        return None
+    timed = tuple(timer[2] for timer in modifiers.timers)
+    return (modifiers, tuple(modifiers.totals.items()),
+            tuple(modifiers.active), tuple(modifiers.timers), modifiers.clock,
+            modifiers.counter, tuple(m.active for m in timed))
+
+def load_modifiers(saved):
+    ''' puts a Modifiers object back the way save_modifiers() found it '''
+    if saved is None:
+        return None
+    modifiers, totals, active, timers, clock, counter, flags = saved
+    modifiers.totals = dict(totals)
+    modifiers.active = list(active)
+    modifiers.timers = list(timers)     # still a heap, it was one
+    modifiers.clock = clock
+    modifiers.counter = counter
+    for modifier in active:
+        modifier.active = True
+    for timer, flag in zip(timers, flags):
+        timer[2].active = flag
+    return modifiers
+
+def copy_of(inventory):
+    ''' a copy of an Inventory, or None if there isn't one yet '''
+    if inventory is None:
+        return None
+    return inventory.copy()
+
+class Snapshot(object):
+    ''' one combatant as it was when the snapshot was taken '''
+    __slots__ = ('combatant', 'layout', 'values', 'potions', 'inventory',
+                 'modifiers', 'extra')
+
+    def __init__(self, combatant):
+        cls = type(combatant)
+        layout = layouts.get(cls)
+        if layout is None:
+            layout = layouts[cls] = Layout(cls)
+        self.combatant = combatant
+        self.layout = layout
+        self.values = layout.get(combatant)
+        self.potions = combatant.potions.copy()
+        self.inventory = copy_of(combatant._inventory)
+        self.modifiers = save_modifiers(combatant.modifiers)
+        self.extra = None
+        if layout.separate and combatant.__dict__:
+            self.extra = combatant.__dict__.copy()
+
+    def restore(self):
+        ''' puts the combatant back the way it was, returns it '''
+        combatant = self.combatant
+        for name, value in zip(self.layout.names, self.values):
+            setattr(combatant, name, value)
+        combatant.potions = self.potions.copy()
+        combatant._inventory = copy_of(self.inventory)
+        combatant.modifiers = load_modifiers(self.modifiers)
+        if self.layout.separate:
+            combatant.__dict__.clear()
+            if self.extra is not None:
+                combatant.__dict__.update(self.extra)
+        return combatant
+
+class FightSnapshot(object):
+    ''' snapshots of everybody in a fight, restored together '''
+    __slots__ = ('snapshots',)
+
+    def __init__(self, combatants):
+        self.snapshots = tuple(Snapshot(combatant)
+                               for combatant in combatants)
+
+    def restore(self):
+        for snapshot in self.snapshots:
+            snapshot.restore()
+
+def snapshot(*combatants):
+    ''' a FightSnapshot of all the combatants '''
+    return FightSnapshot(combatants)
+
+if __name__ == "__main__":
+    import copy
+    import time
+    from character import Character
+    from monster import Orc
+    from dice import Dice
+    dice = Dice(1)
+    hero = Character(dice = dice)
+    hero.add_modifier("strength", 2, duration = 3, source = "bless")
+    orc = Orc(dice = dice)
+
+    def timed(label, work, count):
+        start = time.time()
+        for i in range(count):
+            work()
+        seconds = (time.time() - start) / count
+        print("%-34s %8.2f us each" % (label, seconds * 1e6))
+        return seconds
+
+    # deepcopy copies the dice stream (and its buffered rolls) too, the
+    # second line keeps it shared like a snapshot does
+    timed("deepcopy(hero, orc)", lambda: copy.deepcopy((hero, orc)), 2000)
+    slow = timed("deepcopy, dice shared",
+                 lambda: copy.deepcopy((hero, orc), {id(dice): dice}), 20000)
+    fast = timed("snapshot(hero, orc)", lambda: snapshot(hero, orc), 200000)
+    before = snapshot(hero, orc)
+    timed("restore()", before.restore, 200000)
+    print("snapshots %.0f times faster" % (slow / fast))
+
+    def what_if_deepcopy():
+        one, two = copy.deepcopy((hero, orc), {id(dice): dice})
+        one.attack_event(two)
+        two.heal_event()
+
+    def what_if_snapshot():
+        hero.attack_event(orc)
+        orc.heal_event()
+        before.restore()
+
+    slow = timed("what-if, deepcopy", what_if_deepcopy, 20000)
+    fast = timed("what-if, snapshot and restore", what_if_snapshot, 200000)
+    print("what-ifs %.0f times faster" % (slow / fast))
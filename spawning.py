@@ -0,0 +1,212 @@
+# spawning.py
+# Talon H.
+# 10/18/2026
+
+''' endless streams of dungeon encounters from weighted spawn tables
+
+    every dungeon level has a spawn table, how likely each kind of monster
+    (from bestiary.py) is to turn up there, and every difficulty has a
+    challenge budget.  An encounter on level L at difficulty D is one or
+    more waves, and each wave is monsters drawn from level L's table until
+    their challenges add up to as much of budgets[D] * L as will fit.
+    Tables and budgets come from a JSON file (spawns.json by default):
+
+        {"budgets": {"easy": 2, "normal": 4, ...},
+         "levels": {"1": {"monster": 6, "orc": 1}, ...}}
+
+    a level missing from the file uses the nearest table above it, so
+    levels deeper than the last one in the file use the last table.
+
+    draws use the alias method: a table of n kinds is cut into n equal
+    columns, each holding at most two kinds, so one random number picks a
+    column and then a kind in it, whatever the weights are.  Only kinds
+    that still fit in the budget are drawn from; since those are always
+    the cheapest ones, every possible "what is left" is one of n prefix
+    tables built up front, and no draw is ever thrown away.
+
+    encounters() and monsters() are generators that never end (unless
+    given a count), so they can feed anything that wants encounters a few
+    at a time or by the million.
+
+        dungeon = Dungeon.from_file()
+        for waves in dungeon.encounters(level = 3, difficulty = "hard"):
+            ...     # (("orc", "orc", "monster"),) and so on
+'''
+import bisect
+import json
+import os
+from dice import DEFAULT_DICE
+import bestiary
+
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "spawns.json")
+
+class AliasTable(object):
+    ''' O(1) draws from a fixed set of weighted items (Vose's method) '''
+    __slots__ = ('items', 'chance', 'alias', 'size')
+
+    def __init__(self, weights):
+        ''' weights is a list of (item, weight) pairs, weights > 0 '''
+        self.items = [item for item, weight in weights]
+        self.size = size = len(weights)
+        total = float(sum(weight for item, weight in weights))
+        scaled = [weight * size / total for item, weight in weights]
+        self.chance = [1.0] * size
+        self.alias = list(range(size))
+        small = [i for i, share in enumerate(scaled) if share < 1.0]
+        large = [i for i, share in enumerate(scaled) if share >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.chance[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+        # anything left over is 1.0 give or take rounding, keep it whole
+
+    def draw(self, dice = None):
+        ''' one item, with probability weight / total weight '''
+        if dice is None:
+            dice = DEFAULT_DICE
+        spot = dice.random.random() * self.size
+        column = int(spot)
+        if spot - column < self.chance[column]:
+            return self.items[column]
+        return self.items[self.alias[column]]
+
+class SpawnTable(object):
+    ''' one level's weighted kinds, and budget-limited waves from them '''
+
+    def __init__(self, weights, costs):
+        ''' weights is {kind: weight}, costs is {kind: challenge}
+
+            challenges can be any numbers above 0 (1/2 for a rat, say),
+            ValueError if one isn't.'''
+        kinds = sorted((kind for kind in weights if weights[kind] > 0),
+                       key = lambda kind: (costs[kind], kind))
+        if not kinds:
+            raise ValueError("a spawn table needs a kind with some weight")
+        for kind in kinds:
+            # a kind that costs nothing would fill a wave forever
+            if not costs[kind] > 0:
+                raise ValueError("%s has challenge %r, it must be above 0"
+                                 % (kind, costs[kind]))
+        self.costs = [costs[kind] for kind in kinds]
+        self.cheapest = self.costs[0]
+        # prefixes[i] draws from the i + 1 cheapest kinds, and hands back
+        # their positions, so costs can be looked up without a dict
+        self.prefixes = [AliasTable([(i, weights[kind])
+                                     for i, kind in enumerate(kinds[:n])])
+                         for n in range(1, len(kinds) + 1)]
+        self.kinds = kinds
+
+    def wave(self, budget, dice):
+        ''' kinds drawn until nothing else fits in budget, as a tuple '''
+        kinds = self.kinds
+        costs = self.costs
+        prefixes = self.prefixes
+        # costs are sorted, so the kinds that fit are the ones before
+        # where budget would go
+        fitting = bisect.bisect_right
+        random = dice.random.random
+        drawn = []
+        while budget >= self.cheapest:
+            table = prefixes[fitting(costs, budget) - 1]
+            # AliasTable.draw() inlined, this is the hot loop
+            spot = random() * table.size
+            column = int(spot)
+            if spot - column < table.chance[column]:
+                pick = table.items[column]
+            else:
+                pick = table.items[table.alias[column]]
+            drawn.append(kinds[pick])
+            budget -= costs[pick]
+        return tuple(drawn)
+
+class Dungeon(object):
+    ''' every level's spawn table and every difficulty's budget '''
+
+    def __init__(self, levels, budgets, registry = None):
+        ''' levels is {level number: {kind: weight}}, budgets is
+            {difficulty: budget per level}.  Challenges and monsters come
+            from registry, bestiary's default one if not given.'''
+        if registry is None:
+            registry = bestiary.default_registry()
+        self.registry = registry
+        self.budgets = budgets
+        costs = {kind: registry.challenge(kind) for kind in registry.names}
+        self.tables = {int(level): SpawnTable(weights, costs)
+                       for level, weights in levels.items()}
+        self.deepest = max(self.tables)
+
+    @classmethod
+    def from_file(cls, path = DEFAULT_FILE, registry = None):
+        with open(path) as source:
+            data = json.load(source)
+        return cls(data["levels"], data["budgets"], registry)
+
+    def table(self, level):
+        ''' the spawn table of level, or of the nearest level above it
+            that has one (the deepest one past the end) '''
+        for above in range(min(level, self.deepest), 0, -1):
+            if above in self.tables:
+                return self.tables[above]
+        return self.tables[min(self.tables)]
+
+    def budget(self, level, difficulty):
+        return self.budgets[difficulty] * level
+
+    def encounters(self, level, difficulty, waves = 1, count = None,
+                   dice = None):
+        ''' generator: encounters as tuples of waves of kind names
+
+            goes on forever unless count is given.'''
+        if dice is None:
+            dice = DEFAULT_DICE
+        wave = self.table(level).wave
+        budget = self.budget(level, difficulty)
+        made = 0
+        while count is None or made < count:
+            if waves == 1:
+                yield (wave(budget, dice),)
+            else:
+                yield tuple([wave(budget, dice) for i in range(waves)])
+            made += 1
+
+    def monsters(self, level, difficulty, waves = 1, count = None,
+                 dice = None):
+        ''' generator: like encounters(), with real monsters spawned from
+            the registry instead of kind names '''
+        if dice is None:
+            dice = DEFAULT_DICE
+        spawn = self.registry.spawn
+        for encounter in self.encounters(level, difficulty, waves, count,
+                                         dice):
+            yield [[spawn(kind, dice) for kind in kinds]
+                   for kinds in encounter]
+
+if __name__ == "__main__":
+    import time
+    from dice import Dice
+    dice = Dice(1)
+    dungeon = Dungeon.from_file()
+    count = 1000000
+    start = time.time()
+    drawn = {}
+    for encounter in dungeon.encounters(3, "hard", count = count,
+                                        dice = dice):
+        for kind in encounter[0]:
+            drawn[kind] = drawn.get(kind, 0) + 1
+    seconds = time.time() - start
+    print("%d encounters in %.2f seconds (%d a minute)" %
+          (count, seconds, count * 60 / seconds))
+    print(drawn)
+    start = time.time()
+    for encounter in dungeon.monsters(3, "hard", count = 10000,
+                                      dice = dice):
+        pass
+    print("10000 encounters of real monsters in %.2f seconds" %
+          (time.time() - start))
@@ -0,0 +1,165 @@
+# stat_blocks.py
+# Talon H.
+# 10/18/2026
+
+''' millions of ability-score blocks at once, for every creation method
+
+    create_player() and the character_creator frames roll one score at a
+    time, which is fine for one player.  Seeding a population (or checking
+    that a method gives the spread it should) wants millions of blocks, so
+    generate() makes them as one (count, 6) uint8 array, columns in the
+    usual order: str, dex, con, int, wis, cha.  The rules are the same:
+
+        hardcore  scores in order, the whole block rolled again unless one
+                  of them is over 11
+        4d6       each score is 4d6 with the lowest die dropped, left in
+                  the order rolled (the player arranges them afterwards)
+        simple    every score 12, one picked at random raised to 17 and a
+                  different one lowered to 9
+
+    the hardcore "3d6" is dice.randint(3, 18) in create_player() and the
+    Hardcore frame, every score from 3 to 18 equally likely, so that is
+    what is used here too.  Swap HARDCORE_SCORE for three_d_six() to get
+    the bell curve instead.
+
+    every score is drawn from its exact distribution (a probability for
+    each value 3 to 18) in one go, instead of by rolling dice.  hardcore
+    doesn't roll blocks and throw them away either: a block it would keep
+    has its first score over 11 in column k, everything before k is 11 or
+    less, and anything after k is unconstrained.  So k is drawn first
+    (with the chance of exactly that happening), then each column from the
+    right distribution.  That is exactly a rolled-until-kept block, with
+    a fixed amount of work per block.
+
+    expected() gives each column's exact distribution for comparing.
+
+        blocks = generate("hardcore", 1000000, seed = 1)
+        blocks[:, 0].mean()     # average strength
+
+    needs numpy.
+'''
+import itertools
+import numpy as np
+from character import CompactCharacter
+
+STATS = ("strength", "dexterity", "constitution", "intelligence", "wisdom",
+         "charisma")
+HIGHEST = 18
+KEEP_OVER = 11      # hardcore keeps a block with any score over this
+
+def pmf(scores):
+    ''' {score: chance} as an array indexed by score, 0 to HIGHEST '''
+    chances = np.zeros(HIGHEST + 1)
+    for score, chance in scores.items():
+        chances[score] += chance
+    return chances / chances.sum()
+
+def uniform(low, high):
+    ''' every score from low to high equally likely, like dice.randint '''
+    return pmf({score: 1 for score in range(low, high + 1)})
+
+def three_d_six():
+    ''' the sum of three real d6s '''
+    scores = {}
+    for dice in itertools.product(range(1, 7), repeat = 3):
+        scores[sum(dice)] = scores.get(sum(dice), 0) + 1
+    return pmf(scores)
+
+def four_d_six_drop_lowest():
+    ''' 4d6, the lowest die dropped, like FourD6.roll_dice() '''
+    scores = {}
+    for dice in itertools.product(range(1, 7), repeat = 4):
+        score = sum(dice) - min(dice)
+        scores[score] = scores.get(score, 0) + 1
+    return pmf(scores)
+
+HARDCORE_SCORE = uniform(3, 18)
+FOUR_D_SIX_SCORE = four_d_six_drop_lowest()
+
+def sample(chances, shape, rng):
+    ''' an array of shape scores drawn from chances (see pmf) '''
+    cdf = np.cumsum(chances)
+    cdf[-1] = 1.0       # so rounding never lets a draw off the end
+    return np.searchsorted(cdf, rng.random(shape),
+                           side = "right").astype(np.uint8)
+
+def hardcore(count, rng):
+    ''' count hardcore blocks, with no rerolling (see the module doc) '''
+    low = HARDCORE_SCORE.copy()
+    low[KEEP_OVER + 1:] = 0
+    high = HARDCORE_SCORE - low
+    lowChance = low.sum()
+    # chance the first score over KEEP_OVER is in column k, if kept
+    first = np.array([lowChance ** k * (1 - lowChance)
+                      for k in range(len(STATS))])
+    column = sample(first / first.sum(), count, rng)
+    blocks = sample(HARDCORE_SCORE, (count, len(STATS)), rng)
+    before = np.arange(len(STATS)) < column[:, None]
+    blocks[before] = sample(low / lowChance, int(before.sum()), rng)
+    blocks[np.arange(count), column] = sample(high / high.sum(), count, rng)
+    return blocks
+
+def four_d_six(count, rng):
+    ''' count blocks of 4d6-drop-lowest scores, in the order rolled '''
+    return sample(FOUR_D_SIX_SCORE, (count, len(STATS)), rng)
+
+def simple(count, rng):
+    ''' count simple blocks, a random 17, a different random 9 '''
+    blocks = np.full((count, len(STATS)), 12, dtype = np.uint8)
+    rows = np.arange(count)
+    raised = rng.integers(0, len(STATS), size = count)
+    lowered = rng.integers(0, len(STATS) - 1, size = count)
+    lowered += lowered >= raised
+    blocks[rows, raised] = 17
+    blocks[rows, lowered] = 9
+    return blocks
+
+METHODS = {"hardcore": hardcore, "4d6": four_d_six, "simple": simple}
+
+def generate(method, count, seed = None, rng = None):
+    ''' count blocks made with method (a METHODS name), (count, 6) uint8
+
+        draws from rng, or a new numpy Generator seeded with seed.'''
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    return METHODS[method](count, rng)
+
+def expected(method):
+    ''' each column's exact distribution under method, (6, HIGHEST + 1)
+
+        row i, entry s is the chance that score i of a block is s.'''
+    if method == "hardcore":
+        low = HARDCORE_SCORE[:KEEP_OVER + 1].sum()
+        kept = 1 - low ** len(STATS)
+        column = HARDCORE_SCORE.copy()
+        # a low score is only kept if one of the other five is high
+        column[:KEEP_OVER + 1] *= 1 - low ** (len(STATS) - 1)
+        column /= kept
+    elif method == "4d6":
+        column = FOUR_D_SIX_SCORE
+    elif method == "simple":
+        column = pmf({17: 1, 9: 1, 12: len(STATS) - 2})
+    else:
+        raise KeyError(method)
+    return np.tile(column, (len(STATS), 1))
+
+def characters(blocks, cls = CompactCharacter, dice = None):
+    ''' generator: a cls (default CompactCharacter) for every block '''
+    for block in blocks.tolist():
+        yield cls(strength = block[0], dexterity = block[1],
+                  constitution = block[2], intelligence = block[3],
+                  wisdom = block[4], charisma = block[5], dice = dice)
+
+if __name__ == "__main__":
+    import time
+    count = 2000000
+    rng = np.random.default_rng(1)
+    for method in METHODS:
+        start = time.time()
+        blocks = generate(method, count, rng = rng)
+        seconds = time.time() - start
+        found = np.stack([np.bincount(blocks[:, i], minlength = HIGHEST + 1)
+                          for i in range(len(STATS))]) / count
+        print("%-8s %d blocks in %.2f seconds, worst error %.5f" %
+              (method, count, seconds,
+               np.abs(found - expected(method)).max()))
@@ -0,0 +1,423 @@
+# storage.py
+# Talon H.
+# 10/18/2026
+
+''' rosters of Characters and Monsters, saved in SQLite
+
+    a roster is a named list of combatants: "player", "party", "orc camp"...
+    Each one is saved with its gear (weapon, armor and potions), its health
+    and, for monsters, its AI numbers.  Timed modifiers and the inventory
+    are not saved, they only matter during a fight.
+
+        store = RosterStore("game.db")
+        store.save("orc camp", [Orc() for i in range(100000)])
+        camp = store.load("orc camp")   # nothing is built yet
+        orc = camp[5]                   # one row read, one Orc built
+        for orc in store.stream("orc camp"):
+            ...                         # a batch of rows at a time
+
+    writing is done in one transaction per save(), with an executemany()
+    per batchSize combatants, so a big roster is never turned into rows
+    all at once.  Every statement is one of the constant strings below, so
+    sqlite3 prepares it once per connection and reuses it from its
+    statement cache.
+
+    reading goes through a small pool of connections.  The database runs
+    in WAL mode, so any number of readers (one per thread, handed out by
+    the pool) can read while a save() is writing.  The path has to be a
+    real file for that; an in-memory database can't be shared.
+'''
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from character import *
+from monster import *
+from inventory import Pouch
+
+# class name: class, for everything that can be saved
+KINDS = {cls.__name__: cls
+         for cls in (CompactCharacter, Character, CompactMonster, Monster,
+                     CompactOrc, Orc)}
+
+COLUMNS = ("kind", "name", "maxHealth", "health", "speed", "hunger",
+           "stamina", "strength", "dexterity", "constitution",
+           "intelligence", "wisdom", "charisma", "weaponName",
+           "weaponBase", "weaponBonus", "armorName", "armorBase",
+           "armorBonus", "aggression", "awareness", "fear", "potionName",
+           "potionBase", "potionBonus", "potionCount")
+
+# nearly everybody carries one kind of potion, which goes in the potion
+# columns of characters; any other kinds get rows in potions
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rosters (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS characters (
+    id INTEGER PRIMARY KEY,
+    roster INTEGER NOT NULL,
+    %s
+);
+CREATE INDEX IF NOT EXISTS characters_roster ON characters (roster, id);
+CREATE TABLE IF NOT EXISTS potions (
+    character INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    base INTEGER NOT NULL,
+    bonus INTEGER NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS potions_character ON potions (character);
+""" % ",\n    ".join(COLUMNS)
+
+INSERT_CHARACTER = ("INSERT INTO characters (id, roster, %s) VALUES (?, ?%s)"
+                    % (", ".join(COLUMNS), ", ?" * len(COLUMNS)))
+INSERT_POTIONS = ("INSERT INTO potions (character, name, base, bonus, count) "
+                  "VALUES (?, ?, ?, ?, ?)")
+SELECT_ROSTER = ("SELECT id, %s FROM characters WHERE roster = ? "
+                 "ORDER BY id" % ", ".join(COLUMNS))
+SELECT_ROSTER_ID = "SELECT id FROM rosters WHERE name = ?"
+INSERT_ROSTER = "INSERT INTO rosters (name) VALUES (?)"
+SELECT_CHARACTER = ("SELECT id, %s FROM characters WHERE id = ?"
+                    % ", ".join(COLUMNS))
+SELECT_IDS = "SELECT id FROM characters WHERE roster = ? ORDER BY id"
+SELECT_POTIONS = ("SELECT character, name, base, bonus, count FROM potions "
+                  "WHERE character BETWEEN ? AND ? ORDER BY character")
+SELECT_ROSTERS = ("SELECT name FROM rosters WHERE id IN "
+                  "(SELECT DISTINCT roster FROM characters) ORDER BY name")
+COUNT_ROSTER = "SELECT count(*) FROM characters WHERE roster = ?"
+LAST_ID = "SELECT max(id) FROM characters"
+DELETE_POTIONS = ("DELETE FROM potions WHERE character IN "
+                  "(SELECT id FROM characters WHERE roster = ?)")
+DELETE_ROSTER_NAME = "DELETE FROM rosters WHERE id = ?"
+DELETE_ROSTER = "DELETE FROM characters WHERE roster = ?"
+
+def character_row(character, potions):
+    ''' the COLUMNS values of one combatant, potions being its first
+        potion_groups() entry (or None) '''
+    weapon = character._weapon
+    armor = character._armor
+    if isinstance(character, CompactMonster):
+        ai = (character.aggression, character.awareness, character.fear)
+    else:
+        ai = (None, None, None)
+    return (type(character).__name__, character.name, character.maxHealth,
+            character.health, character.speed, character.hunger,
+            character.stamina, character._strength, character._dexterity,
+            character._constitution, character._intelligence,
+            character._wisdom, character._charisma, weapon.name,
+            weapon.base, weapon.bonus, armor.name, armor.base,
+            armor.bonus) + ai + (potions or (None, None, None, 0))
+
+def potion_groups(character):
+    ''' (name, base, bonus, count) for each kind of potion carried '''
+    potions = character.potions
+    if not potions:
+        return []
+    if isinstance(potions, Pouch):
+        counts = {}
+        for potion, count in potions.groups():
+            key = (potion.name, potion.base, potion.bonus)
+            counts[key] = counts.get(key, 0) + count
+        return [key + (count,) for key, count in counts.items()]
+    first = potions[0]
+    if all(potion is first for potion in potions):  # the compact case
+        return [(first.name, first.base, first.bonus, len(potions))]
+    counts = {}
+    for potion in potions:
+        key = (potion.name, potion.base, potion.bonus)
+        counts[key] = counts.get(key, 0) + 1
+    return [key + (count,) for key, count in counts.items()]
+
+def build(row, potions, dice = None, items = None):
+    ''' makes the combatant saved in row, potions being its extra
+        potion_groups() entries
+
+        the class's own constructor is not run (an Orc's would reroll its
+        stats), the saved numbers are put straight in instead.  Compact
+        combatants share their (slotted) items: pass the same items
+        dictionary to every build() and identical weapons, armor and
+        potions are only made once.'''
+    (kind, name, maxHealth, health, speed, hunger, stamina, strength,
+     dexterity, constitution, intelligence, wisdom, charisma, weaponName,
+     weaponBase, weaponBonus, armorName, armorBase, armorBonus, aggression,
+     awareness, fear, potionName, potionBase, potionBonus,
+     potionCount) = row
+    cls = KINDS[kind]
+    separate = issubclass(cls, Character)   # its own item objects
+    if separate or items is None:
+        items = {}
+    character = cls.__new__(cls)
+    CompactCharacter.__init__(character, name, maxHealth, speed, stamina,
+                              strength, dexterity, constitution,
+                              intelligence, wisdom, charisma, 0, [],
+                              item(items, cls.weaponClass, weaponName,
+                                   weaponBase, weaponBonus),
+                              item(items, cls.armorClass, armorName,
+                                   armorBase, armorBonus),
+                              dice)
+    character.health = health
+    character.hunger = hunger
+    if issubclass(cls, CompactMonster):
+        character.aggression = aggression
+        character.awareness = awareness
+        character.fear = fear
+    if potionCount:
+        potions = [(potionName, potionBase, potionBonus, potionCount)] +\
+                  list(potions)
+    for potionName, base, bonus, count in potions:
+        if separate:
+            character.potions.add(Potion(potionName, base, bonus), count)
+        else:
+            character.potions.add(item(items, CompactPotion, potionName,
+                                       base, bonus), count)
+    return character
+
+def item(items, cls, name, base, bonus):
+    ''' the cls(name, base, bonus) in items, made if it isn't there '''
+    key = (cls, name, base, bonus)
+    found = items.get(key)
+    if found is None:
+        found = items[key] = cls(name, base, bonus)
+    return found
+
+class ConnectionPool(object):
+    ''' up to size sqlite3 connections to one file, for reader threads '''
+
+    def __init__(self, path, size = 4):
+        self.path = path
+        self.size = size
+        self.idle = queue.LifoQueue()
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def open(self):
+        connection = sqlite3.connect(self.path, check_same_thread = False,
+                                     cached_statements = 64)
+        connection.execute("PRAGMA query_only = ON")
+        return connection
+
+    @contextmanager
+    def connection(self):
+        ''' a connection for as long as the with block, waits for one if
+            size are already in use '''
+        try:
+            connection = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                fresh = self.opened < self.size
+                if fresh:
+                    self.opened += 1
+            connection = self.open() if fresh else self.idle.get()
+        try:
+            yield connection
+        finally:
+            self.idle.put(connection)
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class LazyRoster(object):
+    ''' a saved roster, only its ids are read until you look at it
+
+        roster[i] reads and builds one combatant, iterating streams them
+        in batches.  Nothing is cached, so each access is a fresh object.'''
+
+    def __init__(self, store, name, ids, dice = None):
+        self.store = store
+        self.name = name
+        self.ids = ids
+        self.dice = dice
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.store.get(self.ids[index], self.dice)
+
+    def __iter__(self):
+        return self.store.stream(self.name, self.dice)
+
+class RosterStore(object):
+    ''' saves and loads rosters of combatants in an SQLite file '''
+
+    def __init__(self, path, readers = 4, batchSize = 1000):
+        ''' readers is the size of the reading connection pool, batchSize
+            how many rows a stream fetches at a time '''
+        self.path = path
+        self.batchSize = batchSize
+        self.writer = sqlite3.connect(path, check_same_thread = False,
+                                      isolation_level = None,
+                                      cached_statements = 64)
+        self.writer.execute("PRAGMA journal_mode = WAL")
+        self.writer.execute("PRAGMA synchronous = NORMAL")
+        self.writer.executescript(SCHEMA)
+        self.writeLock = threading.Lock()
+        self.pool = ConnectionPool(path, readers)
+
+    def save(self, roster, characters):
+        ''' adds characters (any iterable) to the end of roster, returns
+            how many were saved '''
+        with self.writeLock:
+            cursor = self.writer.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                rosterId = self.roster_id(cursor, roster, True)
+                first = (cursor.execute(LAST_ID).fetchone()[0] or 0) + 1
+                saved = self.write(cursor, rosterId, characters, first)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+        return saved
+
+    def roster_id(self, cursor, roster, create = False):
+        ''' the id of roster's name, None if it has none (and create is
+            False) '''
+        row = cursor.execute(SELECT_ROSTER_ID, (roster,)).fetchone()
+        if row is not None:
+            return row[0]
+        if create:
+            return cursor.execute(INSERT_ROSTER, (roster,)).lastrowid
+        return None
+
+    def write(self, cursor, roster, characters, first):
+        ''' inserts characters with ids from first on, a batch at a time
+            so their potions can go in with them '''
+        saved = 0
+        batch = []
+        for character in characters:
+            batch.append(character)
+            if len(batch) >= self.batchSize:
+                self.write_batch(cursor, roster, batch, first + saved)
+                saved += len(batch)
+                batch = []
+        if batch:
+            self.write_batch(cursor, roster, batch, first + saved)
+            saved += len(batch)
+        return saved
+
+    def write_batch(self, cursor, roster, batch, first):
+        rows = []
+        extra = []
+        for i, character in enumerate(batch, first):
+            groups = potion_groups(character)
+            if len(groups) > 1:
+                extra.extend([(i,) + group for group in groups[1:]])
+            rows.append((i, roster) +
+                        character_row(character, groups[0] if groups else
+                                      None))
+        cursor.executemany(INSERT_CHARACTER, rows)
+        if extra:
+            cursor.executemany(INSERT_POTIONS, extra)
+
+    def delete(self, roster):
+        ''' throws a whole roster away '''
+        with self.writeLock:
+            cursor = self.writer.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                rosterId = self.roster_id(cursor, roster)
+                if rosterId is not None:
+                    cursor.execute(DELETE_POTIONS, (rosterId,))
+                    cursor.execute(DELETE_ROSTER, (rosterId,))
+                    cursor.execute(DELETE_ROSTER_NAME, (rosterId,))
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def replace(self, roster, characters):
+        ''' saves characters as the whole of roster '''
+        self.delete(roster)
+        return self.save(roster, characters)
+
+    def rosters(self):
+        ''' the names of every saved roster '''
+        with self.pool.connection() as connection:
+            return [row[0] for row in connection.execute(SELECT_ROSTERS)]
+
+    def count(self, roster):
+        with self.pool.connection() as connection:
+            rosterId = self.roster_id(connection, roster)
+            return connection.execute(COUNT_ROSTER, (rosterId,)).fetchone()[0]
+
+    def load(self, roster, dice = None):
+        ''' the roster as a LazyRoster, only the ids are read now '''
+        with self.pool.connection() as connection:
+            rosterId = self.roster_id(connection, roster)
+            ids = [row[0] for row in connection.execute(SELECT_IDS,
+                                                        (rosterId,))]
+        return LazyRoster(self, roster, ids, dice)
+
+    def get(self, id, dice = None):
+        ''' one combatant by id, or None '''
+        with self.pool.connection() as connection:
+            row = connection.execute(SELECT_CHARACTER, (id,)).fetchone()
+            if row is None:
+                return None
+            potions = [group[1:] for group in
+                       connection.execute(SELECT_POTIONS, (id, id))]
+        return build(row[1:], potions, dice)
+
+    def stream(self, roster, dice = None):
+        ''' generator: every combatant in roster, built batchSize rows at
+            a time with fetchmany(), so memory stays flat however big the
+            roster is.  Holds one pooled connection until it is done.'''
+        with self.pool.connection() as connection:
+            rosterId = self.roster_id(connection, roster)
+            rows = connection.execute(SELECT_ROSTER, (rosterId,))
+            potionCursor = connection.cursor()
+            items = {}
+            while True:
+                batch = rows.fetchmany(self.batchSize)
+                if not batch:
+                    return
+                potions = {}
+                for group in potionCursor.execute(SELECT_POTIONS,
+                                                  (batch[0][0],
+                                                   batch[-1][0])):
+                    potions.setdefault(group[0], []).append(group[1:])
+                for row in batch:
+                    yield build(row[1:], potions.get(row[0], ()), dice,
+                                items)
+
+    def close(self):
+        self.pool.close()
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    from dice import Dice
+    dice = Dice(1)
+    roster = [CompactOrc(dice = dice) for i in range(200000)]
+    path = os.path.join(tempfile.mkdtemp(), "roster.db")
+    with RosterStore(path) as store:
+        start = time.time()
+        store.save("orcs", roster)
+        seconds = time.time() - start
+        print("saved %d orcs in %.2f seconds, %d per second" %
+              (len(roster), seconds, len(roster) / seconds))
+        start = time.time()
+        camp = store.load("orcs")
+        print("loaded %d ids in %.2f seconds" % (len(camp),
+                                                 time.time() - start))
+        start = time.time()
+        total = sum(orc.health for orc in camp)
+        print("streamed them all in %.2f seconds, %d health in total" %
+              (time.time() - start, total))
+    os.remove(path)
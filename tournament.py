@@ -0,0 +1,174 @@
+# tournament.py
+# Talon H.
+# 10/18/2026
+
+''' round-robin tournaments: every hero build against every monster
+
+    each pairing fights thousands of bouts, with fresh combatants every
+    bout (so random stats, like an Orc's health, get rolled every time).
+    The bouts are cut into chunks and the chunks are spread over a process
+    pool.  Every chunk gets its own Dice stream, seeded from the tournament
+    seed and its place in the tournament, so the same seed gives the same
+    results no matter how many workers there are or which worker gets
+    which chunk.
+
+    usage:
+        python simulator.py tournament --bouts 10000 --workers 4 --seed 1
+'''
+from concurrent.futures import ProcessPoolExecutor
+from character import *
+from monster import *
+from catalog import default_catalog
+from bestiary import default_registry
+import simulator
+
+def simple_hero(dice):
+    ''' create_player()'s simple method '''
+    return Character(name = "Simple", dice = dice)
+
+def hardcore_hero(dice):
+    ''' create_player()'s hardcore method, without the name prompt '''
+    while True:
+        scores = [dice.randint(3,18) for i in range(6)]
+        if max(scores) > 11:
+            break
+    health = dice.randint(1,8)
+    if scores[2] > 12:
+        health += 1
+    return Character(name = "Hardcore", maxHealth = health,
+                     strength = scores[0], dexterity = scores[1],
+                     constitution = scores[2], intelligence = scores[3],
+                     wisdom = scores[4], charisma = scores[5],
+                     numberOfPotions = 0,
+                     weapon = default_catalog().get("stick"),
+                     armor = default_catalog().get("loincloth"),
+                     dice = dice)
+
+def four_d_six_hero(dice):
+    ''' create_player()'s 4d6 method, best score in strength, then dex... '''
+    scores = []
+    for i in range(6):
+        rolls = [dice.roll(6) for j in range(4)]
+        rolls.remove(min(rolls))
+        scores.append(sum(rolls))
+    scores.sort(reverse = True)
+    return Character(name = "4d6", maxHealth = dice.randint(1,8),
+                     strength = scores[0], dexterity = scores[1],
+                     constitution = scores[2], intelligence = scores[3],
+                     wisdom = scores[4], charisma = scores[5],
+                     numberOfPotions = dice.randint(1,4),
+                     weapon = default_catalog().get("longsword"),
+                     armor = default_catalog().get("leather"),
+                     dice = dice)
+
+# every factory takes the Dice stream to roll with
+HEROES = {"simple": simple_hero,
+          "hardcore": hardcore_hero,
+          "4d6": four_d_six_hero}
+
+def spawner(kind):
+    ''' a factory for one kind of monster in monsters.json '''
+    return lambda dice: default_registry().spawn(kind, dice)
+
+# every kind in the bestiary, so a monster added to monsters.json can
+# fight in the tournament without touching this file
+MONSTERS = {kind: spawner(kind) for kind in default_registry().names}
+
+def chunk_seed(seed, hero, monster, chunk):
+    ''' the seed for one chunk, the same whichever worker runs it '''
+    return "%s:%s:%s:%d" % (seed, hero, monster, chunk)
+
+def run_chunk(task):
+    ''' worker: fights one chunk of bouts, returns the tally
+
+        task is (hero, monster, count, seed, maxRounds), hero and monster
+        being keys of HEROES and MONSTERS.'''
+    hero, monster, count, seed, maxRounds = task
+    dice = Dice(seed)
+    makeHero = HEROES[hero]
+    makeMonster = MONSTERS[monster]
+    results = (simulator.bout(makeHero(dice), makeMonster(dice),
+                              maxRounds = maxRounds, dice = dice)
+               for i in range(count))
+    return hero, monster, simulator.summarize(results)
+
+def merge(total, summary):
+    ''' adds one summarize() dictionary into another '''
+    for key, value in summary.items():
+        total[key] = total.get(key, 0) + value
+    return total
+
+def tasks(heroes, monsters, bouts, chunkSize, seed, maxRounds):
+    ''' every chunk of every pairing, in a fixed order '''
+    for hero in heroes:
+        for monster in monsters:
+            chunk = 0
+            for start in range(0, bouts, chunkSize):
+                count = min(chunkSize, bouts - start)
+                yield (hero, monster, count,
+                       chunk_seed(seed, hero, monster, chunk), maxRounds)
+                chunk += 1
+
+def check_names(names, known, what):
+    ''' raises ValueError if any of names isn't a key of known '''
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError("unknown %s %s, pick from %s" %
+                         (what, ", ".join(unknown), ", ".join(sorted(known))))
+
+def run_tournament(heroes = None, monsters = None, bouts = 1000,
+                   workers = None, chunkSize = 500, seed = 0,
+                   maxRounds = 1000):
+    ''' plays every hero against every monster, bouts times each
+
+        heroes and monsters are lists of keys of HEROES and MONSTERS (all of
+        them by default), ValueError if one isn't.  workers is the pool
+        size, None uses every core, and 0 runs everything in this process.
+        Returns a dictionary {hero: {monster: summary}} with summarize()'s
+        totals.'''
+    if heroes is None:
+        heroes = sorted(HEROES)
+    if monsters is None:
+        monsters = sorted(MONSTERS)
+    check_names(heroes, HEROES, "hero")
+    check_names(monsters, MONSTERS, "monster")
+    results = {hero: {monster: {} for monster in monsters}
+               for hero in heroes}
+    work = tasks(heroes, monsters, bouts, chunkSize, seed, maxRounds)
+    if workers == 0:
+        done = map(run_chunk, work)
+        for hero, monster, summary in done:
+            merge(results[hero][monster], summary)
+    else:
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            # several chunks per trip keeps the pool busy without
+            # shipping one tiny task at a time
+            done = pool.map(run_chunk, work, chunksize = 4)
+            for hero, monster, summary in done:
+                merge(results[hero][monster], summary)
+    return results
+
+def win_rates(results):
+    ''' the hero win rate for every pairing, {hero: {monster: rate}} '''
+    return {hero: {monster: summary["oneWins"] / summary["bouts"]
+                   for monster, summary in row.items()}
+            for hero, row in results.items()}
+
+def print_matrix(results):
+    ''' prints the win rate matrix, heroes down and monsters across '''
+    rates = win_rates(results)
+    monsters = sorted(next(iter(rates.values())))
+    print("%-10s" % "hero" + "".join("%10s" % m for m in monsters))
+    for hero in sorted(rates):
+        print("%-10s" % hero +
+              "".join("%10.3f" % rates[hero][m] for m in monsters))
+
+def tournament_command(args):
+    ''' the "tournament" command of simulator.py '''
+    results = run_tournament(args.heroes, args.monsters, args.bouts,
+                             args.workers, args.chunk_size, args.seed,
+                             args.max_rounds)
+    print_matrix(results)
+
+if __name__ == "__main__":
+    simulator.main(["tournament"])
@@ -0,0 +1,248 @@
+# vector_sim.py
+# Talon H.
+# 10/18/2026
+
+''' NumPy Monte Carlo duel simulator
+
+    simulator.bout() still runs one Python call per die roll, which tops
+    out at a few tens of thousands of duels a second.  DuelBatch keeps a
+    whole batch of duels as arrays instead, and every call to step() plays
+    one round of every duel that is still going, with all the initiative,
+    attack, damage, heal and flee rolls drawn in bulk.
+
+    The rules are the ones in GameEngine.combat():
+        - initiative is 1d20 + speed each round, ties go to side one
+        - a natural 1 on the attack roll is a fumble
+        - 1d20 + attackBonus >= AC hits, for
+          1d(weapon base) + weapon bonus + damageBonus damage, at least 1
+        - a potion heals 1d(base) + bonus, capped at maxHealth
+        - fleeing works on 1d100 <= speed
+        - Monsters choose with the same odds as Monster.combat_choice(),
+          one draw each from policy.py's tables, plain Characters always
+          attack (see simulator.choice_for)
+
+    stats are read once when the batch is built, so timed modifiers
+    (see modifiers.py) count as they are at that moment and never expire.
+
+    needs numpy.
+'''
+import numpy as np
+from character import Character
+import policy
+
+ONE = 1
+TWO = 2
+
+class Side(object):
+    ''' one side of every duel in a batch, stored as arrays
+
+        all arrays have one entry per duel.  useAI marks duels where this
+        side picks its action like Monster.combat_choice(), the others
+        always attack.  Potions are assumed to be all the same kind, the
+        one on top of the stack (the one heal() would drink first).'''
+
+    FIELDS = ("health", "maxHealth", "speed", "attackBonus", "damageBonus",
+              "AC", "weaponBase", "weaponBonus", "potions", "potionBase",
+              "potionBonus", "aggression", "awareness", "fear", "useAI")
+
+    def __init__(self, **arrays):
+        for field in Side.FIELDS:
+            setattr(self, field, np.asarray(arrays[field], dtype = np.int64))
+        self.useAI = self.useAI.astype(bool)
+        # combat_choice() odds of every entry, see policy.table()
+        self.policy = policy.table(self.aggression, self.awareness,
+                                   self.fear)
+
+    @staticmethod
+    def stats(combatant):
+        ''' the numbers the batch needs from one Character or Monster '''
+        if combatant.potions:
+            potion = combatant.potions[-1]
+            potionBase, potionBonus = potion.base, potion.bonus
+        else:
+            potionBase, potionBonus = 1, 0
+        useAI = type(combatant).combat_choice is not Character.combat_choice
+        return {"health": combatant.health,
+                "maxHealth": combatant.maxHealth,
+                "speed": combatant.speed,
+                "attackBonus": combatant.attackBonus,
+                "damageBonus": combatant.damageBonus,
+                "AC": combatant.AC,
+                "weaponBase": combatant.weapon.base,
+                "weaponBonus": combatant.weapon.bonus,
+                "potions": combatant.potionCount,
+                "potionBase": potionBase,
+                "potionBonus": potionBonus,
+                "aggression": getattr(combatant, "aggression", 0),
+                "awareness": getattr(combatant, "awareness", 0),
+                "fear": getattr(combatant, "fear", 0),
+                "useAI": useAI}
+
+    @classmethod
+    def repeat(cls, combatant, count):
+        ''' count copies of the same combatant '''
+        stats = cls.stats(combatant)
+        return cls(**{field: np.full(count, value)
+                      for field, value in stats.items()})
+
+    @classmethod
+    def from_combatants(cls, combatants):
+        ''' one entry per combatant in the sequence '''
+        rows = [cls.stats(combatant) for combatant in combatants]
+        return cls(**{field: [row[field] for row in rows]
+                      for field in cls.FIELDS})
+
+class DuelBatch(object):
+    ''' many independent duels between side one and side two
+
+        after run() (or enough step() calls) the results are in:
+            winner  - ONE, TWO or 0 (fled, or still undecided)
+            fled    - ONE, TWO or 0
+            rounds  - rounds started
+            damage  - damage[0] dealt by side one, damage[1] by side two
+            potionsUsed - same layout as damage
+        side one and side two hold the health and potions left.'''
+
+    def __init__(self, one, two, seed = None, rng = None):
+        ''' one and two are Side objects of the same length '''
+        self.one = one
+        self.two = two
+        self.size = len(one.health)
+        if rng is None:
+            rng = np.random.default_rng(seed)
+        self.rng = rng
+        self.winner = np.zeros(self.size, dtype = np.int8)
+        self.fled = np.zeros(self.size, dtype = np.int8)
+        self.rounds = np.zeros(self.size, dtype = np.int64)
+        self.damage = np.zeros((2, self.size), dtype = np.int64)
+        self.potionsUsed = np.zeros((2, self.size), dtype = np.int64)
+        self.live = np.ones(self.size, dtype = bool)
+
+    @classmethod
+    def repeat(cls, one, two, count, seed = None, rng = None):
+        ''' count duels between copies of the Characters one and two '''
+        return cls(Side.repeat(one, count), Side.repeat(two, count),
+                   seed, rng)
+
+    @classmethod
+    def pairs(cls, ones, twos, seed = None, rng = None):
+        ''' one duel per (ones[i], twos[i]) pair '''
+        return cls(Side.from_combatants(ones), Side.from_combatants(twos),
+                   seed, rng)
+
+    def _choices(self, side, idx):
+        ''' "a", "h" or "f" for each duel in idx, coded 0, 1, 2 '''
+        choice = np.zeros(len(idx), dtype = np.int8)
+        ai = side.useAI[idx]
+        if ai.any():
+            aiIdx = idx[ai]
+            attackBelow, healBelow = side.policy
+            choice[ai] = policy.draw((attackBelow[aiIdx], healBelow[aiIdx]),
+                                     self.rng)
+        return choice
+
+    def _act(self, code, actor, target, idx):
+        ''' actor takes its turn in every duel listed in idx '''
+        if len(idx) == 0:
+            return
+        slot = code - 1
+        choice = self._choices(actor, idx)
+
+        # flee
+        fleeIdx = idx[choice == 2]
+        if len(fleeIdx):
+            got = (self.rng.integers(1, 101, size = len(fleeIdx)) <=
+                   actor.speed[fleeIdx])
+            away = fleeIdx[got]
+            self.fled[away] = code
+            self.live[away] = False
+
+        # heal, with no potions left the turn is wasted
+        healIdx = idx[choice == 1]
+        healIdx = healIdx[actor.potions[healIdx] > 0]
+        if len(healIdx):
+            amount = (self.rng.integers(0, actor.potionBase[healIdx]) + 1 +
+                      actor.potionBonus[healIdx])
+            actor.health[healIdx] = np.minimum(
+                actor.health[healIdx] + amount, actor.maxHealth[healIdx])
+            actor.potions[healIdx] -= 1
+            self.potionsUsed[slot, healIdx] += 1
+
+        # attack
+        attackIdx = idx[choice == 0]
+        if len(attackIdx):
+            roll = self.rng.integers(1, 21, size = len(attackIdx))
+            attack = roll + actor.attackBonus[attackIdx]
+            hit = (roll != 1) & (attack >= target.AC[attackIdx])
+            hitIdx = attackIdx[hit]
+            if len(hitIdx):
+                damage = (self.rng.integers(0, actor.weaponBase[hitIdx]) + 1 +
+                          actor.weaponBonus[hitIdx] +
+                          actor.damageBonus[hitIdx])
+                damage = np.maximum(damage, 1)
+                target.health[hitIdx] -= damage
+                self.damage[slot, hitIdx] += damage
+                dead = hitIdx[target.health[hitIdx] <= 0]
+                self.winner[dead] = code
+                self.live[dead] = False
+
+    def step(self):
+        ''' plays one round of every live duel, returns how many are left '''
+        idx = np.flatnonzero(self.live)
+        if len(idx) == 0:
+            return 0
+        self.rounds[idx] += 1
+        oneInit = (self.rng.integers(1, 21, size = len(idx)) +
+                   self.one.speed[idx])
+        twoInit = (self.rng.integers(1, 21, size = len(idx)) +
+                   self.two.speed[idx])
+        oneFirst = oneInit >= twoInit
+        firstOne = idx[oneFirst]
+        firstTwo = idx[~oneFirst]
+
+        # the two groups are different duels, so their order doesn't matter
+        self._act(ONE, self.one, self.two, firstOne)
+        self._act(TWO, self.two, self.one, firstTwo)
+        self._act(TWO, self.two, self.one, firstOne[self.live[firstOne]])
+        self._act(ONE, self.one, self.two, firstTwo[self.live[firstTwo]])
+        return int(self.live.sum())
+
+    def run(self, maxRounds = None):
+        ''' steps until every duel is over, or maxRounds rounds are played '''
+        rounds = 0
+        while self.step():
+            rounds += 1
+            if maxRounds is not None and rounds >= maxRounds:
+                break
+        return self
+
+    def results(self):
+        ''' generator of dictionaries shaped like simulator.bout()'s '''
+        names = {ONE: "one", TWO: "two", 0: None}
+        for i in range(self.size):
+            yield {"winner": names[int(self.winner[i])],
+                   "fled": names[int(self.fled[i])],
+                   "rounds": int(self.rounds[i]),
+                   "damage": [int(self.damage[0, i]), int(self.damage[1, i])],
+                   "potions": [int(self.potionsUsed[0, i]),
+                               int(self.potionsUsed[1, i])],
+                   "bout": i}
+
+    def summary(self):
+        ''' same keys as simulator.summarize() '''
+        decided = (self.winner != 0) | (self.fled != 0)
+        return {"bouts": self.size,
+                "oneWins": int((self.winner == ONE).sum()),
+                "twoWins": int((self.winner == TWO).sum()),
+                "oneFled": int((self.fled == ONE).sum()),
+                "twoFled": int((self.fled == TWO).sum()),
+                "undecided": int((~decided).sum()),
+                "rounds": int(self.rounds.sum())}
+
+if __name__ == "__main__":
+    import time
+    from monster import Orc
+    start = time.time()
+    batch = DuelBatch.repeat(Character(), Orc(), 10**6, seed = 1).run()
+    print(batch.summary())
+    print("%.2f seconds" % (time.time() - start))